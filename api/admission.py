@@ -0,0 +1,169 @@
+import os
+import re
+import time
+import logging
+from collections import OrderedDict
+
+# Pulled from the raw body with a regex so rejection needs no JSON or pydantic parsing
+SYMBOL_PATTERN = re.compile(rb'"symbol"\s*:\s*"([^"]{1,32})"')
+
+class TokenBucket:
+    """Refills at `rate` tokens per second up to `burst`; each request takes one token"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+class AdmissionController:
+    """
+    Decides whether an order request may reach the engine: a token bucket
+    per client and per symbol, plus a global limit on requests in flight.
+    Symbols `known_symbols` does not accept share a single bucket, so made-up
+    symbols cannot create buckets. Rejections are counted by reason in `shed`.
+    """
+
+    MAX_BUCKETS = 10_000  # Least recently used buckets are dropped past this many; a dropped bucket is simply full again
+
+    def __init__(self, client_rate: float = 500, client_burst: float = 1000, symbol_rate: float = 5000,
+                 symbol_burst: float = 10000, max_in_flight: int = 512, clock=time.monotonic,
+                 known_symbols=None):
+        self.client_rate, self.client_burst = client_rate, client_burst
+        self.symbol_rate, self.symbol_burst = symbol_rate, symbol_burst
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self.known_symbols = known_symbols  # symbol -> bool, or None to give every symbol its own bucket
+        self.client_buckets = OrderedDict()
+        self.symbol_buckets = OrderedDict()
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = {"in_flight": 0, "client_rate": 0, "symbol_rate": 0}
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_env(cls, known_symbols=None) -> "AdmissionController":
+        env = os.environ
+        return cls(
+            known_symbols=known_symbols,
+            client_rate=float(env.get("ADMISSION_CLIENT_RATE", 500)),
+            client_burst=float(env.get("ADMISSION_CLIENT_BURST", 1000)),
+            symbol_rate=float(env.get("ADMISSION_SYMBOL_RATE", 5000)),
+            symbol_burst=float(env.get("ADMISSION_SYMBOL_BURST", 10000)),
+            max_in_flight=int(env.get("ADMISSION_MAX_IN_FLIGHT", 512))
+        )
+
+    def _take(self, buckets: OrderedDict, key, rate: float, burst: float, now: float) -> bool:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.MAX_BUCKETS:
+                buckets.popitem(last=False)
+            bucket = buckets[key] = TokenBucket(rate, burst, now)
+        else:
+            buckets.move_to_end(key)
+        return bucket.take(now)
+
+    def admit(self, client: str, symbol: str | None) -> str | None:
+        """Reason for rejecting the request, or None after counting it in flight"""
+        if self.in_flight >= self.max_in_flight:
+            reason = "in_flight"
+        else:
+            now = self.clock()
+            if not self._take(self.client_buckets, client, self.client_rate, self.client_burst, now):
+                reason = "client_rate"
+            elif symbol is not None and not self._take(self.symbol_buckets, self._symbol_key(symbol),
+                                                       self.symbol_rate, self.symbol_burst, now):
+                reason = "symbol_rate"
+            else:
+                self.in_flight += 1
+                self.admitted += 1
+                return None
+        self.shed[reason] += 1
+        return reason
+
+    def _symbol_key(self, symbol: str):
+        if self.known_symbols is None or self.known_symbols(symbol):
+            return symbol
+        return None  # Shared by all unknown symbols
+
+    def release(self):
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {"admitted": self.admitted, "in_flight": self.in_flight, "shed": dict(self.shed)}
+
+REJECTIONS = {
+    "in_flight": (503, b'{"detail":"Engine busy, retry shortly"}'),
+    "client_rate": (429, b'{"detail":"Client rate limit exceeded"}'),
+    "symbol_rate": (429, b'{"detail":"Symbol rate limit exceeded"}')
+}
+
+class AdmissionMiddleware:
+    """
+    Plain ASGI middleware applying an AdmissionController to order-entry
+    requests before routing, so shed requests cost a regex and a dict
+    lookup. Clients are identified by their peer address; `client_header`
+    names a header to use instead, only for deployments behind a proxy that
+    authenticates clients and sets it.
+    """
+
+    def __init__(self, app, controller: AdmissionController, paths: tuple = ("/order",),
+                 client_header: str | None = None):
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+        self.client_header = client_header.lower().encode("latin-1") if client_header else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        client = None
+        if self.client_header is not None:
+            for name, value in scope["headers"]:
+                if name == self.client_header:
+                    client = value.decode("latin-1")
+                    break
+        if client is None:
+            client = scope["client"][0] if scope.get("client") else "unknown"
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        match = SYMBOL_PATTERN.search(body)
+        reason = self.controller.admit(client, match.group(1).decode() if match else None)
+        if reason is not None:
+            status, detail = REJECTIONS[reason]
+            headers = [(b"content-type", b"application/json"), (b"content-length", str(len(detail)).encode())]
+            if status == 429:
+                headers.append((b"retry-after", b"1"))
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": detail})
+            return
+
+        replayed = False
+
+        async def replay():
+            # Hand the already-read body to the app, then pass through (e.g. disconnects)
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release()
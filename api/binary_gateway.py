@@ -0,0 +1,185 @@
+import asyncio
+import struct
+from decimal import Decimal
+import logging
+from engine.fixed_point import to_fixed, from_fixed
+from engine.matching_engine import MatchingEngine
+from engine.models import Order, OrderType, OrderSide
+
+# Fixed-width little-endian binary protocol. Every message starts with a
+# one-byte type; the body length is implied by the type. Prices and
+# quantities are fixed-point integers (see engine.fixed_point), 0 = absent.
+#
+# Client -> gateway
+#   NEW_ORDER: client_order_id, symbol[16], order_type, side, quantity, price, stop_price
+#   CANCEL:    client_order_id, symbol[16], order_id
+#   AMEND:     client_order_id, symbol[16], order_id, quantity, price
+# Gateway -> client
+#   ACK:       client_order_id, order_id, status, remaining quantity
+#   FILL:      client_order_id, order_id, trade_id, price, quantity, timestamp, liquidity (0 maker, 1 taker)
+#   REJECT:    client_order_id, reason[64]
+NEW_ORDER = 1
+CANCEL = 2
+AMEND = 3
+ACK = 4
+FILL = 5
+REJECT = 6
+
+MESSAGES = {
+    NEW_ORDER: struct.Struct("<Bq16sBBqqq"),
+    CANCEL: struct.Struct("<Bq16sq"),
+    AMEND: struct.Struct("<Bq16sqqq"),
+    ACK: struct.Struct("<BqqBq"),
+    FILL: struct.Struct("<Bqqqqqqb"),
+    REJECT: struct.Struct("<Bq64s")
+}
+
+# ACK status codes
+ACCEPTED = 0
+CANCELED = 1
+AMENDED = 2
+
+ORDER_TYPES = list(OrderType)
+SIDES = [OrderSide.BUY, OrderSide.SELL]
+MAKER = 0
+TAKER = 1
+
+def _decimal(value: int) -> Decimal | None:
+    return from_fixed(value) if value else None
+
+class BinaryGateway:
+    """
+    asyncio TCP order-entry gateway speaking the fixed-width protocol above.
+    Requests are decoded straight into engine calls (one Order construction,
+    no JSON), and every complete message in a read is processed before the
+    responses are flushed, so clients can pipeline many requests per
+    connection. Maker fills are reported from the engine's trade listener,
+    whichever channel the taker came through.
+    """
+
+    def __init__(self, engine: MatchingEngine):
+        self.engine = engine
+        self.owners = {}  # order_id -> (writer, client_order_id) for resting orders entered here
+        self.logger = logging.getLogger(__name__)
+        if engine.execution_reports:
+            engine.add_execution_listener(self.on_execution)
+        else:
+            engine.add_trade_listener(self.on_trade)
+        engine.add_cancel_listener(self.on_cancel)
+
+    async def start(self, host: str = "0.0.0.0", port: int = 9001):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.logger.info("Binary gateway listening on %s:%s", host, port)
+        return self.server
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        buffer = b""
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                offset = 0
+                while offset < len(buffer):
+                    message = MESSAGES.get(buffer[offset])
+                    if message is None or buffer[offset] in (ACK, FILL, REJECT):
+                        self.logger.warning("Unknown message type %s, closing connection", buffer[offset])
+                        return
+                    if len(buffer) - offset < message.size:
+                        break  # Wait for the rest of the message
+                    self._dispatch(message.unpack_from(buffer, offset), writer)
+                    offset += message.size
+                buffer = buffer[offset:]
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for order_id in [oid for oid, (w, _) in self.owners.items() if w is writer]:
+                del self.owners[order_id]
+            writer.close()
+
+    def _dispatch(self, fields: tuple, writer: asyncio.StreamWriter):
+        msg_type, client_order_id = fields[0], fields[1]
+        try:
+            symbol = fields[2].rstrip(b"\0").decode()
+            if msg_type == NEW_ORDER:
+                _, _, _, order_type, side, quantity, price, stop_price = fields
+                order = Order(
+                    symbol=symbol,
+                    order_type=ORDER_TYPES[order_type],
+                    side=SIDES[side],
+                    quantity=from_fixed(quantity),
+                    price=_decimal(price),
+                    stop_price=_decimal(stop_price)
+                )
+                executions = self.engine.process_order(order)
+                self._ack(writer, client_order_id, order.order_id, ACCEPTED, order.quantity)
+                self._report_fills(writer, client_order_id, order.order_id, symbol, executions)
+            elif msg_type == CANCEL:
+                order_id = fields[3]
+                if not self.engine.cancel_order(symbol, order_id):
+                    raise ValueError(f"Order {order_id} is not live")
+                self._ack(writer, client_order_id, order_id, CANCELED, Decimal("0"))
+            elif msg_type == AMEND:
+                _, _, _, order_id, quantity, price = fields
+                executions = self.engine.amend_order(symbol, order_id, from_fixed(quantity), _decimal(price))
+                resting = self.engine.order_books[symbol].get_order(order_id)
+                self._ack(writer, client_order_id, order_id, AMENDED, resting.quantity if resting else Decimal("0"))
+                self._report_fills(writer, client_order_id, order_id, symbol, executions)
+        except (ValueError, IndexError) as e:
+            writer.write(MESSAGES[REJECT].pack(REJECT, client_order_id, str(e).encode()[:64]))
+        except Exception:
+            # Keep the connection: one bad request must not drop the client's other orders
+            self.logger.exception("Request %s failed", client_order_id)
+            writer.write(MESSAGES[REJECT].pack(REJECT, client_order_id, b"Internal error"))
+
+    def _ack(self, writer, client_order_id: int, order_id: int, status: int, remaining: Decimal):
+        writer.write(MESSAGES[ACK].pack(ACK, client_order_id, order_id, status, to_fixed(remaining)))
+
+    def _report_fills(self, writer, client_order_id: int, order_id: int, symbol: str, executions: list):
+        """Taker fills of a request from this connection; makers hear from on_trade"""
+        fill = MESSAGES[FILL]
+        for trade in executions:
+            writer.write(fill.pack(FILL, client_order_id, order_id, trade.trade_id, to_fixed(trade.price),
+                                   to_fixed(trade.quantity), trade.timestamp, TAKER))
+        if self.engine.order_books[symbol].get_order(order_id) is not None:
+            self.owners[order_id] = (writer, client_order_id)
+
+    def on_trade(self, trade):
+        """Report a fill to the maker if it entered the order here; runs once the fill is applied"""
+        if trade.maker_order_id in self.owners:
+            self._report_maker(trade.maker_order_id, trade.trade_id, trade.price, trade.quantity, trade.timestamp)
+
+    def on_execution(self, report):
+        """on_trade for each fill of an ExecutionReport, read from its columns"""
+        for trade_id, price, quantity, maker_order_id in zip(report.trade_ids, report.prices, report.quantities,
+                                                             report.maker_order_ids):
+            if maker_order_id in self.owners:
+                self._report_maker(maker_order_id, trade_id, price, quantity, report.timestamp)
+
+    def _report_maker(self, order_id: int, trade_id: int, price: Decimal, quantity: Decimal, timestamp: int):
+        writer, client_order_id = self.owners[order_id]
+        writer.write(MESSAGES[FILL].pack(FILL, client_order_id, order_id, trade_id, to_fixed(price),
+                                         to_fixed(quantity), timestamp, MAKER))
+        if self.engine.order_index.get(order_id) is None:
+            del self.owners[order_id]
+
+    def on_cancel(self, symbol: str, order_id: int):
+        # Cancels from any channel
+        self.owners.pop(order_id, None)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Standalone binary order-entry gateway")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9001)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    async def serve():
+        server = await BinaryGateway(MatchingEngine()).start(args.host, args.port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import Response
+import orjson
+from decimal import Decimal
+import logging
+from engine.models import Order, Trade
+from engine.sequencer import ns_to_iso
+from . import rest_api
+
+# Fast-path versions of the hottest REST endpoints, enabled with
+# REST_FAST_PATH=1 (main.py mounts this router ahead of rest_api.router).
+# The order body is validated once, by Order itself, and responses are
+# encoded with orjson into a raw Response instead of going through
+# jsonable_encoder. Depth encodings are cached per symbol until the book changes.
+router = APIRouter()
+logger = logging.getLogger(__name__)
+JSON = "application/json"
+
+_depth_cache = {}  # symbol -> {depth: encoded bytes}
+_listening_to = None  # Engine _invalidate is registered with
+
+def _invalidate(symbol: str, order_book):
+    _depth_cache.pop(symbol, None)
+
+def _engine():
+    """rest_api's engine, built on first use, with the depth cache listening to its books"""
+    global _listening_to
+    engine = rest_api.get_engine()
+    if _listening_to is not engine:
+        engine.add_book_listener(_invalidate)
+        _listening_to = engine
+    return engine
+
+def _error(status_code: int, detail: str) -> Response:
+    return Response(orjson.dumps({"detail": detail}), status_code=status_code, media_type=JSON)
+
+def _trade_dict(trade: Trade) -> dict:
+    return {
+        "timestamp": ns_to_iso(trade.timestamp),
+        "symbol": trade.symbol,
+        "trade_id": str(trade.trade_id),
+        "price": str(trade.price),
+        "quantity": str(trade.quantity),
+        "aggressor_side": trade.aggressor_side.value,
+        "maker_order_id": str(trade.maker_order_id),
+        "taker_order_id": str(trade.taker_order_id),
+        "maker_fee": str(trade.maker_fee),
+        "taker_fee": str(trade.taker_fee),
+        "fee_currency": trade.fee_currency
+    }
+
+@router.post("/order")
+async def submit_order_fast(request: Request, fills: bool = True):
+    """Same contract as rest_api.submit_order"""
+    if rest_api.read_only_reason:
+        return _error(503, rest_api.read_only_reason)
+    try:
+        body = orjson.loads(await request.body())
+        order = Order(
+            symbol=body["symbol"],
+            order_type=body["order_type"],
+            side=body["side"],
+            quantity=body["quantity"],
+            price=body.get("price"),
+            user_id=body.get("user_id"),
+            peg_type=body.get("peg_type"),
+            peg_offset=body.get("peg_offset", "0")
+        )
+        report = rest_api.execution_report(order, _engine().process_order(order))
+    except Exception as e:
+        logger.error("Order processing failed: %s", e)
+        return _error(400, str(e))
+    response = {"status": "success", "order_id": str(order.order_id), "report": report.summary()}
+    if fills:
+        response["executions"] = [_trade_dict(trade) for trade in report]
+    return Response(orjson.dumps(response), media_type=JSON)
+
+@router.get("/orderbook/{symbol}")
+async def get_orderbook_fast(symbol: str, depth: int = 10, group: Decimal | None = None, cumulative: bool = False):
+    """Same contract as rest_api.get_orderbook"""
+    if group is not None:
+        try:
+            return Response(orjson.dumps(rest_api.grouped_depth(symbol, group, depth, cumulative)), media_type=JSON)
+        except HTTPException as e:
+            return _error(e.status_code, e.detail)
+    reader = rest_api.get_book_reader()
+    if reader:
+        return Response(orjson.dumps(reader.get_depth(symbol, depth)), media_type=JSON)
+    by_depth = _depth_cache.get(symbol)
+    encoded = by_depth.get(depth) if by_depth else None
+    if encoded is None:
+        order_book = _engine().order_books.get(symbol)
+        if not order_book:
+            return Response(b'{"bids":[],"asks":[]}', media_type=JSON)
+        encoded = orjson.dumps(order_book.get_depth(depth))
+        by_depth = _depth_cache.setdefault(symbol, {})
+        if len(by_depth) < 8:  # Clients use a handful of depths; don't let odd ones grow the cache
+            by_depth[depth] = encoded
+    return Response(encoded, media_type=JSON)
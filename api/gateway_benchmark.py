@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import requests
+from engine.fixed_point import to_fixed
+from .binary_gateway import MESSAGES, NEW_ORDER, ACK, FILL, REJECT
+
+def _summary(latencies: list, total_time: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "orders_per_second": len(latencies) / total_time,
+        "latency_microseconds": {
+            "min": ordered[0],
+            "p50": ordered[len(ordered) // 2],
+            "p99": ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)],
+            "max": ordered[-1],
+            "mean": statistics.mean(ordered)
+        }
+    }
+
+def _order_params(i: int) -> tuple:
+    # Alternate non-crossing buys and sells so the book grows without trading
+    side = i % 2
+    price = 50000 + (i % 100) + (0 if side == 0 else 200)
+    return side, price
+
+async def run_gateway(host: str, port: int, num_orders: int, window: int) -> dict:
+    """Round-trip time from sending NEW_ORDER to receiving its ACK, with up to `window` requests in flight"""
+    reader, writer = await asyncio.open_connection(host, port)
+    new_order = MESSAGES[NEW_ORDER]
+    sent_at = {}
+    latencies = []
+    in_flight = asyncio.Semaphore(window)
+
+    async def receive():
+        buffer = b""
+        while len(latencies) < num_orders:
+            buffer += await reader.read(65536)
+            offset = 0
+            while offset < len(buffer):
+                message = MESSAGES[buffer[offset]]
+                if len(buffer) - offset < message.size:
+                    break
+                fields = message.unpack_from(buffer, offset)
+                offset += message.size
+                if fields[0] in (ACK, REJECT):
+                    latencies.append((time.perf_counter() - sent_at.pop(fields[1])) * 1e6)
+                    in_flight.release()
+            buffer = buffer[offset:]
+
+    receiver = asyncio.create_task(receive())
+    start = time.perf_counter()
+    for i in range(num_orders):
+        await in_flight.acquire()
+        side, price = _order_params(i)
+        sent_at[i] = time.perf_counter()
+        writer.write(new_order.pack(NEW_ORDER, i, b"BTC-USDT", 1, side, to_fixed(1), to_fixed(price), 0))
+        if i % window == window - 1:
+            await writer.drain()
+    await writer.drain()
+    await receiver
+    total_time = time.perf_counter() - start
+    writer.close()
+    return _summary(latencies, total_time)
+
+def run_rest(base_url: str, num_orders: int) -> dict:
+    """Sequential round-trip time of POST /order over a keep-alive HTTP session"""
+    session = requests.Session()
+    latencies = []
+    start = time.perf_counter()
+    for i in range(num_orders):
+        side, price = _order_params(i)
+        body = {"symbol": "BTC-USDT", "order_type": "limit", "side": "buy" if side == 0 else "sell",
+                "quantity": "1", "price": str(price)}
+        t0 = time.perf_counter()
+        session.post(f"{base_url}/order", json=body).raise_for_status()
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    return _summary(latencies, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare binary gateway and REST order-entry latency")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--rest-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--num-orders", type=int, default=5000)
+    parser.add_argument("--window", type=int, default=32, help="Pipelined requests in flight")
+    args = parser.parse_args()
+    results = {
+        "gateway_sequential": asyncio.run(run_gateway(args.host, args.port, args.num_orders, 1)),
+        "gateway_pipelined": asyncio.run(run_gateway(args.host, args.port, args.num_orders, args.window)),
+        "rest": run_rest(args.rest_url, args.num_orders)
+    }
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import httpx
+import websockets
+from engine.fixed_point import to_fixed
+from .binary_gateway import MESSAGES, NEW_ORDER, ACK, REJECT
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SYMBOL = "BTC-USDT"
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    def pick(q):
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+        "p99": pick(0.99),
+        "p999": pick(0.999),
+        "max": ordered[-1],
+        "mean": sum(ordered) / len(ordered)
+    }
+
+def iso_to_ns(value: str) -> int:
+    """Inverse of engine.sequencer.ns_to_iso"""
+    seconds, _, nanos = value.partition(".")
+    dt = datetime.fromisoformat(seconds).replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) * 1_000_000_000 + int(nanos.ljust(9, "0")[:9] or 0)
+
+def _order(i: int) -> tuple:
+    # Alternate buys and sells at one price so every other order trades
+    return ("buy" if i % 2 == 0 else "sell"), 50000
+
+def start_server(port: int, gateway_port: int | None) -> subprocess.Popen:
+    """Run main:app in a scratch directory so snapshots and logs don't touch the working tree"""
+    # All simulated clients share one address, so the server trusts their X-Client-Id header
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT), "ADMISSION_CLIENT_HEADER": "X-Client-Id"}
+    if gateway_port:
+        env["GATEWAY_PORT"] = str(gateway_port)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=tempfile.mkdtemp(prefix="loadgen_"), env=env
+    )
+
+async def wait_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                (await client.get(f"{base_url}/orderbook/{SYMBOL}")).raise_for_status()
+                return
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+async def rest_load(base_url: str, num_orders: int, concurrency: int) -> dict:
+    """`concurrency` clients each send POST /order back to back over a keep-alive connection"""
+    latencies = []
+    counter = iter(range(num_orders))
+    trades = 0
+    errors = 0
+
+    async def client_loop(client, client_id):
+        nonlocal trades, errors
+        # Each simulated client has its own admission-control identity
+        headers = {"X-Client-Id": f"loadgen-{client_id}"}
+        for i in counter:
+            side, price = _order(i)
+            t0 = time.perf_counter()
+            response = await client.post(f"{base_url}/order", json={
+                "symbol": SYMBOL, "order_type": "limit", "side": side, "quantity": "1", "price": str(price)
+            }, headers=headers)
+            latencies.append((time.perf_counter() - t0) * 1e6)
+            if response.status_code == 200:
+                trades += len(response.json()["executions"])
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, n) for n in range(concurrency)))
+        total_time = time.perf_counter() - start
+    return {
+        "orders_per_second": num_orders / total_time,
+        "trades": trades,
+        "errors": errors,
+        "latency_microseconds": _percentiles(latencies)
+    }
+
+async def gateway_load(host: str, port: int, num_orders: int, concurrency: int) -> dict:
+    """`concurrency` binary gateway connections, one request in flight each"""
+    latencies = []
+    counter = iter(range(num_orders))
+    new_order = MESSAGES[NEW_ORDER]
+
+    async def connection_loop():
+        reader, writer = await asyncio.open_connection(host, port)
+        buffer = b""
+        for i in counter:
+            side, price = _order(i)
+            t0 = time.perf_counter()
+            writer.write(new_order.pack(NEW_ORDER, i, SYMBOL.encode(), 1, 0 if side == "buy" else 1,
+                                        to_fixed(1), to_fixed(price), 0))
+            await writer.drain()
+            acked = False
+            while not acked:
+                # Skip FILLs (including maker fills for earlier orders) until this order's ACK
+                while len(buffer) < 1 or len(buffer) < MESSAGES[buffer[0]].size:
+                    buffer += await reader.read(65536)
+                message = MESSAGES[buffer[0]]
+                fields = message.unpack_from(buffer)
+                buffer = buffer[message.size:]
+                acked = fields[0] in (ACK, REJECT) and fields[1] == i
+            latencies.append((time.perf_counter() - t0) * 1e6)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(connection_loop() for _ in range(concurrency)))
+    total_time = time.perf_counter() - start
+    return {"orders_per_second": num_orders / total_time, "latency_microseconds": _percentiles(latencies)}
+
+async def subscribe(ws_url: str, lags: list, ready: asyncio.Event, counts: list):
+    """Record the delay from each trade's engine timestamp to its arrival on this connection"""
+    async with websockets.connect(ws_url) as websocket:
+        ready.set()
+        received = 0
+        try:
+            async for text in websocket:
+                arrived = time.time_ns()
+                message = json.loads(text)
+                if message.get("type") == "trade":
+                    lags.append((arrived - iso_to_ns(message["data"]["timestamp"])) / 1000)
+                    received += 1
+                elif message.get("type") == "execution":  # Server running with EXECUTION_REPORTS=1
+                    lags.append((arrived - iso_to_ns(message["data"]["timestamp"])) / 1000)
+                    received += message["data"]["fill_count"]
+        finally:
+            counts.append(received)
+
+async def run(args) -> dict:
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = start_server(args.port, args.gateway_port)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_ready(base_url)
+        lags, counts = [], []
+        ws_url = base_url.replace("http", "ws", 1) + "/ws"
+        ready_events = [asyncio.Event() for _ in range(args.subscribers)]
+        subscribers = [asyncio.create_task(subscribe(ws_url, lags, ready, counts)) for ready in ready_events]
+        for ready in ready_events:
+            await ready.wait()
+
+        report = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                "orders": args.orders,
+                "concurrency": args.concurrency,
+                "subscribers": args.subscribers,
+                "gateway": bool(args.gateway_port)
+            },
+            "rest": await rest_load(base_url, args.orders, args.concurrency)
+        }
+        expected_trades = report["rest"]["trades"]
+        if args.gateway_port:
+            report["gateway"] = await gateway_load("127.0.0.1", args.gateway_port, args.orders, args.concurrency)
+            expected_trades += args.orders // 2
+        await asyncio.sleep(args.drain)  # Let the last fills reach every subscriber
+        for task in subscribers:
+            task.cancel()
+        await asyncio.gather(*subscribers, return_exceptions=True)
+        report["websocket"] = {
+            "expected_deliveries": expected_trades * args.subscribers,
+            "deliveries": sum(counts),
+            "lag_microseconds": _percentiles(lags)
+        }
+        return report
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+def _flatten(report: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def compare_reports(baseline: dict, current: dict) -> list:
+    """(metric, baseline, current, % change) for every numeric metric in both reports"""
+    old, new = _flatten(baseline), _flatten(current)
+    return [
+        (metric, old[metric], new[metric], (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else None)
+        for metric in new if metric in old and not metric.startswith("config.")
+    ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end load test over REST, the binary gateway and WebSocket")
+    parser.add_argument("--url", help="Use an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8010, help="Port for the server this tool starts")
+    parser.add_argument("--gateway-port", type=int, help="Also drive the binary gateway on this port")
+    parser.add_argument("--orders", type=int, default=5000, help="Orders per transport")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per transport")
+    parser.add_argument("--subscribers", type=int, default=4, help="WebSocket connections measuring fill lag")
+    parser.add_argument("--drain", type=float, default=1.0, help="Seconds to wait for WebSocket deliveries")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        print(f"\n{'metric':<50}{'baseline':>14}{'current':>14}{'change':>10}")
+        for metric, old, new, change in compare_reports(json.loads(Path(args.baseline).read_text()), report):
+            change_text = f"{change:+.1f}%" if change is not None else "n/a"
+            print(f"{metric:<50}{old:>14.1f}{new:>14.1f}{change_text:>10}")
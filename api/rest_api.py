@@ -1,16 +1,91 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from engine.matching_engine import MatchingEngine
 from engine.models import Order
-from engine.benchmark import Benchmark
-from .schemas import OrderRequest
+from engine.execution_report import ExecutionReport
+from engine.candles import CandleAggregator
+from engine.trade_tape import TradeTape, NS_PER_SECOND
+from engine.trade_log import TradeLog
+from engine.trade_dispatcher import TradeDispatcher
+from engine.shared_book import SharedBookReader
+from datetime import datetime, timezone
+import asyncio
+import json
+import os
+from decimal import Decimal
+from .schemas import OrderRequest, ExecutionResponse, OrderStatusResponse, AwayQuoteRequest, NBBOResponse
 import logging
 
+# EXECUTION_REPORTS=1 batches each taker order's fills into one ExecutionReport
+# TRADE_DISPATCHER=1 moves candles, the tape, the trade log and the WebSocket trade feed off the matching path
+# DEPTH_GROUPS lists the price bucket sizes each book keeps grouped depth for ("" to disable)
+DEPTH_GROUPS = [Decimal(group) for group in os.environ.get("DEPTH_GROUPS", "1,10,100").split(",") if group.strip()]
+# Built by get_engine() on first use, not at import; read-only workers never build them
+engine = candles = tape = trade_log = dispatcher = None
+
+def _build():
+    """Create the engine and its trade consumers"""
+    global engine, candles, tape, trade_log, dispatcher
+    engine = MatchingEngine(execution_reports=os.environ.get("EXECUTION_REPORTS") == "1", depth_groups=DEPTH_GROUPS)
+    candles = CandleAggregator()
+    tape = TradeTape(capacity=int(os.environ.get("TRADE_TAPE_CAPACITY", 100_000)))
+    trade_log = TradeLog()
+    dispatcher = None
+    if os.environ.get("TRADE_DISPATCHER") == "1":
+        dispatcher = TradeDispatcher(
+            capacity=int(os.environ.get("TRADE_DISPATCHER_CAPACITY", 65536)),
+            # Candles, the tape and the trade log need every trade, so by default the matcher waits for them
+            policy=os.environ.get("TRADE_DISPATCHER_POLICY", "block")
+        )
+    # With execution reports on, consumers read each report's fill columns and no Trade models are built
+    for name, consumer in (("candles", candles), ("tape", tape), ("trade_log", trade_log)):
+        callback = consumer.on_execution if engine.execution_reports else consumer.on_trade
+        if dispatcher is not None:
+            dispatcher.add_listener(callback, name=name)
+        elif engine.execution_reports:
+            engine.add_execution_listener(callback)
+        else:
+            engine.add_trade_listener(callback)
+    if dispatcher is not None:
+        if engine.execution_reports:
+            engine.add_execution_listener(dispatcher.publish)
+        else:
+            engine.add_trade_listener(dispatcher.publish)
+
+def get_engine() -> MatchingEngine:
+    """The engine, built with its trade consumers on first use; a 503 on read-only workers, which have none"""
+    # Routes call this on the event loop thread, so the engine is never built twice
+    if engine is None:
+        if SHM_READER_NAME:
+            raise HTTPException(status_code=503, detail=read_only_reason)
+        _build()
+    return engine
+
 router = APIRouter()
-engine = MatchingEngine()
 logger = logging.getLogger(__name__)
 
+# Read-only API workers serve book queries from the matching process's
+# shared-memory segment (see SharedBookPublisher) instead of a local engine
+SHM_READER_NAME = os.environ.get("ORDERBOOK_SHM_READER")
+book_reader = None
+# Set while this process must not accept orders (shared-memory reader, hot standby)
+read_only_reason = "Read-only worker: submit orders to the matching process" if SHM_READER_NAME else None
+
+def get_book_reader() -> SharedBookReader | None:
+    global book_reader
+    if SHM_READER_NAME and book_reader is None:
+        book_reader = SharedBookReader(SHM_READER_NAME)
+    return book_reader
+
+def execution_report(order: Order, executions) -> ExecutionReport:
+    """process_order returns a report with execution_reports on, otherwise the trade list"""
+    if isinstance(executions, ExecutionReport):
+        return executions
+    return ExecutionReport.from_trades(order, executions, get_engine().fee_config)
+
 @router.post("/order")
-async def submit_order(order_req: OrderRequest):
+async def submit_order(order_req: OrderRequest, fills: bool = True):
     """
     Submit a new order.
     Request body: {
@@ -18,47 +93,276 @@ async def submit_order(order_req: OrderRequest):
         order_type: str (market, limit, ioc, fok, stop_loss, stop_limit, take_profit),
         side: str (buy/sell),
         quantity: decimal,
-        price: decimal (optional)
+        price: decimal (optional),
+        user_id: str (optional),
+        peg_type: str (optional: primary, midpoint),
+        peg_offset: decimal (optional)
     }
-    Response: {status, executions}
+    Query params: fills (include per-fill executions, default true)
+    Response: {status, order_id, report, executions}
     """
+    if read_only_reason:
+        raise HTTPException(status_code=503, detail=read_only_reason)
     try:
         order = Order(
             symbol=order_req.symbol,
             order_type=order_req.order_type,
             side=order_req.side,
             quantity=order_req.quantity,
-            price=order_req.price
+            price=order_req.price,
+            user_id=order_req.user_id,
+            peg_type=order_req.peg_type,
+            peg_offset=order_req.peg_offset
         )
-        executions = engine.process_order(order)
-        return {"status": "success", "executions": executions}
+        report = execution_report(order, get_engine().process_order(order))
+        response = {"status": "success", "order_id": str(order.order_id), "report": report.summary()}
+        if fills:
+            response["executions"] = [ExecutionResponse.from_trade(trade) for trade in report]
+        return response
     except Exception as e:
         logger.error(f"Order processing failed: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/order/{order_id}")
+async def get_order(order_id: int):
+    """
+    Status of a live order: remaining quantity and queue position.
+    Response: OrderStatusResponse, 404 once the order is filled or canceled
+    """
+    status = get_engine().get_order_status(order_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Order {order_id} is not live")
+    return OrderStatusResponse.from_status(status)
+
+@router.get("/orders")
+async def get_user_orders(user: str, symbol: str | None = None):
+    """
+    Live orders of a user, optionally for one symbol.
+    Response: {user, orders: [OrderStatusResponse]}
+    """
+    orders = get_engine().get_user_orders(user, symbol)
+    return {"user": user, "orders": [OrderStatusResponse.from_status(status) for status in orders]}
+
+@router.delete("/orders")
+async def cancel_user_orders(user: str, symbol: str | None = None):
+    """
+    Cancel every live order of a user, optionally for one symbol.
+    Response: {status, canceled: [order_id]}
+    """
+    if read_only_reason:
+        raise HTTPException(status_code=503, detail=read_only_reason)
+    canceled = get_engine().cancel_user_orders(user, symbol)
+    return {"status": "success", "canceled": [str(order_id) for order_id in canceled]}
+
+def grouped_depth(symbol: str, group: Decimal, depth: int, cumulative: bool) -> dict:
+    """Depth by price bucket from the book's incrementally maintained BucketedDepth"""
+    if get_book_reader():
+        raise HTTPException(status_code=400, detail="Grouped depth is only served by the matching process")
+    order_book = get_engine().order_books.get(symbol)
+    if not order_book:
+        return {"bids": [], "asks": []}
+    if order_book.depth is None:
+        raise HTTPException(status_code=400, detail="Grouped depth is not enabled (DEPTH_GROUPS)")
+    try:
+        return order_book.depth.get(group, depth, cumulative)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/orderbook/{symbol}")
-async def get_orderbook(symbol: str, depth: int = 10):
+async def get_orderbook(symbol: str, depth: int = 10, group: Decimal | None = None, cumulative: bool = False):
     """
     Get current order book depth for a symbol.
-    Query params: depth (default 10)
+    Query params: depth (default 10), group (price bucket size, one of DEPTH_GROUPS),
+    cumulative (with group: add running totals)
     Response: {bids, asks}
     """
+    if group is not None:
+        return grouped_depth(symbol, group, depth, cumulative)
     try:
-        order_book = engine.order_books.get(symbol)
+        reader = get_book_reader()
+        if reader:
+            return reader.get_depth(symbol, depth)
+        order_book = get_engine().order_books.get(symbol)
         if not order_book:
             return {"bids": [], "asks": []}
         return order_book.get_depth(depth)
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.get("/candles/{symbol}")
+async def get_candles(symbol: str, interval: str = "1m", limit: int = 100):
+    """
+    Get recent OHLCV + VWAP bars for a symbol, oldest first.
+    Query params: interval (1s, 1m, 5m, 1h; default 1m), limit (default 100)
+    Response: {symbol, interval, candles}
+    """
+    get_engine()  # Builds candles with the engine
+    try:
+        return {
+            "symbol": symbol,
+            "interval": interval,
+            "candles": candles.get_candles(symbol, interval, limit)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _since_ns(window: float | None) -> int | None:
+    return get_engine().sequencer.now_ns() - int(window * NS_PER_SECOND) if window else None
+
+@router.get("/tape/{symbol}")
+async def get_recent_trades(symbol: str, limit: int = 100):
+    """
+    Get the most recent trades for a symbol from the in-memory trade tape.
+    Query params: limit (default 100)
+    Response: {symbol, trades} (newest first)
+    """
+    get_engine()  # Builds the tape with the engine
+    return {"symbol": symbol, "trades": tape.recent(symbol, limit)}
+
+@router.get("/tape/{symbol}/stats")
+async def get_trade_stats(symbol: str, window: float | None = None):
+    """
+    Trade count, VWAP and volume by aggressor side over the trade tape.
+    Query params: window (seconds, optional; default the whole tape)
+    Response: {symbol, trade_count, vwap, volume: {buy, sell}}
+    """
+    since_ns = _since_ns(window)  # Builds the tape with the engine
+    return {"symbol": symbol, **tape.stats(symbol, since_ns)}
+
+@router.get("/tape/{symbol}/volume_profile")
+async def get_volume_profile(symbol: str, bucket: float = 10.0, window: float | None = None):
+    """
+    Traded volume per price bucket over the trade tape.
+    Query params: bucket (price bucket size, default 10), window (seconds, optional)
+    Response: {symbol, bucket, profile: [[bucket_floor, volume], ...]}
+    """
+    if bucket <= 0:
+        raise HTTPException(status_code=400, detail="bucket must be positive")
+    since_ns = _since_ns(window)  # Builds the tape with the engine
+    return {
+        "symbol": symbol,
+        "bucket": bucket,
+        "profile": tape.volume_profile(symbol, bucket, since_ns)
+    }
+
+def _parse_time_ns(value: str) -> int:
+    """Accept either nanoseconds since epoch or an ISO8601 timestamp (UTC if naive)"""
+    if value.isdigit():
+        return int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) * NS_PER_SECOND + dt.microsecond * 1000
+
+@router.get("/trades/{symbol}")
+async def get_trade_history(symbol: str, from_: str = Query(alias="from"), to: str | None = None,
+                            page_size: int = 1000):
+    """
+    Stream durable trade history for a time range from the on-disk trade log.
+    Query params: from, to (ns since epoch or ISO8601; to defaults to now), page_size (default 1000)
+    Response: newline-delimited JSON, one trade per line, written one page at a time
+    """
+    engine = get_engine()  # Builds the trade log with the engine
+    try:
+        from_ns = _parse_time_ns(from_)
+        to_ns = _parse_time_ns(to) if to else engine.sequencer.now_ns()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def pages():
+        for page in trade_log.read_range(symbol, from_ns, to_ns, page_size):
+            yield "".join(json.dumps(trade) + "\n" for trade in page)
+
+    return StreamingResponse(pages(), media_type="application/x-ndjson")
+
+def _indicative_response(indicative: dict) -> dict:
+    return {key: str(value) if value is not None else None for key, value in indicative.items()}
+
+@router.post("/auction/{symbol}/start")
+async def start_auction(symbol: str):
+    """
+    Put a symbol into an auction phase: orders accumulate without matching.
+    Response: {status, indicative}
+    """
+    if read_only_reason:
+        raise HTTPException(status_code=503, detail=read_only_reason)
+    engine = get_engine()
+    try:
+        engine.start_auction(symbol)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "auction", "indicative": _indicative_response(engine.get_indicative(symbol))}
+
+@router.get("/auction/{symbol}")
+async def get_auction(symbol: str):
+    """
+    Indicative clearing price, volume and imbalance of an open auction.
+    Response: {price, volume, imbalance}
+    """
+    engine = get_engine()
+    try:
+        return _indicative_response(engine.get_indicative(symbol))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.post("/auction/{symbol}/uncross")
+async def uncross_auction(symbol: str):
+    """
+    Uncross an auction at its clearing price and resume continuous matching.
+    Response: {status, executions}
+    """
+    if read_only_reason:
+        raise HTTPException(status_code=503, detail=read_only_reason)
+    engine = get_engine()
+    try:
+        executions = engine.end_auction(symbol)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "continuous", "executions": [ExecutionResponse.from_trade(trade) for trade in executions]}
+
+@router.post("/quotes/{venue}")
+async def submit_away_quote(venue: str, quote: AwayQuoteRequest):
+    """
+    Feed an away venue's top-of-book quote into the NBBO that orders are
+    protected against (enabled with NBBO=1 or SIMULATED_VENUES).
+    Request body: {symbol, bid, bid_size, ask, ask_size}
+    Response: {status, nbbo, executions}
+    """
+    if read_only_reason:
+        raise HTTPException(status_code=503, detail=read_only_reason)
+    engine = get_engine()
+    try:
+        executions = engine.update_away_quote(venue, quote.symbol, quote.bid, quote.bid_size,
+                                              quote.ask, quote.ask_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "success", "nbbo": NBBOResponse(**engine.nbbo.quote(quote.symbol)),
+            "executions": [ExecutionResponse.from_trade(trade) for trade in executions]}
+
+@router.get("/nbbo/{symbol}")
+async def get_nbbo(symbol: str):
+    """
+    Best away bid and ask across venues, with every venue's quote.
+    Response: NBBOResponse
+    """
+    engine = get_engine()
+    if engine.nbbo is None:
+        raise HTTPException(status_code=400, detail="The NBBO is not enabled (NBBO, SIMULATED_VENUES)")
+    return NBBOResponse(**engine.nbbo.quote(symbol))
+
+# One benchmark at a time; each run gets a scratch engine so the live books never see its orders
+benchmark_lock = asyncio.Lock()
+
 @router.get("/benchmark")
-async def run_benchmark(num_orders: int = 1000):
+async def run_benchmark(num_orders: int = Query(1000, ge=1, le=100_000)):
     """
     Run a performance benchmark with the specified number of orders.
     Query params: num_orders
     Response: benchmark results
     """
-    """Run a performance benchmark with the specified number of orders"""
-    benchmark = Benchmark(engine)
-    results = benchmark.measure_performance(num_orders)
-    return results
\ No newline at end of file
+    if benchmark_lock.locked():
+        raise HTTPException(status_code=429, detail="A benchmark is already running")
+    async with benchmark_lock:
+        from engine.benchmark import Benchmark
+        benchmark = Benchmark(MatchingEngine())
+        return await run_in_threadpool(benchmark.measure_performance, num_orders)
@@ -0,0 +1,30 @@
+import argparse
+import json
+import time
+import requests
+
+def measure(base_url: str, num_requests: int) -> dict:
+    """Sequential requests per second through POST /order and GET /orderbook on one keep-alive session"""
+    session = requests.Session()
+    results = {}
+    start = time.perf_counter()
+    for i in range(num_requests):
+        side = "buy" if i % 2 == 0 else "sell"
+        price = 50000 + (i % 100) + (0 if side == "buy" else 200)
+        session.post(f"{base_url}/order", json={
+            "symbol": "BTC-USDT", "order_type": "limit", "side": side, "quantity": "1", "price": str(price)
+        }).raise_for_status()
+    results["post_order_rps"] = num_requests / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(num_requests):
+        session.get(f"{base_url}/orderbook/BTC-USDT", params={"depth": 10}).raise_for_status()
+    results["get_orderbook_rps"] = num_requests / (time.perf_counter() - start)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="REST throughput; run once against a default server and once with REST_FAST_PATH=1")
+    parser.add_argument("--rest-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--num-requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.rest_url, args.num_requests), indent=2))
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from decimal import Decimal
-from engine.models import OrderType, OrderSide
+from engine.models import OrderType, OrderSide, PegType, Trade
+from engine.sequencer import ns_to_iso
 
 class OrderRequest(BaseModel):
     symbol: str
@@ -8,6 +9,50 @@ class OrderRequest(BaseModel):
     side: OrderSide
     quantity: Decimal
     price: Decimal | None = None
+    user_id: str | None = None
+    peg_type: PegType | None = None  # Pegged limit order, sent without a price
+    peg_offset: Decimal = Decimal("0")
+
+class AwayQuoteRequest(BaseModel):
+    """An away venue's top of book; leave a side's price out, or send a zero size, to withdraw it"""
+    symbol: str
+    bid: Decimal | None = None
+    bid_size: Decimal | None = None
+    ask: Decimal | None = None
+    ask_size: Decimal | None = None
+
+class VenueQuoteResponse(BaseModel):
+    bid: Decimal | None
+    bid_size: Decimal | None
+    ask: Decimal | None
+    ask_size: Decimal | None
+
+class NBBOResponse(VenueQuoteResponse):
+    symbol: str
+    bid_venue: str | None
+    ask_venue: str | None
+    venues: dict[str, VenueQuoteResponse]
+
+class OrderStatusResponse(BaseModel):
+    order_id: str
+    symbol: str
+    user_id: str | None
+    status: str  # resting, pegged or pending_trigger
+    order_type: OrderType
+    side: OrderSide
+    quantity: Decimal  # Remaining
+    price: Decimal | None = None
+    stop_price: Decimal | None = None
+    take_profit_price: Decimal | None = None
+    peg_type: PegType | None = None  # Pegged orders only; price is the current peg price
+    peg_offset: Decimal | None = None
+    orders_ahead: int | None = None  # Queue position at the price level, resting orders only
+    quantity_ahead: Decimal | None = None
+    queue_position_exact: bool | None = None  # False when orders_ahead/quantity_ahead are lower bounds
+
+    @classmethod
+    def from_status(cls, status: dict):
+        return cls(**{**status, "order_id": str(status["order_id"])})
 
 class MarketDataResponse(BaseModel):
     timestamp: str
@@ -23,4 +68,33 @@ class TradeResponse(BaseModel):
     quantity: Decimal
     aggressor_side: OrderSide
     maker_order_id: str
-    taker_order_id: str
\ No newline at end of file
+    taker_order_id: str
+
+    @classmethod
+    def from_trade(cls, trade: Trade):
+        """Render integer IDs and the ns timestamp as strings at the API edge"""
+        return cls(
+            timestamp=ns_to_iso(trade.timestamp),
+            symbol=trade.symbol,
+            trade_id=str(trade.trade_id),
+            price=trade.price,
+            quantity=trade.quantity,
+            aggressor_side=trade.aggressor_side,
+            maker_order_id=str(trade.maker_order_id),
+            taker_order_id=str(trade.taker_order_id)
+        )
+
+class ExecutionResponse(TradeResponse):
+    maker_fee: Decimal
+    taker_fee: Decimal
+    fee_currency: str
+
+    @classmethod
+    def from_trade(cls, trade: Trade):
+        base = TradeResponse.from_trade(trade)
+        return cls(
+            **base.model_dump(),
+            maker_fee=trade.maker_fee,
+            taker_fee=trade.taker_fee,
+            fee_currency=trade.fee_currency
+        )
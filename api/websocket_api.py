@@ -3,54 +3,162 @@ import asyncio
 import json
 from engine.matching_engine import MatchingEngine
 from engine.models import Trade
+from engine.execution_report import ExecutionReport
+from engine.sequencer import ns_to_iso
 from .schemas import MarketDataResponse, TradeResponse
 import logging
 from datetime import datetime
+from decimal import Decimal
+
+DEPTH_LEVELS = 20  # Buckets per side on the depth channel
 
 class WebSocketManager:
     """
     WebSocket manager for market data and trade execution feeds.
     - Market data: type='market_data', data={timestamp, symbol, asks, bids}
     - Trade execution: type='trade', data={timestamp, symbol, trade_id, price, quantity, aggressor_side, maker_order_id, taker_order_id}
+      With engine.execution_reports on, one type='execution' message per taker order replaces its
+      trade messages: data={timestamp, symbol, order_id, side, filled_quantity, remaining_quantity,
+      average_price, fill_count, first_trade_id, last_trade_id, taker_fee, fee_currency, levels}
+    - Candles (subscription only): type='candle', data={symbol, interval, start, open, high, low, close, volume, vwap, trade_count}
+    - Grouped depth (subscription only): type='depth', data={symbol, group, bids, asks}, the best
+      DEPTH_LEVELS buckets per side, sent on subscribe and after book changes (coalesced per loop tick)
+    Clients subscribe with {"type": "subscribe", "channel": "candles", "symbol": ..., "interval": ...}
+    or {"type": "subscribe", "channel": "depth", "symbol": ..., "group": "10"}.
     """
 
-    def __init__(self, engine: MatchingEngine):
+    def __init__(self, engine: MatchingEngine, candle_aggregator=None, dispatcher=None):
         self.connections = set()
+        self.subscriptions = {}  # (channel, symbol, interval) -> set of websockets
         self.engine = engine
         self.logger = logging.getLogger(__name__)
-        engine.add_trade_listener(self.notify_trade)
-    
+        # With a TradeDispatcher, trades are sent from its consumer task once start() runs
+        self.dispatcher = dispatcher if not engine.execution_reports else None
+        if engine.execution_reports:
+            engine.add_execution_listener(self._on_execution)
+        elif dispatcher is None:
+            engine.add_trade_listener(self._on_trade)
+        if candle_aggregator:
+            candle_aggregator.add_listener(self._on_candle)
+        self.dirty_depth = set()  # Symbols whose grouped depth changed since the last flush
+        self.loop = None  # Set by start(); candle updates may come from a dispatcher thread
+        engine.add_book_listener(self._on_book)
+
+    def start(self):
+        """Call from the running event loop, e.g. at application startup"""
+        self.loop = asyncio.get_running_loop()
+        if self.dispatcher:
+            self.dispatcher.add_async_listener(self._send_trade, name="websocket")
+
+    async def _send_trade(self, trade: Trade):
+        if self.connections:
+            await self.notify_trade(trade)
+
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.connections.add(websocket)
-    
+
     def disconnect(self, websocket: WebSocket):
-        self.connections.remove(websocket)
-    
-    async def broadcast(self, message: dict):
-        for connection in self.connections:
+        self.connections.discard(websocket)
+        for subscribers in self.subscriptions.values():
+            subscribers.discard(websocket)
+
+    async def handle_message(self, websocket: WebSocket, text: str):
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        channel = message.get("channel")
+        if channel == "candles":
+            key = ("candles", message.get("symbol"), message.get("interval", "1m"))
+        elif channel == "depth":
             try:
-                await connection.send_text(json.dumps(message))
+                key = ("depth", message.get("symbol"), Decimal(str(message.get("group"))))
+            except ArithmeticError:
+                return
+        else:
+            return
+        if message.get("type") == "subscribe":
+            self.subscriptions.setdefault(key, set()).add(websocket)
+            if channel == "depth":
+                data = self._depth_data(key[1], key[2])
+                if data:
+                    await self.broadcast({"type": "depth", "data": data}, [websocket])
+        elif message.get("type") == "unsubscribe":
+            self.subscriptions.get(key, set()).discard(websocket)
+
+    def _schedule(self, coro):
+        """Engine listeners are synchronous; hand the send off to the running event loop"""
+        try:
+            asyncio.get_running_loop().create_task(coro)
+            return
+        except RuntimeError:
+            pass
+        if self.loop is not None and not self.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(coro, self.loop)  # Called from a dispatcher thread
+        else:
+            coro.close()  # No event loop (e.g. offline benchmark), nobody to send to
+
+    async def broadcast(self, message: dict, connections=None):
+        text = json.dumps(message)
+        for connection in list(self.connections if connections is None else connections):
+            try:
+                await connection.send_text(text)
             except Exception as e:
                 self.logger.error(f"WebSocket send error: {str(e)}")
                 self.disconnect(connection)
-    
+
+    def _on_trade(self, trade: Trade):
+        if self.connections:
+            self._schedule(self.notify_trade(trade))
+
     async def notify_trade(self, trade: Trade):
-        trade_resp = TradeResponse(
-            timestamp=trade.timestamp.isoformat(),
-            symbol=trade.symbol,
-            trade_id=trade.trade_id,
-            price=trade.price,
-            quantity=trade.quantity,
-            aggressor_side=trade.aggressor_side,
-            maker_order_id=trade.maker_order_id,
-            taker_order_id=trade.taker_order_id
-        )
+        trade_resp = TradeResponse.from_trade(trade)
         await self.broadcast({
             "type": "trade",
-            "data": trade_resp.dict()
+            "data": trade_resp.model_dump(mode="json")
         })
-    
+
+    def _on_execution(self, report: ExecutionReport):
+        if self.connections and report:
+            # Summarize now: one message however many levels the order swept
+            self._schedule(self.broadcast({
+                "type": "execution",
+                "data": {"timestamp": ns_to_iso(report.timestamp), **report.summary()}
+            }))
+
+    def _depth_data(self, symbol: str, group: Decimal) -> dict | None:
+        order_book = self.engine.order_books.get(symbol)
+        if order_book is None or order_book.depth is None or group not in order_book.depth.bids:
+            return None
+        return {"symbol": symbol, "group": str(group), **order_book.depth.get(group, DEPTH_LEVELS)}
+
+    def _on_book(self, symbol: str, order_book):
+        if order_book.depth is None or not self.subscriptions:
+            return
+        if not self.dirty_depth:
+            try:
+                asyncio.get_running_loop().call_soon(self._flush_depth)
+            except RuntimeError:
+                return  # No event loop, nobody to send to
+        self.dirty_depth.add(symbol)
+
+    def _flush_depth(self):
+        """One depth message per subscribed (symbol, group) however many book changes came before"""
+        dirty, self.dirty_depth = self.dirty_depth, set()
+        for (channel, symbol, group), subscribers in self.subscriptions.items():
+            if channel == "depth" and symbol in dirty and subscribers:
+                data = self._depth_data(symbol, group)
+                if data:
+                    self._schedule(self.broadcast({"type": "depth", "data": data}, subscribers))
+
+    def _on_candle(self, symbol: str, interval: str, candle):
+        subscribers = self.subscriptions.get(("candles", symbol, interval))
+        if subscribers:
+            # Render now: the ring-buffer slot is reused once the bar rolls over
+            data = {"symbol": symbol, "interval": interval, **candle.to_dict()}
+            self._schedule(self.broadcast({"type": "candle", "data": data}, subscribers))
+
     async def broadcast_market_data(self, symbol: str):
         order_book = self.engine.order_books.get(symbol)
         if order_book:
@@ -62,5 +170,5 @@ class WebSocketManager:
             )
             await self.broadcast({
                 "type": "market_data",
-                "data": market_data.dict()
-            })
\ No newline at end of file
+                "data": market_data.model_dump(mode="json")
+            })
@@ -0,0 +1,32 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def configure_async_logging(level=logging.INFO, log_file: str = None, handlers: list = None,
+                            logger: logging.Logger = None) -> QueueListener:
+    """
+    Replace the handlers of `logger` (the root logger by default) with a
+    QueueHandler. Records are handed to a background thread that runs the
+    real handlers (console, and `log_file` if given), so a slow disk or
+    terminal never blocks the matching thread. Call stop() on the returned
+    listener at shutdown to flush what is still queued.
+    """
+    if handlers is None:
+        handlers = [logging.StreamHandler()]
+        if log_file:
+            handlers.append(logging.FileHandler(log_file))
+    formatter = logging.Formatter(LOG_FORMAT)
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    logger = logger or logging.getLogger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
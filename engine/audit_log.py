@@ -0,0 +1,147 @@
+import queue
+import struct
+import threading
+from decimal import Decimal
+from pathlib import Path
+import logging
+from .fixed_point import to_fixed
+from .models import Trade, OrderSide, OrderType
+from .execution_report import ExecutionReport
+
+# One fixed-width record per inbound event or trade:
+# record type, side, order type, symbol, seq (0 for trades), timestamp (ns),
+# three ids, price and quantity (fixed-point, 0 = absent)
+#   ORDER:        order_id, parent_order_id, 0
+#   CANCEL:       order_id, 0, 0
+#   AMEND:        order_id, 0, 0 (price/quantity are the amended values)
+#   MARKET_PRICE: 0, 0, 0
+#   AUCTION_START, AUCTION_END: 0, 0, 0
+#   AWAY_QUOTE:   ask, ask size, venue slot in the NBBO (price/quantity are the bid)
+#   TRADE:        trade_id, maker_order_id, taker_order_id (side is the aggressor side)
+RECORD = struct.Struct("<BBB5x16sqqqqqqq")
+ORDER = 1
+CANCEL = 2
+AMEND = 3
+MARKET_PRICE = 4
+TRADE = 5
+AUCTION_START = 6
+AUCTION_END = 7
+AWAY_QUOTE = 8
+
+EVENT_TYPES = {"order": ORDER, "cancel": CANCEL, "amend": AMEND, "market_price": MARKET_PRICE,
+               "auction_start": AUCTION_START, "auction_end": AUCTION_END, "away_quote": AWAY_QUOTE}
+SIDES = list(OrderSide)
+ORDER_TYPES = list(OrderType)
+_SIDE_CODES = {side.value: i for i, side in enumerate(SIDES)}
+_ORDER_TYPE_CODES = {order_type.value: i for i, order_type in enumerate(ORDER_TYPES)}
+_STOP = object()
+
+def _fixed(value) -> int:
+    return to_fixed(Decimal(value)) if value is not None else 0
+
+def _pack_event(event: dict) -> bytes:
+    record_type = EVENT_TYPES[event["type"]]
+    if record_type == ORDER:
+        order = event["order"]
+        return RECORD.pack(ORDER, _SIDE_CODES[order["side"]], _ORDER_TYPE_CODES[order["order_type"]],
+                           order["symbol"].encode(), event["seq"], event["timestamp"],
+                           order["order_id"], order.get("parent_order_id") or 0, 0,
+                           _fixed(order.get("price")), _fixed(order["quantity"]))
+    if record_type == AWAY_QUOTE:
+        return RECORD.pack(AWAY_QUOTE, 0, 0, event["symbol"].encode(), event["seq"], event["timestamp"],
+                           _fixed(event["ask"]), _fixed(event["ask_size"]), event["venue_slot"],
+                           _fixed(event["bid"]), _fixed(event["bid_size"]))
+    return RECORD.pack(record_type, 0, 0, event["symbol"].encode(), event["seq"], event["timestamp"],
+                       event.get("order_id", 0), 0, 0, _fixed(event.get("price")), _fixed(event.get("quantity")))
+
+def _pack_trade(trade: Trade) -> bytes:
+    return RECORD.pack(TRADE, _SIDE_CODES[trade.aggressor_side.value], 0, trade.symbol.encode(), 0,
+                       trade.timestamp, trade.trade_id, trade.maker_order_id, trade.taker_order_id,
+                       to_fixed(trade.price), to_fixed(trade.quantity))
+
+def _pack_report(report) -> bytes:
+    """TRADE records for every fill of an ExecutionReport, read from its columns"""
+    side, symbol, taker_order_id = _SIDE_CODES[report.side.value], report.symbol.encode(), report.order_id
+    return b"".join(
+        RECORD.pack(TRADE, side, 0, symbol, 0, report.timestamp, trade_id, maker_order_id, taker_order_id,
+                    to_fixed(price), to_fixed(quantity))
+        for trade_id, price, quantity, maker_order_id
+        in zip(report.trade_ids, report.prices, report.quantities, report.maker_order_ids)
+    )
+
+class AuditLog:
+    """
+    Structured binary audit stream of every inbound event and trade, kept
+    apart from the text logs. Engine listeners only enqueue the event or
+    trade; packing and disk writes happen on a background thread, so the
+    matching thread never waits on I/O. Call close() to drain and flush.
+    """
+
+    def __init__(self, engine, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.queue = queue.SimpleQueue()
+        self.logger = logging.getLogger(__name__)
+        self.writer = threading.Thread(target=self._run, name="audit-log", daemon=True)
+        self.writer.start()
+        engine.add_event_listener(self.queue.put)
+        if engine.execution_reports:
+            engine.add_execution_listener(self.queue.put)
+        else:
+            engine.add_trade_listener(self.queue.put)
+
+    def _run(self):
+        with open(self.path, "ab") as f:
+            while True:
+                item = self.queue.get()
+                batch = []
+                while True:
+                    if item is _STOP:
+                        self._write(f, batch)
+                        return
+                    try:
+                        if isinstance(item, Trade):
+                            batch.append(_pack_trade(item))
+                        elif isinstance(item, ExecutionReport):
+                            batch.append(_pack_report(item))
+                        else:
+                            batch.append(_pack_event(item))
+                    except Exception:
+                        # One bad record must not stop the writer; later records still get written
+                        self.logger.exception("Could not write audit record")
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                # Flush once the queue runs dry rather than per record
+                self._write(f, batch)
+
+    def _write(self, f, batch: list):
+        try:
+            f.write(b"".join(batch))
+            f.flush()
+        except OSError:
+            # e.g. a full disk: drop this batch and keep draining the queue so the engine never backs up
+            self.logger.exception("Could not write %s audit records", len(batch))
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.writer.join()
+
+def read_audit_log(path: str):
+    """Yield decoded audit records as dicts"""
+    with open(path, "rb") as f:
+        data = f.read()
+    for (record_type, side, order_type, symbol, seq, timestamp, id_a, id_b, id_c,
+         price, quantity) in RECORD.iter_unpack(data):
+        yield {
+            "type": record_type,
+            "side": SIDES[side].value if record_type in (ORDER, TRADE) else None,
+            "order_type": ORDER_TYPES[order_type].value if record_type == ORDER else None,
+            "symbol": symbol.rstrip(b"\0").decode(),
+            "seq": seq,
+            "timestamp": timestamp,
+            "ids": (id_a, id_b, id_c),
+            "price": price,
+            "quantity": quantity
+        }
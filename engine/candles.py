@@ -0,0 +1,140 @@
+from decimal import Decimal
+from .models import Trade
+from .sequencer import ns_to_iso
+import logging
+import threading
+
+NS_PER_SECOND = 1_000_000_000
+
+# Interval name -> bar length in seconds
+DEFAULT_INTERVALS = {
+    "1s": 1,
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600
+}
+
+class Candle:
+    __slots__ = ("start", "open", "high", "low", "close", "volume", "notional", "trade_count")
+
+    def reset(self, start: int, price: Decimal, quantity: Decimal):
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = quantity
+        self.notional = price * quantity
+        self.trade_count = 1
+
+    def update(self, price: Decimal, quantity: Decimal):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += quantity
+        self.notional += price * quantity
+        self.trade_count += 1
+
+    @property
+    def vwap(self) -> Decimal:
+        return self.notional / self.volume
+
+    def to_dict(self) -> dict:
+        return {
+            "start": ns_to_iso(self.start),
+            "open": str(self.open),
+            "high": str(self.high),
+            "low": str(self.low),
+            "close": str(self.close),
+            "volume": str(self.volume),
+            "vwap": str(self.vwap),
+            "trade_count": self.trade_count
+        }
+
+class CandleSeries:
+    """Fixed-size ring buffer of bars for one symbol and interval; Candle slots are reused"""
+
+    def __init__(self, interval_ns: int, capacity: int):
+        self.interval_ns = interval_ns
+        self.capacity = capacity
+        self.bars = [Candle() for _ in range(capacity)]
+        self.head = -1  # Index of the newest bar
+        self.count = 0
+
+    def update(self, timestamp: int, price: Decimal, quantity: Decimal) -> Candle:
+        start = timestamp - timestamp % self.interval_ns
+        if self.count and start <= self.bars[self.head].start:
+            # Same bar (trades never go back in time on the engine clock)
+            bar = self.bars[self.head]
+            bar.update(price, quantity)
+            return bar
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        bar = self.bars[self.head]
+        bar.reset(start, price, quantity)
+        return bar
+
+    def latest(self, limit: int) -> list:
+        """Newest `limit` bars, oldest first, in O(limit)"""
+        n = min(limit, self.count)
+        return [self.bars[(self.head - i) % self.capacity] for i in range(n - 1, -1, -1)]
+
+class CandleAggregator:
+    """
+    Trade listener that keeps OHLCV + VWAP bars incrementally for several
+    intervals per symbol. Register with MatchingEngine.add_trade_listener(aggregator.on_trade),
+    or add_execution_listener(aggregator.on_execution) when the engine produces execution reports.
+    Bar listeners are called with (symbol, interval, candle) on every update.
+    Bars are updated in place by the trade listener's thread and read by API
+    handlers, so both hold `lock`; bar listeners run on the writer thread, outside it.
+    """
+
+    def __init__(self, intervals: dict = None, capacity: int = 1000):
+        self.intervals = {name: seconds * NS_PER_SECOND
+                          for name, seconds in (intervals or DEFAULT_INTERVALS).items()}
+        self.capacity = capacity
+        self.series = {}  # symbol -> {interval name -> CandleSeries}
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def _series_for(self, symbol: str) -> dict:
+        series = self.series.get(symbol)
+        if series is None:
+            series = self.series[symbol] = {name: CandleSeries(interval_ns, self.capacity)
+                                            for name, interval_ns in self.intervals.items()}
+        return series
+
+    def on_trade(self, trade: Trade):
+        with self.lock:
+            bars = [(interval, series.update(trade.timestamp, trade.price, trade.quantity))
+                    for interval, series in self._series_for(trade.symbol).items()]
+        for interval, bar in bars:
+            for listener in self.listeners:
+                listener(trade.symbol, interval, bar)
+
+    def on_execution(self, report):
+        """All fills of an ExecutionReport, read from its columns; bar listeners hear once per report"""
+        if not report.prices:
+            return
+        timestamp = report.timestamp
+        bars = []
+        with self.lock:
+            for interval, series in self._series_for(report.symbol).items():
+                for price, quantity in zip(report.prices, report.quantities):
+                    bar = series.update(timestamp, price, quantity)
+                bars.append((interval, bar))
+        for interval, bar in bars:
+            for listener in self.listeners:
+                listener(report.symbol, interval, bar)
+
+    def get_candles(self, symbol: str, interval: str, limit: int = 100) -> list:
+        if interval not in self.intervals:
+            raise ValueError(f"Unknown candle interval: {interval}")
+        with self.lock:
+            series = self.series.get(symbol)
+            if not series:
+                return []
+            return [bar.to_dict() for bar in series[interval].latest(limit)]
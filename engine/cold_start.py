@@ -0,0 +1,75 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules an engine-only process must never load: the web stack and analytics dependencies
+HEAVY_MODULES = ("fastapi", "starlette", "uvicorn", "websockets", "httpx", "orjson", "numpy")
+
+# Run in a fresh interpreter: module to import, whether it may load HEAVY_MODULES, and a median budget (ms)
+# for import plus the first two orders, generous enough for a loaded CI machine
+TARGETS = {
+    "engine": ("engine.matching_engine", False, 600),
+    "replay": ("engine.replication", False, 600),
+    "gateway": ("api.binary_gateway", False, 700),
+    "app": ("main", True, 2000)
+}
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+t1 = time.perf_counter()
+from decimal import Decimal
+from engine.matching_engine import MatchingEngine
+from engine.models import Order, OrderType, OrderSide
+engine = MatchingEngine()
+engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                           quantity=Decimal("1"), price=Decimal("50000")))
+engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY,
+                           quantity=Decimal("1")))
+t2 = time.perf_counter()
+print(json.dumps({{"import_ms": (t1 - t0) * 1000, "first_order_ms": (t2 - t0) * 1000,
+                  "heavy": sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+def probe(module: str) -> dict:
+    """Import time, time to the first trade (both from interpreter start of the import) and heavy modules loaded"""
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    output = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                            capture_output=True, text=True, check=True, cwd=REPO_ROOT, env=env).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def measure(target: str, runs: int = 5) -> dict:
+    module, heavy_allowed, budget_ms = TARGETS[target]
+    samples = [probe(module) for _ in range(runs)]
+    first_order = [s["first_order_ms"] for s in samples]
+    heavy = samples[-1]["heavy"]
+    return {
+        "module": module,
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "first_order_ms": statistics.median(first_order),
+        "first_order_ms_max": max(first_order),
+        "budget_ms": budget_ms,
+        "heavy_modules": heavy,
+        "ok": statistics.median(first_order) <= budget_ms and (heavy_allowed or not heavy)
+    }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Cold-start import and time-to-first-order check")
+    parser.add_argument("targets", nargs="*", help=f"Any of {', '.join(TARGETS)} (default: all)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a target is over budget or loads heavy modules")
+    args = parser.parse_args()
+    unknown = set(args.targets) - TARGETS.keys()
+    if unknown:
+        parser.error(f"Unknown targets: {', '.join(sorted(unknown))}")
+    report = {target: measure(target, args.runs) for target in args.targets or TARGETS}
+    print(json.dumps(report, indent=2))
+    if args.check and not all(result["ok"] for result in report.values()):
+        sys.exit(1)
@@ -0,0 +1,327 @@
+from array import array
+from decimal import Decimal
+from sortedcontainers import SortedDict
+from .fixed_point import to_fixed, from_fixed
+from .models import Order, OrderType, OrderSide
+from .peg_book import PegBook
+import logging
+
+_NIL = -1
+_BUY = 0
+_SELL = 1
+_SIDES = (OrderSide.BUY, OrderSide.SELL)
+
+class _OrderPool:
+    """
+    Struct-of-arrays storage for resting orders. Each order is one slot across
+    the column arrays (8 bytes per column); freed slots are chained through
+    the `next` column and reused before the arrays grow.
+    """
+
+    def __init__(self):
+        self.order_id = array('q')
+        self.quantity = array('q')  # Fixed-point, see fixed_point.SCALE
+        self.price = array('q')
+        self.timestamp = array('q')
+        self.parent_id = array('q')  # 0 when the order has no parent
+        self.side = array('b')
+        self.next = array('q')  # Next slot in the level queue, or in the free list
+        self.user_id = []  # Owner or None; a reference per slot, the strings themselves are shared
+        self.free_head = _NIL
+        self.size = 0
+
+    def allocate(self, order_id: int, quantity: int, price: int, timestamp: int, parent_id: int, side: int,
+                 user_id: str = None) -> int:
+        if self.free_head != _NIL:
+            slot = self.free_head
+            self.free_head = self.next[slot]
+            self.order_id[slot] = order_id
+            self.quantity[slot] = quantity
+            self.price[slot] = price
+            self.timestamp[slot] = timestamp
+            self.parent_id[slot] = parent_id
+            self.side[slot] = side
+            self.next[slot] = _NIL
+            self.user_id[slot] = user_id
+        else:
+            slot = len(self.order_id)
+            self.order_id.append(order_id)
+            self.quantity.append(quantity)
+            self.price.append(price)
+            self.timestamp.append(timestamp)
+            self.parent_id.append(parent_id)
+            self.side.append(side)
+            self.next.append(_NIL)
+            self.user_id.append(user_id)
+        self.size += 1
+        return slot
+
+    def free(self, slot: int):
+        self.next[slot] = self.free_head
+        self.free_head = slot
+        self.user_id[slot] = None
+        self.size -= 1
+
+class _PooledOrder:
+    """Lightweight view of one pool slot that quacks like a resting Order"""
+    __slots__ = ("book", "slot")
+
+    order_type = OrderType.LIMIT
+    stop_price = None
+    take_profit_price = None
+
+    def __init__(self, book, slot: int):
+        self.book = book
+        self.slot = slot
+
+    @property
+    def symbol(self) -> str:
+        return self.book.symbol
+
+    @property
+    def order_id(self) -> int:
+        return self.book.pool.order_id[self.slot]
+
+    @property
+    def quantity(self) -> Decimal:
+        return from_fixed(self.book.pool.quantity[self.slot])
+
+    @quantity.setter
+    def quantity(self, value: Decimal):
+        self.book.pool.quantity[self.slot] = to_fixed(value)
+
+    @property
+    def price(self) -> Decimal:
+        return from_fixed(self.book.pool.price[self.slot])
+
+    @property
+    def side(self) -> OrderSide:
+        return _SIDES[self.book.pool.side[self.slot]]
+
+    @property
+    def timestamp(self) -> int:
+        return self.book.pool.timestamp[self.slot]
+
+    @property
+    def parent_order_id(self) -> int | None:
+        return self.book.pool.parent_id[self.slot] or None
+
+    @property
+    def user_id(self) -> str | None:
+        return self.book.pool.user_id[self.slot]
+
+    def to_order(self) -> Order:
+        return Order(
+            order_id=self.order_id,
+            symbol=self.symbol,
+            order_type=OrderType.LIMIT,
+            side=self.side,
+            quantity=self.quantity,
+            price=self.price,
+            timestamp=self.timestamp,
+            parent_order_id=self.parent_order_id,
+            user_id=self.user_id
+        )
+
+class _CompactLevel:
+    """FIFO queue of pool slots at one price, linked through the pool's `next` column"""
+    __slots__ = ("book", "head", "tail", "count")
+
+    def __init__(self, book):
+        self.book = book
+        self.head = _NIL
+        self.tail = _NIL
+        self.count = 0
+
+    def append(self, slot: int):
+        if self.tail == _NIL:
+            self.head = slot
+        else:
+            self.book.pool.next[self.tail] = slot
+        self.tail = slot
+        self.count += 1
+
+    def popleft(self) -> int:
+        slot = self.head
+        if slot == _NIL:
+            raise IndexError("pop from an empty level")
+        self.head = self.book.pool.next[slot]
+        if self.head == _NIL:
+            self.tail = _NIL
+        self.count -= 1
+        return slot
+
+    def unlink(self, slot: int) -> bool:
+        pool = self.book.pool
+        prev, cur = _NIL, self.head
+        while cur != _NIL:
+            if cur == slot:
+                if prev == _NIL:
+                    self.head = pool.next[cur]
+                else:
+                    pool.next[prev] = pool.next[cur]
+                if self.tail == cur:
+                    self.tail = prev
+                self.count -= 1
+                return True
+            prev, cur = cur, pool.next[cur]
+        return False
+
+    def slots(self):
+        next_slots = self.book.pool.next
+        slot = self.head
+        while slot != _NIL:
+            yield slot
+            slot = next_slots[slot]
+
+    def total_quantity(self) -> int:
+        quantities = self.book.pool.quantity
+        return sum(quantities[slot] for slot in self.slots())
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __getitem__(self, index: int) -> _PooledOrder:
+        if index == 0 and self.head != _NIL:
+            return _PooledOrder(self.book, self.head)
+        for i, slot in enumerate(self.slots()):
+            if i == index:
+                return _PooledOrder(self.book, slot)
+        raise IndexError("level index out of range")
+
+    def __iter__(self):
+        for slot in self.slots():
+            yield _PooledOrder(self.book, slot)
+
+class CompactOrderBook:
+    """
+    Drop-in replacement for OrderBook that keeps resting orders in a
+    struct-packed pool instead of one pydantic Order per order. Price levels
+    are still SortedDicts keyed by Decimal price, but each level only holds
+    head/tail slot indexes, so a resting order costs a few dozen bytes.
+    Stop and take-profit orders are rare and stay as regular Order objects.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.pool = _OrderPool()
+        self.bids = SortedDict(lambda x: -x)  # Descending prices
+        self.asks = SortedDict()  # Ascending prices
+        self.stop_orders = []
+        self.take_profit_orders = []
+        self.logger = logging.getLogger(__name__)
+        self.order_map = {}  # order_id -> pool slot
+        self.depth = None  # BucketedDepth when the engine maintains grouped depth
+        self.level_totals = None  # LevelTotals once a publisher needs per-level quantities
+        self.digest = None  # BookDigest when the engine journals or follows a journal
+        self.pegs = PegBook()  # Pegged orders, priced from this book's best bid and ask
+
+    def add_order(self, order: Order):
+        book = self.bids if order.side == OrderSide.BUY else self.asks
+        price = order.price
+        # Allocate first: to_fixed raises on values the pool cannot hold, and must not leave an empty level
+        slot = self.pool.allocate(
+            order.order_id,
+            to_fixed(order.quantity),
+            to_fixed(price),
+            order.timestamp or 0,
+            order.parent_order_id or 0,
+            _BUY if order.side == OrderSide.BUY else _SELL,
+            order.user_id
+        )
+        level = book.get(price)
+        if level is None:
+            level = book[price] = _CompactLevel(self)
+        level.append(slot)
+        self.order_map[order.order_id] = slot
+        if self.depth is not None:
+            self.depth.update(order.side, price, order.quantity)
+        if self.level_totals is not None:
+            self.level_totals.update(order.side, price, order.quantity)
+        if self.digest is not None:
+            self.digest.update(order.side, price, order.order_id, 0, order.quantity)
+
+    def add_stop_order(self, order: Order):
+        self.stop_orders.append(order)
+        self.stop_orders.sort(key=lambda o: o.stop_price,
+                              reverse=(order.side == OrderSide.SELL))
+
+    def add_take_profit_order(self, order: Order):
+        self.take_profit_orders.append(order)
+        self.take_profit_orders.sort(key=lambda o: o.take_profit_price,
+                                     reverse=(order.side == OrderSide.BUY))
+
+    def remove_order(self, price: Decimal, order_id: int, side: OrderSide):
+        book = self.bids if side == OrderSide.BUY else self.asks
+        slot = self.order_map.get(order_id)
+        level = book.get(price)
+        if slot is None or level is None or not level.unlink(slot):
+            return False
+        del self.order_map[order_id]
+        if self.depth is not None:
+            self.depth.update(side, price, -from_fixed(self.pool.quantity[slot]))
+        if self.level_totals is not None:
+            self.level_totals.update(side, price, -from_fixed(self.pool.quantity[slot]))
+        if self.digest is not None:
+            self.digest.update(side, price, order_id, from_fixed(self.pool.quantity[slot]), 0)
+        self.pool.free(slot)
+        if not level:
+            del book[price]
+        return True
+
+    def get_order(self, order_id: int):
+        """Resting order by ID, or None"""
+        slot = self.order_map.get(order_id)
+        return _PooledOrder(self, slot) if slot is not None else None
+
+    def cancel_order(self, order_id: int) -> bool:
+        """Remove a live order by ID alone: resting orders via order_map, then pegged orders, then the trigger lists"""
+        slot = self.order_map.get(order_id)
+        if slot is not None:
+            return self.remove_order(from_fixed(self.pool.price[slot]), order_id, _SIDES[self.pool.side[slot]])
+        if self.pegs.remove(order_id) is not None:
+            return True
+        for orders in (self.stop_orders, self.take_profit_orders):
+            for order in orders:
+                if order.order_id == order_id:
+                    orders.remove(order)
+                    return True
+        return False
+
+    def reduce_order(self, order: _PooledOrder, quantity: Decimal):
+        """Take quantity off a resting order (a fill or an amend down); the caller removes it once empty"""
+        order.quantity -= quantity
+        if self.depth is not None:
+            self.depth.update(order.side, order.price, -quantity)
+        if self.level_totals is not None:
+            self.level_totals.update(order.side, order.price, -quantity)
+        if self.digest is not None:
+            self.digest.update(order.side, order.price, order.order_id, order.quantity + quantity, order.quantity)
+
+    def remove_filled(self, book: SortedDict, price: Decimal):
+        """Drop the fully filled order at the head of a level, and the level once empty"""
+        level = book[price]
+        slot = level.popleft()
+        del self.order_map[self.pool.order_id[slot]]
+        self.pool.free(slot)
+        if not level:
+            del book[price]
+
+    @property
+    def best_bid(self) -> Decimal | None:
+        return self.bids.peekitem(0)[0] if self.bids else None
+
+    @property
+    def best_ask(self) -> Decimal | None:
+        return self.asks.peekitem(0)[0] if self.asks else None
+
+    def get_depth(self, levels: int = 10) -> dict:
+        return {
+            "bids": [(str(price), str(from_fixed(level.total_quantity())))
+                     for price, level in self.bids.items()[:levels]],
+            "asks": [(str(price), str(from_fixed(level.total_quantity())))
+                     for price, level in self.asks.items()[:levels]]
+        }
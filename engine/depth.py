@@ -0,0 +1,90 @@
+from decimal import Decimal
+from sortedcontainers import SortedDict
+from .models import OrderSide
+
+class BucketedDepth:
+    """
+    Resting quantity per price bucket at a few fixed resolutions ("groups"),
+    kept up to date by the order book on every quantity change, so grouped
+    and cumulative depth never rescan the raw price levels. Bids are
+    grouped down and asks up to a multiple of the group, so a bucket never
+    looks better than the orders in it.
+    """
+
+    MAX_CACHED_PRICES = 100_000
+
+    def __init__(self, groups):
+        self.groups = sorted({Decimal(group) for group in groups})
+        if not self.groups or self.groups[0] <= 0:
+            raise ValueError("Depth groups must be positive")
+        self.bids = {group: SortedDict(lambda x: -x) for group in self.groups}  # Descending buckets
+        self.asks = {group: SortedDict() for group in self.groups}
+        self.bid_books = [self.bids[group] for group in self.groups]  # In group order, for update
+        self.ask_books = [self.asks[group] for group in self.groups]
+        self.bucket_keys = {}  # price -> ([bid bucket per group], [ask bucket per group])
+
+    def _keys(self, price: Decimal) -> tuple:
+        """Bid and ask bucket of price at each group, cached: books revisit the same prices constantly"""
+        keys = self.bucket_keys.get(price)
+        if keys is None:
+            if len(self.bucket_keys) >= self.MAX_CACHED_PRICES:
+                self.bucket_keys.clear()
+            keys = self.bucket_keys[price] = (
+                [(price / group).__floor__() * group for group in self.groups],
+                [(price / group).__ceil__() * group for group in self.groups]
+            )
+        return keys
+
+    def update(self, side: OrderSide, price: Decimal, delta: Decimal):
+        """Add delta (negative to remove) to the bucket holding price at every group"""
+        bid_keys, ask_keys = self._keys(price)
+        if side == OrderSide.BUY:
+            books, keys = self.bid_books, bid_keys
+        else:
+            books, keys = self.ask_books, ask_keys
+        for buckets, key in zip(books, keys):
+            quantity = buckets.get(key, 0) + delta
+            if quantity > 0:
+                buckets[key] = quantity
+            else:
+                del buckets[key]
+
+    def get(self, group, levels: int = 10, cumulative: bool = False) -> dict:
+        """Best `levels` buckets per side as (price, quantity) pairs, or (price, quantity, total) if cumulative"""
+        group = Decimal(group)
+        if group not in self.bids:
+            raise ValueError(f"Depth group {group} is not maintained; available: {', '.join(map(str, self.groups))}")
+        result = {}
+        for name, buckets in (("bids", self.bids[group]), ("asks", self.asks[group])):
+            rows = []
+            total = Decimal("0")
+            for price, quantity in buckets.items()[:levels]:
+                if cumulative:
+                    total += quantity
+                    rows.append((str(price), str(quantity), str(total)))
+                else:
+                    rows.append((str(price), str(quantity)))
+            result[name] = rows
+        return result
+
+class LevelTotals:
+    """
+    Resting quantity at each exact price, kept up to date by the order book
+    alongside BucketedDepth, so top-of-book publishers read a level's total
+    instead of summing its orders. Built from a scan of the book it is
+    attached to.
+    """
+
+    def __init__(self, order_book):
+        self.bids = {price: sum((o.quantity for o in orders), Decimal("0"))
+                     for price, orders in order_book.bids.items()}
+        self.asks = {price: sum((o.quantity for o in orders), Decimal("0"))
+                     for price, orders in order_book.asks.items()}
+
+    def update(self, side: OrderSide, price: Decimal, delta: Decimal):
+        totals = self.bids if side == OrderSide.BUY else self.asks
+        quantity = totals.get(price, 0) + delta
+        if quantity > 0:
+            totals[price] = quantity
+        else:
+            totals.pop(price, None)
@@ -0,0 +1,149 @@
+from decimal import Decimal
+from .models import Order, Trade
+
+class FillBuffer:
+    """
+    Preallocated parallel arrays the match loop writes fills into, so a
+    sweep costs four list stores per fill instead of a Trade model and a
+    round of listener calls. Reused for every taker order; grows by
+    doubling if one order sweeps more levels than it has room for.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.trade_ids = [0] * capacity
+        self.prices = [None] * capacity
+        self.quantities = [None] * capacity
+        self.maker_order_ids = [0] * capacity
+        self.count = 0
+
+    def append(self, trade_id: int, price: Decimal, quantity: Decimal, maker_order_id: int):
+        i = self.count
+        if i == self.capacity:
+            self.trade_ids.extend([0] * i)
+            self.prices.extend([None] * i)
+            self.quantities.extend([None] * i)
+            self.maker_order_ids.extend([0] * i)
+            self.capacity *= 2
+        self.trade_ids[i] = trade_id
+        self.prices[i] = price
+        self.quantities[i] = quantity
+        self.maker_order_ids[i] = maker_order_id
+        self.count = i + 1
+
+class ExecutionReport:
+    """
+    All fills of one taker order: totals, average price and fills grouped
+    by price level, with per-fill detail kept for callers that ask for it.
+    It also behaves as the list of the order's trades (len, iteration),
+    which are only built as Trade models when someone iterates.
+    """
+
+    __slots__ = ("symbol", "order_id", "side", "timestamp", "remaining_quantity", "fee_config",
+                 "trade_ids", "prices", "quantities", "maker_order_ids", "levels",
+                 "filled_quantity", "notional", "_trades")
+
+    def __init__(self, order: Order, timestamp: int, fee_config: dict, trade_ids: list, prices: list,
+                 quantities: list, maker_order_ids: list, trades: list = None):
+        self.symbol = order.symbol
+        self.order_id = order.order_id
+        self.side = order.side
+        self.timestamp = timestamp
+        self.remaining_quantity = order.quantity
+        self.fee_config = fee_config
+        self.trade_ids = trade_ids
+        self.prices = prices
+        self.quantities = quantities
+        self.maker_order_ids = maker_order_ids
+        self._trades = trades
+        # Fills arrive level by level, so one pass groups them
+        levels = []  # [price, quantity, fills]
+        filled = notional = Decimal("0")
+        for price, quantity in zip(prices, quantities):
+            if levels and levels[-1][0] == price:
+                level = levels[-1]
+                level[1] += quantity
+                level[2] += 1
+            else:
+                levels.append([price, quantity, 1])
+            filled += quantity
+            notional += price * quantity
+        self.levels = levels
+        self.filled_quantity = filled
+        self.notional = notional
+
+    @classmethod
+    def from_buffer(cls, order: Order, timestamp: int, fee_config: dict, fills: FillBuffer) -> "ExecutionReport":
+        """Copy the buffer's fills out and reset it for the next taker order"""
+        count = fills.count
+        fills.count = 0
+        return cls(order, timestamp, fee_config, fills.trade_ids[:count], fills.prices[:count],
+                   fills.quantities[:count], fills.maker_order_ids[:count])
+
+    @classmethod
+    def from_trades(cls, order: Order, trades: list, fee_config: dict = None) -> "ExecutionReport":
+        """Report over trades already built by the per-fill path"""
+        fee_config = fee_config or {"maker_fee": Decimal("0"), "taker_fee": Decimal("0"), "fee_currency": "USDT"}
+        return cls(order, trades[0].timestamp if trades else order.timestamp, fee_config,
+                   [t.trade_id for t in trades], [t.price for t in trades],
+                   [t.quantity for t in trades], [t.maker_order_id for t in trades], trades=list(trades))
+
+    def __len__(self) -> int:
+        return len(self.trade_ids)
+
+    def __iter__(self):
+        return iter(self.trades())
+
+    @property
+    def average_price(self) -> Decimal | None:
+        return self.notional / self.filled_quantity if self.filled_quantity else None
+
+    @property
+    def last_price(self) -> Decimal | None:
+        return self.prices[-1] if self.prices else None
+
+    @property
+    def taker_fee(self) -> Decimal:
+        if self._trades is not None:
+            return sum((t.taker_fee for t in self._trades), Decimal("0"))
+        return sum((p * q * self.fee_config["taker_fee"] for p, q in zip(self.prices, self.quantities)), Decimal("0"))
+
+    def trades(self) -> list:
+        """The fills as Trade models, identical to what the per-fill path produces"""
+        if self._trades is None:
+            maker_fee, taker_fee = self.fee_config["maker_fee"], self.fee_config["taker_fee"]
+            self._trades = [
+                Trade(
+                    trade_id=trade_id,
+                    timestamp=self.timestamp,
+                    symbol=self.symbol,
+                    price=price,
+                    quantity=quantity,
+                    aggressor_side=self.side,
+                    maker_order_id=maker_order_id,
+                    taker_order_id=self.order_id,
+                    maker_fee=quantity * price * maker_fee,
+                    taker_fee=quantity * price * taker_fee,
+                    fee_currency=self.fee_config["fee_currency"]
+                )
+                for trade_id, price, quantity, maker_order_id
+                in zip(self.trade_ids, self.prices, self.quantities, self.maker_order_ids)
+            ]
+        return self._trades
+
+    def summary(self) -> dict:
+        """Compact JSON-ready summary: totals and per-level fills, no per-fill detail"""
+        return {
+            "symbol": self.symbol,
+            "order_id": str(self.order_id),
+            "side": self.side.value,
+            "filled_quantity": str(self.filled_quantity),
+            "remaining_quantity": str(self.remaining_quantity),
+            "average_price": str(self.average_price) if self.filled_quantity else None,
+            "fill_count": len(self.trade_ids),
+            "first_trade_id": str(self.trade_ids[0]) if self.trade_ids else None,
+            "last_trade_id": str(self.trade_ids[-1]) if self.trade_ids else None,
+            "taker_fee": str(self.taker_fee),
+            "fee_currency": self.fee_config["fee_currency"],
+            "levels": [{"price": str(p), "quantity": str(q), "fills": n} for p, q, n in self.levels]
+        }
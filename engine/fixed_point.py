@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+# Prices and quantities are stored as integers scaled by 10^8 wherever a
+# compact or binary representation is needed (satoshi precision)
+DECIMALS = 8
+SCALE = 10 ** DECIMALS
+MAX_FIXED = 2 ** 63 - 1  # Fixed-point values are packed as signed 64-bit integers
+_QUANTUM = Decimal(1).scaleb(-DECIMALS)
+_MAX_VALUE = Decimal(MAX_FIXED).scaleb(-DECIMALS)
+
+def to_fixed(value: Decimal) -> int:
+    scaled = Decimal(value).scaleb(DECIMALS)
+    fixed = int(scaled)
+    if fixed != scaled:
+        raise ValueError(f"{value} has more than {DECIMALS} decimal places")
+    return fixed
+
+def from_fixed(value: int) -> Decimal:
+    return Decimal(value).scaleb(-DECIMALS)
+
+def is_fixed(value: Decimal) -> bool:
+    """Whether value is exactly representable: at most DECIMALS places and within 64 bits once scaled"""
+    # Range first: quantize needs the result to fit the context precision
+    return value.is_finite() and -_MAX_VALUE <= value <= _MAX_VALUE and value == value.quantize(_QUANTUM)
+
+def check_fixed(value: Decimal, name: str):
+    """Reject a value fixed-point records (trade log, audit log, compact book) could not hold"""
+    if value is not None and not is_fixed(value):
+        raise ValueError(f"{name} {value} must have at most {DECIMALS} decimal places "
+                         f"and be at most {_MAX_VALUE} in size")
+
+def round_fixed(value: Decimal) -> Decimal:
+    """value rounded to DECIMALS places, if it has more"""
+    if value.as_tuple().exponent >= -DECIMALS:
+        return value
+    return value.quantize(_QUANTUM)
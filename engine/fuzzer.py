@@ -0,0 +1,288 @@
+import random
+import time
+from decimal import Decimal
+from .models import Order, OrderType, OrderSide
+from .matching_engine import MatchingEngine
+from .order_book import OrderBook
+from .compact_order_book import CompactOrderBook
+from .risk import RiskManager, RiskLimits
+
+SYMBOL = "FUZZ-USDT"
+
+# Engine configurations checked against the reference; add new backends here
+CONFIGURATIONS = {
+    "order_book": lambda: MatchingEngine(order_book_factory=OrderBook),
+    "compact_order_book": lambda: MatchingEngine(order_book_factory=CompactOrderBook),
+    "execution_reports": lambda: MatchingEngine(execution_reports=True),
+    # Limits every generated order passes, so the risk stage runs without changing any outcome
+    "risk_checks": lambda: MatchingEngine(risk=RiskManager(RiskLimits(max_order_quantity=Decimal("100"),
+                                                                      max_order_notional=Decimal("100000"))))
+}
+
+class ReferenceMatcher:
+    """
+    Deliberately simple executable spec of MatchingEngine's continuous
+    matching: flat lists scanned linearly for the best price and earliest
+    arrival, no indexes, no fixed-point. It covers limit, market, IOC, FOK,
+    stop, stop-limit and take-profit orders, cancels, amends and market
+    price updates, including the order in which triggers fire.
+    """
+
+    def __init__(self):
+        self.resting = {OrderSide.BUY: [], OrderSide.SELL: []}  # [price, order_id, quantity, arrival]
+        self.stop_orders = []  # Order copies, in the engine's trigger order
+        self.take_profit_orders = []
+        self.trades = []  # (trade_id, price, quantity, aggressor_side, maker_order_id, taker_order_id)
+        self.last_price = None
+        self.next_order_id = 1
+        self.arrivals = 0
+
+    def _best(self, side: OrderSide):
+        entries = self.resting[side]
+        if not entries:
+            return None
+        if side == OrderSide.BUY:
+            return min(entries, key=lambda e: (-e[0], e[3]))
+        return min(entries, key=lambda e: (e[0], e[3]))
+
+    def _crosses(self, order: Order, price: Decimal) -> bool:
+        if order.order_type == OrderType.MARKET or order.price is None:
+            return True
+        return order.price >= price if order.side == OrderSide.BUY else order.price <= price
+
+    def _rest(self, order: Order):
+        self.arrivals += 1
+        self.resting[order.side].append([order.price, order.order_id, order.quantity, self.arrivals])
+
+    def process_order(self, order: Order):
+        if order.order_id is None:
+            order.order_id = self.next_order_id
+            self.next_order_id += 1
+        if order.order_type in (OrderType.STOP_LOSS, OrderType.STOP_LIMIT):
+            self.stop_orders.append(order)
+            self.stop_orders.sort(key=lambda o: o.stop_price, reverse=(order.side == OrderSide.SELL))
+            return
+        if order.order_type == OrderType.TAKE_PROFIT:
+            self.take_profit_orders.append(order)
+            self.take_profit_orders.sort(key=lambda o: o.take_profit_price, reverse=(order.side == OrderSide.BUY))
+            return
+        opposite = OrderSide.SELL if order.side == OrderSide.BUY else OrderSide.BUY
+        if order.order_type == OrderType.FOK:
+            available = sum(e[2] for e in self.resting[opposite] if self._crosses(order, e[0]))
+            if available < order.quantity:
+                return
+        traded = False
+        while order.quantity > 0:
+            best = self._best(opposite)
+            if best is None or not self._crosses(order, best[0]):
+                break
+            quantity = min(order.quantity, best[2])
+            self.trades.append((len(self.trades) + 1, best[0], quantity, order.side, best[1], order.order_id))
+            self.last_price = best[0]
+            traded = True
+            order.quantity -= quantity
+            best[2] -= quantity
+            if best[2] <= 0:
+                self.resting[opposite].remove(best)
+        if order.quantity > 0 and order.order_type == OrderType.LIMIT:
+            self._rest(order)
+        if traded:
+            self._check_triggers()
+
+    def _check_triggers(self):
+        last_price = self.last_price
+        if not last_price:
+            return
+        for stop in list(self.stop_orders):
+            if stop not in self.stop_orders:
+                continue
+            if (stop.side == OrderSide.BUY and last_price >= stop.stop_price) or \
+               (stop.side == OrderSide.SELL and last_price <= stop.stop_price):
+                self.stop_orders.remove(stop)
+                limit = stop.order_type == OrderType.STOP_LIMIT
+                self.process_order(Order(symbol=stop.symbol, side=stop.side, quantity=stop.quantity,
+                                         order_type=OrderType.LIMIT if limit else OrderType.MARKET,
+                                         price=stop.price if limit else None))
+        for tp in list(self.take_profit_orders):
+            if tp not in self.take_profit_orders:
+                continue
+            if (tp.side == OrderSide.BUY and last_price <= tp.take_profit_price) or \
+               (tp.side == OrderSide.SELL and last_price >= tp.take_profit_price):
+                self.take_profit_orders.remove(tp)
+                self.process_order(Order(symbol=tp.symbol, side=tp.side, quantity=tp.quantity,
+                                         order_type=OrderType.LIMIT, price=tp.price or tp.take_profit_price))
+
+    def update_market_price(self, price: Decimal):
+        self.last_price = price
+        self._check_triggers()
+
+    def _find(self, order_id: int):
+        for side, entries in self.resting.items():
+            for entry in entries:
+                if entry[1] == order_id:
+                    return side, entry
+        return None, None
+
+    def cancel_order(self, order_id: int) -> bool:
+        side, entry = self._find(order_id)
+        if entry is not None:
+            self.resting[side].remove(entry)
+            return True
+        for orders in (self.stop_orders, self.take_profit_orders):
+            for order in orders:
+                if order.order_id == order_id:
+                    orders.remove(order)
+                    return True
+        return False
+
+    def amend_order(self, order_id: int, quantity: Decimal, price: Decimal = None):
+        side, entry = self._find(order_id)
+        if entry is None:
+            raise ValueError(f"Order {order_id} is not resting")
+        if quantity <= 0:
+            raise ValueError("Order quantity must be positive")
+        if (price is None or price == entry[0]) and quantity < entry[2]:
+            entry[2] = quantity
+            return
+        self.resting[side].remove(entry)
+        self.process_order(Order(order_id=order_id, symbol=SYMBOL, order_type=OrderType.LIMIT, side=side,
+                                 quantity=quantity, price=price if price is not None else entry[0]))
+
+    def book_state(self) -> dict:
+        bids = sorted(self.resting[OrderSide.BUY], key=lambda e: (-e[0], e[3]))
+        asks = sorted(self.resting[OrderSide.SELL], key=lambda e: (e[0], e[3]))
+        return {
+            "bids": [(e[0], e[1], e[2]) for e in bids],
+            "asks": [(e[0], e[1], e[2]) for e in asks],
+            "stop_orders": [(o.order_id, o.quantity) for o in self.stop_orders],
+            "take_profit_orders": [(o.order_id, o.quantity) for o in self.take_profit_orders]
+        }
+
+def generate_flow(seed: int, num_events: int) -> list:
+    """Seeded order flow around a narrow price range, so most orders interact"""
+    rng = random.Random(seed)
+    flow = []
+    issued = 0
+    def price():
+        return Decimal(rng.randint(190, 210)) / 2
+    def quantity():
+        return Decimal(rng.randint(1, 8)) / 2
+    for _ in range(num_events):
+        roll = rng.random()
+        # Cancels and amends mostly target recent orders, which are the likeliest to be live
+        if roll < 0.1 and issued:
+            flow.append(("cancel", rng.randint(max(1, issued - 20), issued)))
+            continue
+        if roll < 0.2 and issued:
+            flow.append(("amend", rng.randint(max(1, issued - 20), issued), quantity(),
+                         price() if rng.random() < 0.5 else None))
+            continue
+        if roll < 0.23:
+            flow.append(("market_price", price()))
+            continue
+        side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+        order_type = rng.choices(list(OrderType), weights=[8, 50, 8, 8, 8, 8, 10])[0]
+        fields = {"order_type": order_type, "side": side, "quantity": quantity()}
+        if order_type in (OrderType.LIMIT, OrderType.IOC, OrderType.FOK, OrderType.STOP_LIMIT, OrderType.TAKE_PROFIT):
+            fields["price"] = price()
+        if order_type in (OrderType.STOP_LOSS, OrderType.STOP_LIMIT):
+            fields["stop_price"] = price()
+        if order_type == OrderType.TAKE_PROFIT:
+            fields["take_profit_price"] = price()
+        flow.append(("order", fields))
+        issued += 1  # Approximate: triggered orders take IDs too
+    return flow
+
+def _apply(flow: list, process, cancel, amend, market_price) -> list:
+    outcomes = []
+    for event in flow:
+        kind = event[0]
+        try:
+            if kind == "order":
+                process(Order(symbol=SYMBOL, **event[1]))
+                outcomes.append("accepted")
+            elif kind == "cancel":
+                outcomes.append(cancel(event[1]))
+            elif kind == "amend":
+                amend(event[1], event[2], event[3])
+                outcomes.append("amended")
+            else:
+                outcomes.append(market_price(event[1]))
+        except ValueError:
+            outcomes.append("rejected")
+    return outcomes
+
+def run_reference(flow: list) -> tuple:
+    reference = ReferenceMatcher()
+    start = time.perf_counter()
+    outcomes = _apply(flow, reference.process_order, reference.cancel_order,
+                      reference.amend_order, reference.update_market_price)
+    elapsed = time.perf_counter() - start
+    return {"trades": reference.trades, "outcomes": outcomes, "book": reference.book_state()}, elapsed
+
+def run_engine(engine: MatchingEngine, flow: list) -> tuple:
+    trades = []
+    engine.add_trade_listener(lambda t: trades.append(
+        (t.trade_id, t.price, t.quantity, t.aggressor_side, t.maker_order_id, t.taker_order_id)))
+    start = time.perf_counter()
+    outcomes = _apply(flow, engine.process_order,
+                      lambda order_id: engine.cancel_order(SYMBOL, order_id),
+                      lambda order_id, quantity, price: engine.amend_order(SYMBOL, order_id, quantity, price),
+                      lambda price: engine.update_market_price(SYMBOL, price))
+    elapsed = time.perf_counter() - start
+    order_book = engine.order_books[SYMBOL]
+    book = {
+        "bids": [(price, o.order_id, o.quantity) for price, level in order_book.bids.items() for o in level],
+        "asks": [(price, o.order_id, o.quantity) for price, level in order_book.asks.items() for o in level],
+        "stop_orders": [(o.order_id, o.quantity) for o in order_book.stop_orders],
+        "take_profit_orders": [(o.order_id, o.quantity) for o in order_book.take_profit_orders]
+    }
+    return {"trades": trades, "outcomes": outcomes, "book": book}, elapsed
+
+def first_difference(expected: dict, actual: dict) -> str | None:
+    for key in ("trades", "outcomes"):
+        for i, (a, b) in enumerate(zip(expected[key], actual[key])):
+            if a != b:
+                return f"{key}[{i}]: expected {a}, got {b}"
+        if len(expected[key]) != len(actual[key]):
+            return f"{key}: expected {len(expected[key])} entries, got {len(actual[key])}"
+    for key in ("bids", "asks", "stop_orders", "take_profit_orders"):
+        if expected["book"][key] != actual["book"][key]:
+            return f"residual {key}: expected {expected['book'][key]}, got {actual['book'][key]}"
+    return None
+
+def fuzz(seeds, num_events: int = 2000, configurations: dict = None) -> dict:
+    """
+    Run each seed's flow through the reference and every configuration.
+    Returns per-configuration mismatches (seed, first difference) and
+    throughput in events per second, relative to the reference as well.
+    """
+    configurations = configurations or CONFIGURATIONS
+    report = {name: {"mismatches": [], "seconds": 0.0} for name in configurations}
+    reference_seconds = 0.0
+    total_events = 0
+    for seed in seeds:
+        flow = generate_flow(seed, num_events)
+        total_events += len(flow)
+        expected, elapsed = run_reference(flow)
+        reference_seconds += elapsed
+        for name, make_engine in configurations.items():
+            actual, elapsed = run_engine(make_engine(), flow)
+            report[name]["seconds"] += elapsed
+            difference = first_difference(expected, actual)
+            if difference:
+                report[name]["mismatches"].append((seed, difference))
+    for result in report.values():
+        result["events_per_second"] = total_events / result["seconds"]
+        result["speedup_vs_reference"] = reference_seconds / result["seconds"]
+    report["reference"] = {"events_per_second": total_events / reference_seconds}
+    return report
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Differential fuzzing of engine configurations against a reference matcher")
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(fuzz(range(args.seeds), args.events), indent=2, default=str))
@@ -0,0 +1,68 @@
+import json
+from decimal import Decimal
+from pydantic import BaseModel
+import logging
+from .models import Order
+
+class Instrument(BaseModel):
+    symbol: str
+    tick_size: Decimal = Decimal("0.01")
+    lot_size: Decimal = Decimal("0.00000001")
+    min_quantity: Decimal = Decimal("0")
+    price_band: Decimal | None = None  # Max distance from the last trade price as a fraction, e.g. 0.1 = ±10%
+
+class InstrumentRegistry:
+    """
+    Tradable instruments and their order-entry rules. An engine with a
+    registry rejects orders for unlisted symbols instead of creating a book
+    for them, and checks tick size, lot size and price bands on entry.
+    """
+
+    def __init__(self, instruments: list = ()):
+        self.instruments = {instrument.symbol: instrument for instrument in instruments}
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def load(cls, path: str) -> "InstrumentRegistry":
+        """Read a JSON list of instrument definitions"""
+        with open(path) as f:
+            registry = cls([Instrument.model_validate(item) for item in json.load(f)])
+        registry.logger.info("Loaded %s instruments from %s", len(registry.instruments), path)
+        return registry
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.instruments
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def get(self, symbol: str) -> Instrument:
+        instrument = self.instruments.get(symbol)
+        if instrument is None:
+            raise ValueError(f"Unknown symbol {symbol}")
+        return instrument
+
+    def check_price(self, instrument: Instrument, price: Decimal, last_price: Decimal = None):
+        if price % instrument.tick_size != 0:
+            raise ValueError(f"Price {price} is not a multiple of tick size {instrument.tick_size}")
+        if instrument.price_band is not None and last_price is not None:
+            band = last_price * instrument.price_band
+            if not last_price - band <= price <= last_price + band:
+                raise ValueError(f"Price {price} is outside the price band around {last_price}")
+
+    def check_quantity(self, instrument: Instrument, quantity: Decimal):
+        if quantity % instrument.lot_size != 0:
+            raise ValueError(f"Quantity {quantity} is not a multiple of lot size {instrument.lot_size}")
+        if quantity < instrument.min_quantity:
+            raise ValueError(f"Quantity {quantity} is below the minimum of {instrument.min_quantity}")
+
+    def validate(self, order: Order, last_price: Decimal = None):
+        """Raise ValueError if the order breaks its instrument's rules"""
+        instrument = self.get(order.symbol)
+        self.check_quantity(instrument, order.quantity)
+        if order.price is not None:
+            self.check_price(instrument, order.price, last_price)
+        for trigger in (order.stop_price, order.take_profit_price):
+            # Trigger prices are only held to the tick; they may sit outside the band
+            if trigger is not None and trigger % instrument.tick_size != 0:
+                raise ValueError(f"Price {trigger} is not a multiple of tick size {instrument.tick_size}")
@@ -1,16 +1,56 @@
 from decimal import Decimal
-from .models import Order, OrderType, OrderSide, Trade
+from .models import Order, OrderType, OrderSide, PegType, Trade
 from .order_book import OrderBook
 from .account_manager import AccountManager
+from .sequencer import Sequencer
+from .auction import AuctionState
+from .order_index import OrderIndex
+from .execution_report import FillBuffer, ExecutionReport
+from .depth import BucketedDepth
+from .peg_book import PegBook
+from .replication import BookDigest
+from .fixed_point import check_fixed
 import logging
-from collections import defaultdict
+
+class _OrderBooks(dict):
+    """symbol -> order book. Books are created, or loaded from their snapshot, on first access."""
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+
+    def __missing__(self, symbol: str):
+        order_book = self[symbol] = self.engine._create_order_book(symbol)
+        return order_book
+
+    def get(self, symbol: str, default=None):
+        if symbol in self:
+            return dict.__getitem__(self, symbol)
+        if self.engine._has_snapshot(symbol):
+            return self[symbol]
+        return default  # Reads never create empty books
 
 class MatchingEngine:
-    def __init__(self, persistence_manager=None, fee_config=None, account_manager=None):
-        self.order_books = defaultdict(lambda: OrderBook(""))  # symbol -> OrderBook
+    def __init__(self, persistence_manager=None, fee_config=None, account_manager=None, sequencer=None,
+                 order_book_factory=OrderBook, instruments=None, execution_reports=False, depth_groups=None,
+                 risk=None, nbbo=None):
+        self.order_book_factory = order_book_factory  # OrderBook or CompactOrderBook
+        self.instruments = instruments  # InstrumentRegistry, or None to accept any symbol
+        self.risk = risk  # RiskManager run on every inbound order, or None to skip pre-trade risk checks
+        self.nbbo = nbbo  # NBBO of away venues whose quotes matching must not trade through, or None
+        self.depth_groups = depth_groups  # Price bucket sizes each book keeps grouped depth for
+        self.book_digests = False  # Whether each book keeps a BookDigest, for replication checksums
+        self.snapshot_symbols = set()  # Saved books not necessarily loaded yet
+        self.order_books = _OrderBooks(self)  # symbol -> OrderBook
         self.logger = logging.getLogger(__name__)
         self.trade_listeners = []
-        self.persistence_manager = persistence_manager
+        # With execution_reports, fills go to a buffer during matching and each taker order
+        # produces one ExecutionReport, which process_order returns in place of its trade list
+        self.execution_reports = execution_reports
+        self.fill_buffer = FillBuffer()
+        self.execution_listeners = []  # Called with one ExecutionReport per taker order
+        self.book_listeners = []  # Called with (symbol, order_book) after each change
+        self.persistence_manager = None
         self.last_trade_prices = {}  # Track last trade price per symbol
         self.fee_config = fee_config or {
             "maker_fee": Decimal("0.001"),  # 0.1%
@@ -18,32 +58,407 @@ class MatchingEngine:
             "fee_currency": "USDT"
         }
         self.account_manager = account_manager or AccountManager()
+        self.sequencer = sequencer or Sequencer()
+        self.event_listeners = []
+        self.cancel_listeners = []  # Called with (symbol, order_id) after a live order is canceled
+        self.order_index = OrderIndex()  # Live orders by ID and by user
+        self.queue_scan_limit = 1000  # Most orders get_order_status walks past to report a queue position
+        self.auctions = {}  # symbol -> AuctionState while the symbol is in an auction phase
+        self.auction_listeners = []  # Called with (symbol, indicative) when an auction order may move the indicative
+        self.event_ns = 0  # Time of the inbound event being processed; matching never reads the clock
+        if persistence_manager:
+            self.attach_persistence(persistence_manager)
+    
+    def attach_persistence(self, persistence_manager):
+        """Save books to persistence_manager on shutdown; saved books are loaded lazily on first access"""
+        self.persistence_manager = persistence_manager
+        self.snapshot_symbols = set(persistence_manager.list_order_books())
+        state = persistence_manager.load_sequence_state()
+        if state:
+            self.sequencer.observe_order_id(state["last_order_id"])
+            self.sequencer.observe_trade_id(state["last_trade_id"])
+        else:
+            # Snapshots saved without sequence state: load them now so their IDs are never reused
+            for symbol in self.snapshot_symbols:
+                if self._has_snapshot(symbol):
+                    self.order_books.get(symbol)
+    
+    def _has_snapshot(self, symbol: str) -> bool:
+        return symbol in self.snapshot_symbols and (self.instruments is None or symbol in self.instruments)
+    
+    def is_known_symbol(self, symbol: str) -> bool:
+        """Whether symbol is listed, or already has a book or snapshot"""
+        if self.instruments is not None:
+            return symbol in self.instruments
+        return symbol in self.order_books or symbol in self.snapshot_symbols
+    
+    def _new_order_book(self, symbol: str):
+        order_book = self.order_book_factory(symbol)
+        if self.depth_groups:
+            order_book.depth = BucketedDepth(self.depth_groups)
+        if self.book_digests:
+            order_book.digest = BookDigest()
+        return order_book
+    
+    def enable_book_digests(self):
+        """Keep a BookDigest on every book from now on, starting from a scan of the books already loaded"""
+        self.book_digests = True
+        for order_book in self.order_books.values():
+            if order_book.digest is None:
+                order_book.digest = BookDigest(order_book)
+    
+    def _create_order_book(self, symbol: str):
+        if self.instruments is not None and symbol not in self.instruments:
+            raise ValueError(f"Unknown symbol {symbol}")
+        order_book = self._new_order_book(symbol)
+        if symbol in self.snapshot_symbols:
+            saved_state = self.persistence_manager.load_order_book(symbol)
+            if saved_state:
+                self._load_order_book(order_book, saved_state)
+        return order_book
     
     def add_trade_listener(self, listener):
         self.trade_listeners.append(listener)
     
+    def add_book_listener(self, listener):
+        self.book_listeners.append(listener)
+    
+    def notify_book_update(self, symbol: str, order_book):
+        for listener in self.book_listeners:
+            try:
+                listener(symbol, order_book)
+            except Exception:
+                self.logger.exception("Book listener %s failed on %s", listener, symbol)
+    
     def notify_trade(self, trade: Trade):
         """Update last trade price and notify listeners"""
         # Update last trade price
         self.last_trade_prices[trade.symbol] = trade.price
         
-        # Notify listeners
+        # Notify listeners; the trade is already applied, so a failing listener must not abort the event
         for listener in self.trade_listeners:
-            listener(trade)
+            try:
+                listener(trade)
+            except Exception:
+                self.logger.exception("Trade listener %s failed on trade %s", listener, trade.trade_id)
+    
+    def add_execution_listener(self, listener):
+        self.execution_listeners.append(listener)
+    
+    def notify_execution(self, report: ExecutionReport):
+        """Notify execution listeners once per taker order, then trade listeners per fill"""
+        self.last_trade_prices[report.symbol] = report.last_price
+        self._notify_report(report)
+        if self.trade_listeners:
+            for trade in report.trades():
+                for listener in self.trade_listeners:
+                    try:
+                        listener(trade)
+                    except Exception:
+                        self.logger.exception("Trade listener %s failed on trade %s", listener, trade.trade_id)
+    
+    def _notify_report(self, report: ExecutionReport):
+        for listener in self.execution_listeners:
+            try:
+                listener(report)
+            except Exception:
+                self.logger.exception("Execution listener %s failed on order %s", listener, report.order_id)
+    
+    def _notify_execution_listeners(self, fills_by_taker: list):
+        """Reports for (taker order, trades) pairs whose trades already went to trade listeners"""
+        for order, trades in fills_by_taker:
+            self._notify_report(ExecutionReport.from_trades(order, trades, self.fee_config))
+    
+    def _notify_takers(self, executions: list, takers: list):
+        """Execution reports for trades from several taker orders, one per taker"""
+        by_taker = {}
+        for trade, taker in zip(executions, takers):
+            by_taker.setdefault(trade.taker_order_id, (taker, []))[1].append(trade)
+        self._notify_execution_listeners(by_taker.values())
+    
+    def _flush_fills(self, order: Order) -> ExecutionReport:
+        report = ExecutionReport.from_buffer(order, self.event_ns, self.fee_config, self.fill_buffer)
+        if report:
+            self.notify_execution(report)
+        return report
     
     def _get_last_trade_price(self, symbol: str) -> Decimal | None:
         """Get the last trade price for a symbol"""
         return self.last_trade_prices.get(symbol)
     
-    def update_market_price(self, symbol: str, price: Decimal):
+    def add_event_listener(self, listener):
+        """Listeners receive every inbound event (order, cancel, market price) in sequence order"""
+        self.event_listeners.append(listener)
+    
+    def add_cancel_listener(self, listener):
+        """Cheaper than an event listener when only cancels matter: no event record is built per order"""
+        self.cancel_listeners.append(listener)
+    
+    def _begin_event(self, timestamp: int = None) -> int:
+        """Fix the event time used by everything the inbound event causes"""
+        if timestamp is None:
+            timestamp = self.sequencer.now_ns()
+        # Caller timestamps and the wall clock may step back; event time never does
+        if timestamp > self.event_ns:
+            self.event_ns = timestamp
+        return self.event_ns
+    
+    def _record_event(self, event_type: str, **fields):
+        event = {"seq": self.sequencer.next_event_seq(), "type": event_type, "timestamp": self.event_ns, **fields}
+        for listener in self.event_listeners:
+            listener(event)
+    
+    def update_market_price(self, symbol: str, price: Decimal, timestamp: int = None):
         """Explicitly update the market price for a symbol and trigger advanced orders if needed."""
+        check_fixed(price, "Market price")
+        self._begin_event(timestamp)
+        if self.event_listeners:
+            self._record_event("market_price", symbol=symbol, price=str(price))
+        self._update_market_price(symbol, price)
+    
+    def _update_market_price(self, symbol: str, price: Decimal):
         self.last_trade_prices[symbol] = price
         self._check_stop_orders(symbol)
     
+    def update_away_quote(self, venue: str, symbol: str, bid: Decimal | None, bid_size: Decimal | None,
+                          ask: Decimal | None, ask_size: Decimal | None, timestamp: int = None) -> list:
+        """
+        Apply an away venue's top-of-book quote to the NBBO. Quotes are
+        journaled like orders, since the protected prices they set decide
+        how far later orders may trade. Returns any midpoint peg trades the
+        new reference prices allow.
+        """
+        if self.nbbo is None:
+            raise ValueError("No NBBO is configured for away-market quotes")
+        for name, value in (("Bid", bid), ("Bid size", bid_size), ("Ask", ask), ("Ask size", ask_size)):
+            check_fixed(value, name)
+        self._begin_event(timestamp)
+        self.nbbo.on_quote(venue, symbol, bid, bid_size, ask, ask_size)
+        if self.event_listeners:
+            self._record_event("away_quote", venue=venue, venue_slot=self.nbbo.venues[venue], symbol=symbol,
+                               bid=str(bid) if bid is not None else None,
+                               bid_size=str(bid_size) if bid_size is not None else None,
+                               ask=str(ask) if ask is not None else None,
+                               ask_size=str(ask_size) if ask_size is not None else None)
+        order_book = self.order_books.get(symbol)
+        if order_book is None or symbol in self.auctions or \
+                not (order_book.pegs.sizes[OrderSide.BUY] and order_book.pegs.sizes[OrderSide.SELL]):
+            return []
+        crossed = self._uncross_midpoint(symbol, order_book)
+        if crossed:
+            self._check_stop_orders(symbol)
+            self.notify_book_update(symbol, order_book)
+        return crossed
+    
+    def _reference_prices(self, symbol: str, order_book) -> tuple:
+        """Best bid and ask pegged orders follow: the book's own, or the national best with an NBBO"""
+        best_bid, best_ask = order_book.best_bid, order_book.best_ask
+        nbbo = self.nbbo
+        if nbbo is not None:
+            away_bid = nbbo.best_bids.get(symbol)
+            if away_bid is not None and (best_bid is None or away_bid > best_bid):
+                best_bid = away_bid
+            away_ask = nbbo.best_asks.get(symbol)
+            if away_ask is not None and (best_ask is None or away_ask < best_ask):
+                best_ask = away_ask
+        return best_bid, best_ask
+    
+    def _locks_protected_quote(self, order: Order) -> bool:
+        """Whether a limit order resting at its price would be at or through the best away price"""
+        if self.nbbo is None:
+            return False
+        if order.side == OrderSide.BUY:
+            protected = self.nbbo.best_asks.get(order.symbol)
+            return protected is not None and order.price >= protected
+        protected = self.nbbo.best_bids.get(order.symbol)
+        return protected is not None and order.price <= protected
+    
     def process_order(self, order: Order, user_id: str = None, trigger_price: Decimal = None) -> list:
+        # user_id also checks funds; order.user_id alone only records the owner
+        if user_id is not None:
+            order.user_id = user_id
+        if self.instruments is not None:
+            self.instruments.validate(order, self.last_trade_prices.get(order.symbol))
+        if self.risk is not None:
+            self.risk.check(order, self.last_trade_prices.get(order.symbol))
+        # Stamp the order with its sequence number and engine time
+        if order.order_id is None:
+            order.order_id = self.sequencer.next_order_id()
+        else:
+            self.sequencer.observe_order_id(order.order_id)
+        order.timestamp = self._begin_event(order.timestamp)
+        if self.event_listeners:
+            self._record_event(
+                "order",
+                order=order.model_dump(mode="json"),
+                user_id=user_id,
+                trigger_price=str(trigger_price) if trigger_price is not None else None
+            )
+        return self._process_order(order, user_id, trigger_price)
+    
+    def cancel_order(self, symbol: str, order_id: int, timestamp: int = None) -> bool:
+        """Cancel a resting, stop or take-profit order. Returns False if it is not live."""
+        self._begin_event(timestamp)
+        if self.event_listeners:
+            self._record_event("cancel", symbol=symbol, order_id=order_id)
+        order_book = self.order_books.get(symbol)
+        resting = None
+        if order_book is not None and (symbol in self.auctions or self.risk is not None):
+            resting = order_book.get_order(order_id)
+        if resting is not None:
+            side, price, quantity = resting.side, resting.price, resting.quantity
+        if order_book is None or not order_book.cancel_order(order_id):
+            return False
+        if resting is not None and self.risk is not None:
+            self.risk.on_rest(self.order_index.get(order_id)[1], price, -quantity)
+        self.order_index.remove(order_id)
+        if resting is not None and symbol in self.auctions:
+            if self.auctions[symbol].remove(side, price, quantity):
+                self._notify_auction(symbol)
+        self.notify_book_update(symbol, order_book)
+        for listener in self.cancel_listeners:
+            listener(symbol, order_id)
+        return True
+    
+    def amend_order(self, symbol: str, order_id: int, quantity: Decimal, price: Decimal = None,
+                    timestamp: int = None) -> list:
+        """
+        Amend a resting limit order. Reducing quantity at an unchanged price
+        keeps time priority; any other change cancels and re-enters the order
+        under the same ID at the back of the queue (and may trade).
+        """
+        check_fixed(quantity, "Order quantity")
+        check_fixed(price, "Order price")
+        if self.instruments is not None:
+            instrument = self.instruments.get(symbol)
+            self.instruments.check_quantity(instrument, quantity)
+            if price is not None:
+                self.instruments.check_price(instrument, price, self.last_trade_prices.get(symbol))
+        if self.risk is not None:
+            self._check_amend_risk(symbol, order_id, quantity, price)
+        self._begin_event(timestamp)
+        if self.event_listeners:
+            self._record_event("amend", symbol=symbol, order_id=order_id, quantity=str(quantity),
+                               price=str(price) if price is not None else None)
+        order_book = self.order_books.get(symbol)
+        resting = order_book.get_order(order_id) if order_book else None
+        if resting is None:
+            raise ValueError(f"Order {order_id} is not resting on {symbol}")
+        if quantity <= 0:
+            raise ValueError("Order quantity must be positive")
+        auction = self.auctions.get(symbol)
+        if (price is None or price == resting.price) and quantity < resting.quantity:
+            if auction is not None:
+                if auction.remove(resting.side, resting.price, resting.quantity - quantity):
+                    self._notify_auction(symbol)
+            if self.risk is not None:
+                self.risk.on_rest(self.order_index.get(order_id)[1], resting.price, quantity - resting.quantity)
+            order_book.reduce_order(resting, resting.quantity - quantity)
+            self.notify_book_update(symbol, order_book)
+            return []
+        moved = auction is not None and auction.remove(resting.side, resting.price, resting.quantity)
+        if self.risk is not None:
+            self.risk.on_rest(self.order_index.get(order_id)[1], resting.price, -resting.quantity)
+        replacement = Order(
+            order_id=order_id,
+            user_id=self.order_index.get(order_id)[1],
+            symbol=symbol,
+            order_type=OrderType.LIMIT,
+            side=resting.side,
+            quantity=quantity,
+            price=price if price is not None else resting.price,
+            timestamp=self.event_ns
+        )
+        order_book.cancel_order(order_id)
+        self.order_index.remove(order_id)
+        executions = self._process_order(replacement)
+        if moved:
+            # The old volume left the crossed range even if the re-entered order lands outside it
+            self._notify_auction(symbol)
+        return executions
+    
+    def _check_amend_risk(self, symbol: str, order_id: int, quantity: Decimal, price: Decimal = None):
+        """Risk-check the order an amend re-enters, net of the exposure it replaces"""
+        order_book = self.order_books.get(symbol)
+        resting = order_book.get_order(order_id) if order_book else None
+        if resting is None or quantity <= 0:
+            return  # amend_order rejects it
+        if (price is None or price == resting.price) and quantity < resting.quantity:
+            return  # Reduced in place, which only lowers exposure
+        replacement = Order(
+            order_id=order_id,
+            user_id=self.order_index.get(order_id)[1],
+            symbol=symbol,
+            order_type=OrderType.LIMIT,
+            side=resting.side,
+            quantity=quantity,
+            price=price if price is not None else resting.price
+        )
+        self.risk.check(replacement, self.last_trade_prices.get(symbol), released=resting.price * resting.quantity)
+    
+    def get_order_status(self, order_id: int) -> dict | None:
+        """A live order's remaining quantity and, if resting, its place in the queue; None once it is gone"""
+        entry = self.order_index.get(order_id)
+        if entry is None:
+            return None
+        symbol, user_id, trigger_order = entry
+        if trigger_order is not None and trigger_order.peg_type is not None:
+            best_bid, best_ask = self._reference_prices(symbol, self.order_books[symbol])
+            return {
+                "order_id": order_id, "symbol": symbol, "user_id": user_id, "status": "pegged",
+                "order_type": OrderType.LIMIT.value, "side": trigger_order.side.value,
+                "quantity": trigger_order.quantity, "peg_type": trigger_order.peg_type.value,
+                "peg_offset": trigger_order.peg_offset,
+                "price": PegBook.peg_price(trigger_order.side, trigger_order.peg_type, trigger_order.peg_offset,
+                                           best_bid, best_ask)
+            }
+        if trigger_order is not None:
+            return {
+                "order_id": order_id, "symbol": symbol, "user_id": user_id, "status": "pending_trigger",
+                "order_type": trigger_order.order_type.value, "side": trigger_order.side.value,
+                "quantity": trigger_order.quantity, "price": trigger_order.price,
+                "stop_price": trigger_order.stop_price, "take_profit_price": trigger_order.take_profit_price
+            }
+        order_book = self.order_books[symbol]
+        order = order_book.get_order(order_id)
+        book = order_book.bids if order.side == OrderSide.BUY else order_book.asks
+        # Bounded walk of the level from its head; past queue_scan_limit orders it stops and reports lower bounds
+        orders_ahead, quantity_ahead, exact = 0, Decimal("0"), True
+        limit = self.queue_scan_limit
+        for queued in book[order.price]:
+            if queued.order_id == order_id:
+                break
+            if orders_ahead >= limit:
+                exact = False
+                break
+            orders_ahead += 1
+            quantity_ahead += queued.quantity
+        return {
+            "order_id": order_id, "symbol": symbol, "user_id": user_id, "status": "resting",
+            "order_type": OrderType.LIMIT.value, "side": order.side.value,
+            "quantity": order.quantity, "price": order.price,
+            "orders_ahead": orders_ahead, "quantity_ahead": quantity_ahead, "queue_position_exact": exact
+        }
+    
+    def get_user_orders(self, user_id: str, symbol: str = None) -> list:
+        return [self.get_order_status(order_id) for _, order_id in self.order_index.user_orders(user_id, symbol)]
+    
+    def cancel_user_orders(self, user_id: str, symbol: str = None) -> list:
+        """Cancel every live order of a user (on one symbol, or all); cost depends only on that user's orders"""
+        canceled = []
+        for order_symbol, order_id in self.order_index.user_orders(user_id, symbol):
+            if self.cancel_order(order_symbol, order_id):
+                canceled.append(order_id)
+        return canceled
+    
+    def _process_order(self, order: Order, user_id: str = None, trigger_price: Decimal = None) -> list:
         symbol = order.symbol
         order_book = self.order_books[symbol]
-        order_book.symbol = symbol  # Ensure symbol is set
+        
+        if order.order_id is None:
+            order.order_id = self.sequencer.next_order_id()
+        if order.timestamp is None:
+            order.timestamp = self.event_ns
         
         executions = []
         
@@ -54,93 +469,245 @@ class MatchingEngine:
             if not self.account_manager.has_sufficient_funds(user_id, "USDT", required):
                 raise ValueError("Insufficient funds for order")
         
-        # Matching logic
-        if order.side == OrderSide.BUY:
+        # During an auction orders only accumulate; they trade when it uncrosses
+        auction = self.auctions.get(symbol)
+        if auction is not None:
+            if order.order_type != OrderType.LIMIT or order.peg_type is not None:
+                raise ValueError(f"Only unpegged limit orders are accepted while {symbol} is in auction")
+            order_book.add_order(order)
+            self.order_index.add(order)
+            if self.risk is not None:
+                self.risk.on_rest(order.user_id, order.price, order.quantity)
+            if auction.add(order):
+                self._notify_auction(symbol)
+            self.notify_book_update(symbol, order_book)
+            return self._flush_fills(order) if self.execution_reports else executions
+        
+        # Matching logic; stop and take-profit orders rest untouched until triggered, and
+        # pegged orders can only meet other pegged orders, once resting
+        quantity = order.quantity
+        pegs = order_book.pegs
+        if order.order_type in (OrderType.STOP_LOSS, OrderType.STOP_LIMIT, OrderType.TAKE_PROFIT) or \
+                order.peg_type is not None:
+            pass
+        elif pegs.sizes[OrderSide.SELL if order.side == OrderSide.BUY else OrderSide.BUY]:
+            executions = self._match_with_pegs(order, order_book)
+        elif order.side == OrderSide.BUY:
             executions = self._match_buy_order(order, order_book)
         else:
             executions = self._match_sell_order(order, order_book)
+        if self.execution_reports:
+            executions = self._flush_fills(order)
+        elif executions and self.execution_listeners:
+            self._notify_execution_listeners([(order, executions)])
+        if self.risk is not None and order.quantity < quantity:
+            self.risk.on_fill(order.user_id, order, quantity - order.quantity, resting=False)
         
         # Handle remaining quantity
         if order.quantity > 0:
-            if order.order_type == OrderType.LIMIT:
+            if order.peg_type is not None:
+                pegs.add(order)
+                self.order_index.add(order, trigger=True)
+            elif order.order_type == OrderType.LIMIT and self._locks_protected_quote(order):
+                # Resting would lock or cross the away market, and the local book too when
+                # protection stopped the sweep short of the order's price
+                self.logger.debug("Limit order %s would lock or cross a protected quote, canceling remainder",
+                                  order.order_id)
+            elif order.order_type == OrderType.LIMIT:
                 order_book.add_order(order)
+                self.order_index.add(order)
+                if self.risk is not None:
+                    self.risk.on_rest(order.user_id, order.price, order.quantity)
             elif order.order_type in [OrderType.IOC, OrderType.FOK]:
-                self.logger.info(f"{order.order_type} order partially filled, canceling remainder")
+                self.logger.debug("%s order %s partially filled, canceling remainder", order.order_type, order.order_id)
             elif order.order_type == OrderType.STOP_LOSS or order.order_type == OrderType.STOP_LIMIT:
                 order_book.add_stop_order(order)
+                self.order_index.add(order, trigger=True)
             elif order.order_type == OrderType.TAKE_PROFIT:
                 order_book.add_take_profit_order(order)
+                self.order_index.add(order, trigger=True)
+        
+        # Midpoint pegs on both sides cross as soon as the book has a midpoint
+        crossed = self._uncross_midpoint(symbol, order_book) if pegs.sizes[OrderSide.BUY] and pegs.sizes[OrderSide.SELL] else []
+        if order.peg_type is not None and crossed:
+            executions = ExecutionReport.from_trades(order, crossed, self.fee_config) if self.execution_reports else crossed
         
         # After processing, check stop orders if we had trades
-        if executions:
+        if executions or crossed:
             self._check_stop_orders(symbol)
         
         if trigger_price is not None:
-            self.update_market_price(symbol, trigger_price)
+            self._update_market_price(symbol, trigger_price)
         
+        self.notify_book_update(symbol, order_book)
+        return executions
+    
+    def start_auction(self, symbol: str, timestamp: int = None):
+        """Stop continuous matching for symbol; orders rest (possibly crossed) until end_auction"""
+        if symbol in self.auctions:
+            raise ValueError(f"{symbol} is already in auction")
+        self._begin_event(timestamp)
+        if self.event_listeners:
+            self._record_event("auction_start", symbol=symbol)
+        self.auctions[symbol] = AuctionState(self.order_books[symbol])
+        self._notify_auction(symbol)
+    
+    def get_indicative(self, symbol: str) -> dict:
+        """Price, volume and imbalance the auction would uncross at right now"""
+        auction = self.auctions.get(symbol)
+        if auction is None:
+            raise ValueError(f"{symbol} is not in auction")
+        return auction.indicative(self._get_last_trade_price(symbol))
+    
+    def add_auction_listener(self, listener):
+        self.auction_listeners.append(listener)
+    
+    def _notify_auction(self, symbol: str):
+        if self.auction_listeners:
+            indicative = self.get_indicative(symbol)
+            for listener in self.auction_listeners:
+                try:
+                    listener(symbol, indicative)
+                except Exception:
+                    self.logger.exception("Auction listener %s failed on %s", listener, symbol)
+    
+    def end_auction(self, symbol: str, timestamp: int = None) -> list:
+        """
+        Uncross at the single clearing price and resume continuous matching.
+        Crossing orders fill in price-time priority: best prices first, and
+        earlier orders first within a price. All trades print at the clearing price.
+        """
+        if symbol not in self.auctions:
+            raise ValueError(f"{symbol} is not in auction")
+        self._begin_event(timestamp)
+        if self.event_listeners:
+            self._record_event("auction_end", symbol=symbol)
+        indicative = self.get_indicative(symbol)
+        price, remaining = indicative["price"], indicative["volume"]
+        del self.auctions[symbol]
+        order_book = self.order_books[symbol]
+        executions = []
+        takers = []
+        while remaining > 0:
+            bid_price, bids = order_book.bids.peekitem(0)
+            ask_price, asks = order_book.asks.peekitem(0)
+            bid, ask = bids[0], asks[0]
+            quantity = min(bid.quantity, ask.quantity, remaining)
+            # The order that arrived later is treated as the taker
+            maker, taker = (bid, ask) if bid.order_id < ask.order_id else (ask, bid)
+            trade = Trade(
+                trade_id=self.sequencer.next_trade_id(),
+                timestamp=self.event_ns,
+                symbol=symbol,
+                price=price,
+                quantity=quantity,
+                aggressor_side=taker.side,
+                maker_order_id=maker.order_id,
+                taker_order_id=taker.order_id,
+                maker_fee=quantity * price * self.fee_config["maker_fee"],
+                taker_fee=quantity * price * self.fee_config["taker_fee"],
+                fee_currency=self.fee_config["fee_currency"]
+            )
+            executions.append(trade)
+            takers.append(taker)
+            remaining -= quantity
+            if self.risk is not None:
+                self.risk.on_fill(self.order_index.get(bid.order_id)[1], bid, quantity)
+                self.risk.on_fill(self.order_index.get(ask.order_id)[1], ask, quantity)
+            order_book.reduce_order(bid, quantity)
+            order_book.reduce_order(ask, quantity)
+            if bid.quantity <= 0:
+                self.order_index.remove(bid.order_id)
+                order_book.remove_filled(order_book.bids, bid_price)
+            if ask.quantity <= 0:
+                self.order_index.remove(ask.order_id)
+                order_book.remove_filled(order_book.asks, ask_price)
+            self.notify_trade(trade)
+        if executions and self.execution_listeners:
+            # Every fill prints at one price, but each taker order still gets its own report
+            self._notify_takers(executions, takers)
+        # Midpoint pegs held back during the auction cross now that the book has a midpoint again
+        pegs = order_book.pegs
+        if pegs.sizes[OrderSide.BUY] and pegs.sizes[OrderSide.SELL]:
+            executions += self._uncross_midpoint(symbol, order_book)
+        # Triggers were held during the auction; the last price may have crossed them then, or just now
+        self._check_stop_orders(symbol)
+        self.notify_book_update(symbol, order_book)
         return executions
     
     def _check_stop_orders(self, symbol: str):
         """Check and trigger stop and take-profit orders based on last trade price"""
+        if symbol in self.auctions:
+            return  # Triggered orders could not trade in the auction; end_auction checks them
         last_price = self._get_last_trade_price(symbol)
         if not last_price:
             return
         order_book = self.order_books.get(symbol)
         if not order_book:
             return
-        # Process stop orders
+        # Process stop orders. Each is removed before it fires, and orders a
+        # nested check (from the triggered order's own trades) already fired are skipped
         for stop_order in list(order_book.stop_orders):
-            if (stop_order.side == OrderSide.BUY and stop_order.stop_price and last_price >= stop_order.stop_price):
-                self._trigger_stop_order(stop_order)
+            if stop_order not in order_book.stop_orders:
+                continue
+            if (stop_order.side == OrderSide.BUY and stop_order.stop_price and last_price >= stop_order.stop_price) or \
+               (stop_order.side == OrderSide.SELL and stop_order.stop_price and last_price <= stop_order.stop_price):
                 order_book.stop_orders.remove(stop_order)
-            elif (stop_order.side == OrderSide.SELL and stop_order.stop_price and last_price <= stop_order.stop_price):
+                self.order_index.remove(stop_order.order_id)
                 self._trigger_stop_order(stop_order)
-                order_book.stop_orders.remove(stop_order)
         # Process take-profit orders
         for tp_order in list(order_book.take_profit_orders):
-            if (tp_order.side == OrderSide.BUY and tp_order.take_profit_price and last_price <= tp_order.take_profit_price):
-                self._trigger_take_profit_order(tp_order)
+            if tp_order not in order_book.take_profit_orders:
+                continue
+            if (tp_order.side == OrderSide.BUY and tp_order.take_profit_price and last_price <= tp_order.take_profit_price) or \
+               (tp_order.side == OrderSide.SELL and tp_order.take_profit_price and last_price >= tp_order.take_profit_price):
                 order_book.take_profit_orders.remove(tp_order)
-            elif (tp_order.side == OrderSide.SELL and tp_order.take_profit_price and last_price >= tp_order.take_profit_price):
+                self.order_index.remove(tp_order.order_id)
                 self._trigger_take_profit_order(tp_order)
-                order_book.take_profit_orders.remove(tp_order)
 
     def _trigger_stop_order(self, order: Order):
         """Convert stop/stop-limit order to market/limit order and process it"""
         if order.order_type == OrderType.STOP_LIMIT:
             limit_order = Order(
-                order_id=f"{order.order_id}-triggered",
+                parent_order_id=order.order_id,
+                user_id=order.user_id,
                 symbol=order.symbol,
                 order_type=OrderType.LIMIT,
                 side=order.side,
                 quantity=order.quantity,
                 price=order.price
             )
-            self.process_order(limit_order)
+            self._process_order(limit_order)
         else:
             market_order = Order(
-                order_id=f"{order.order_id}-triggered",
+                parent_order_id=order.order_id,
+                user_id=order.user_id,
                 symbol=order.symbol,
                 order_type=OrderType.MARKET,
                 side=order.side,
                 quantity=order.quantity
             )
-            self.process_order(market_order)
+            self._process_order(market_order)
 
     def _trigger_take_profit_order(self, order: Order):
         """Convert take-profit order to limit order and process it"""
         limit_order = Order(
-            order_id=f"{order.order_id}-triggered",
+            parent_order_id=order.order_id,
+            user_id=order.user_id,
             symbol=order.symbol,
             order_type=OrderType.LIMIT,
             side=order.side,
             quantity=order.quantity,
             price=order.price or order.take_profit_price
         )
-        self.process_order(limit_order)
+        self._process_order(limit_order)
     
     def _match_buy_order(self, order: Order, order_book: OrderBook) -> list:
         executions = []
+        fills = self.fill_buffer if self.execution_reports else None
+        risk = self.risk
+        # Best away ask: buying above it would trade through a protected quote
+        protected = self.nbbo.best_asks.get(order.symbol) if self.nbbo is not None else None
         total_available = 0
         # FOK: Check if enough quantity is available at or better than price
         if order.order_type == OrderType.FOK:
@@ -148,7 +715,7 @@ class MatchingEngine:
             qty = 0
             temp_qty = needed
             for price, orders in order_book.asks.items():
-                if order.price is not None and price > order.price:
+                if order.price is not None and price > order.price or protected is not None and price > protected:
                     break
                 for o in orders:
                     qty += o.quantity
@@ -160,77 +727,266 @@ class MatchingEngine:
                 return []
         while order.quantity > 0 and order_book.asks:
             best_ask_price, best_ask_orders = order_book.asks.peekitem(0)
-            if order.order_type == OrderType.LIMIT and order.price < best_ask_price:
+            if order.order_type != OrderType.MARKET and order.price is not None and order.price < best_ask_price:
                 break
-            if order.order_type == OrderType.FOK and order.price < best_ask_price:
+            if protected is not None and best_ask_price > protected:
                 break
             best_ask_order = best_ask_orders[0]
             execution_price = best_ask_price
             execution_quantity = min(order.quantity, best_ask_order.quantity)
-            trade = Trade(
-                symbol=order.symbol,
-                price=execution_price,
-                quantity=execution_quantity,
-                aggressor_side=order.side,
-                maker_order_id=best_ask_order.order_id,
-                taker_order_id=order.order_id,
-                maker_fee=execution_quantity * execution_price * self.fee_config["maker_fee"],
-                taker_fee=execution_quantity * execution_price * self.fee_config["taker_fee"],
-                fee_currency=self.fee_config["fee_currency"]
-            )
-            executions.append(trade)
-            self.notify_trade(trade)
+            if fills is not None:
+                fills.append(self.sequencer.next_trade_id(), execution_price, execution_quantity,
+                             best_ask_order.order_id)
+            else:
+                trade = Trade(
+                    trade_id=self.sequencer.next_trade_id(),
+                    timestamp=self.event_ns,
+                    symbol=order.symbol,
+                    price=execution_price,
+                    quantity=execution_quantity,
+                    aggressor_side=order.side,
+                    maker_order_id=best_ask_order.order_id,
+                    taker_order_id=order.order_id,
+                    maker_fee=execution_quantity * execution_price * self.fee_config["maker_fee"],
+                    taker_fee=execution_quantity * execution_price * self.fee_config["taker_fee"],
+                    fee_currency=self.fee_config["fee_currency"]
+                )
+                executions.append(trade)
             order.quantity -= execution_quantity
-            best_ask_order.quantity -= execution_quantity
+            if risk is not None:
+                risk.on_fill(self.order_index.get(best_ask_order.order_id)[1], best_ask_order, execution_quantity)
+            order_book.reduce_order(best_ask_order, execution_quantity)
             if best_ask_order.quantity <= 0:
-                best_ask_orders.popleft()
-                if not best_ask_orders:
-                    del order_book.asks[best_ask_price]
-            if order.order_type == OrderType.FOK and order.quantity > 0:
-                break
+                self.order_index.remove(best_ask_order.order_id)
+                order_book.remove_filled(order_book.asks, best_ask_price)
+            # Listeners only hear about a fill once it is fully applied
+            if fills is None:
+                self.notify_trade(trade)
         return executions
     
     def _match_sell_order(self, order: Order, order_book: OrderBook) -> list:
         executions = []
+        fills = self.fill_buffer if self.execution_reports else None
+        risk = self.risk
+        # Best away bid: selling below it would trade through a protected quote
+        protected = self.nbbo.best_bids.get(order.symbol) if self.nbbo is not None else None
+        # FOK: Check if enough quantity is available at or better than price
+        if order.order_type == OrderType.FOK:
+            qty = 0
+            for price, orders in order_book.bids.items():
+                if order.price is not None and price < order.price or protected is not None and price < protected:
+                    break
+                qty += sum(o.quantity for o in orders)
+                if qty >= order.quantity:
+                    break
+            if qty < order.quantity:
+                return []
         while order.quantity > 0 and order_book.bids:
             best_bid_price, best_bid_orders = order_book.bids.peekitem(0)
             
-            if order.order_type == OrderType.LIMIT and order.price > best_bid_price:
+            if order.order_type != OrderType.MARKET and order.price is not None and order.price > best_bid_price:
+                break
+            if protected is not None and best_bid_price < protected:
                 break
                 
             best_bid_order = best_bid_orders[0]
             execution_price = best_bid_price
             execution_quantity = min(order.quantity, best_bid_order.quantity)
+            if fills is not None:
+                fills.append(self.sequencer.next_trade_id(), execution_price, execution_quantity,
+                             best_bid_order.order_id)
+            else:
+                trade = Trade(
+                    trade_id=self.sequencer.next_trade_id(),
+                    timestamp=self.event_ns,
+                    symbol=order.symbol,
+                    price=execution_price,
+                    quantity=execution_quantity,
+                    aggressor_side=order.side,
+                    maker_order_id=best_bid_order.order_id,
+                    taker_order_id=order.order_id,
+                    maker_fee=execution_quantity * execution_price * self.fee_config["maker_fee"],
+                    taker_fee=execution_quantity * execution_price * self.fee_config["taker_fee"],
+                    fee_currency=self.fee_config["fee_currency"]
+                )
+                executions.append(trade)
             
+            order.quantity -= execution_quantity
+            if risk is not None:
+                risk.on_fill(self.order_index.get(best_bid_order.order_id)[1], best_bid_order, execution_quantity)
+            order_book.reduce_order(best_bid_order, execution_quantity)
+            
+            if best_bid_order.quantity <= 0:
+                self.order_index.remove(best_bid_order.order_id)
+                order_book.remove_filled(order_book.bids, best_bid_price)
+            if fills is None:
+                self.notify_trade(trade)
+        
+        return executions
+    
+    def _match_with_pegs(self, order: Order, order_book: OrderBook) -> list:
+        """
+        Match against displayed levels and pegged orders together; used only
+        while the opposite side has pegged orders. Peg prices are derived from
+        the reference BBO as the order arrives and hold while it sweeps, so a
+        peg joining the best price trades there once the displayed orders
+        ahead of it have. At equal prices displayed orders trade first.
+        """
+        executions = []
+        fills = self.fill_buffer if self.execution_reports else None
+        risk = self.risk
+        buy = order.side == OrderSide.BUY
+        levels = order_book.asks if buy else order_book.bids
+        opposite = OrderSide.SELL if buy else OrderSide.BUY
+        pegs = order_book.pegs
+        best_bid, best_ask = self._reference_prices(order.symbol, order_book)
+        protected = None
+        if self.nbbo is not None:
+            protected = (self.nbbo.best_asks if buy else self.nbbo.best_bids).get(order.symbol)
+        # FOK counts displayed liquidity only; pegged orders can add to it but are not needed
+        if order.order_type == OrderType.FOK:
+            available = 0
+            for price, orders in levels.items():
+                if order.price is not None and (price > order.price if buy else price < order.price) or \
+                        protected is not None and (price > protected if buy else price < protected):
+                    break
+                available += sum(o.quantity for o in orders)
+                if available >= order.quantity:
+                    break
+            if available < order.quantity:
+                return []
+        while order.quantity > 0:
+            pegged = pegs.best(opposite, best_bid, best_ask)
+            level_price = levels.peekitem(0)[0] if levels else None
+            if pegged is not None and (level_price is None or
+                                       (pegged[0] < level_price if buy else pegged[0] > level_price)):
+                price, maker = pegged
+            elif level_price is not None:
+                price, maker, pegged = level_price, levels[level_price][0], None
+            else:
+                break
+            if order.order_type != OrderType.MARKET and order.price is not None and \
+                    (order.price < price if buy else order.price > price):
+                break
+            if protected is not None and (price > protected if buy else price < protected):
+                break
+            quantity = min(order.quantity, maker.quantity)
+            if fills is not None:
+                fills.append(self.sequencer.next_trade_id(), price, quantity, maker.order_id)
+            else:
+                trade = Trade(
+                    trade_id=self.sequencer.next_trade_id(),
+                    timestamp=self.event_ns,
+                    symbol=order.symbol,
+                    price=price,
+                    quantity=quantity,
+                    aggressor_side=order.side,
+                    maker_order_id=maker.order_id,
+                    taker_order_id=order.order_id,
+                    maker_fee=quantity * price * self.fee_config["maker_fee"],
+                    taker_fee=quantity * price * self.fee_config["taker_fee"],
+                    fee_currency=self.fee_config["fee_currency"]
+                )
+                executions.append(trade)
+            order.quantity -= quantity
+            if pegged is not None:
+                if risk is not None:
+                    risk.on_fill(maker.user_id, maker, quantity, resting=False)
+                maker.quantity -= quantity
+                if maker.quantity <= 0:
+                    self.order_index.remove(maker.order_id)
+                    pegs.remove_filled(maker)
+            else:
+                if risk is not None:
+                    risk.on_fill(self.order_index.get(maker.order_id)[1], maker, quantity)
+                order_book.reduce_order(maker, quantity)
+                if maker.quantity <= 0:
+                    self.order_index.remove(maker.order_id)
+                    order_book.remove_filled(levels, price)
+            if fills is None:
+                self.notify_trade(trade)
+        return executions
+    
+    def _uncross_midpoint(self, symbol: str, order_book: OrderBook) -> list:
+        """
+        Trade resting midpoint buys against midpoint sells at the midpoint.
+        They meet when one of them arrives, or when the book gains the bid or
+        ask a midpoint needs; the later order of each pair is the taker.
+        """
+        pegs = order_book.pegs
+        executions = []
+        takers = []
+        while True:
+            heads = pegs.midpoint_heads()
+            if heads is None:
+                break
+            price = PegBook.peg_price(OrderSide.BUY, PegType.MIDPOINT, 0, *self._reference_prices(symbol, order_book))
+            if price is None:
+                break
+            bid, ask = heads
+            quantity = min(bid.quantity, ask.quantity)
+            maker, taker = (bid, ask) if bid.order_id < ask.order_id else (ask, bid)
             trade = Trade(
-                symbol=order.symbol,
-                price=execution_price,
-                quantity=execution_quantity,
-                aggressor_side=order.side,
-                maker_order_id=best_bid_order.order_id,
-                taker_order_id=order.order_id,
-                maker_fee=execution_quantity * execution_price * self.fee_config["maker_fee"],
-                taker_fee=execution_quantity * execution_price * self.fee_config["taker_fee"],
+                trade_id=self.sequencer.next_trade_id(),
+                timestamp=self.event_ns,
+                symbol=symbol,
+                price=price,
+                quantity=quantity,
+                aggressor_side=taker.side,
+                maker_order_id=maker.order_id,
+                taker_order_id=taker.order_id,
+                maker_fee=quantity * price * self.fee_config["maker_fee"],
+                taker_fee=quantity * price * self.fee_config["taker_fee"],
                 fee_currency=self.fee_config["fee_currency"]
             )
             executions.append(trade)
+            takers.append(taker)
+            for pegged in heads:
+                if self.risk is not None:
+                    self.risk.on_fill(pegged.user_id, pegged, quantity, resting=False)
+                pegged.quantity -= quantity
+                if pegged.quantity <= 0:
+                    self.order_index.remove(pegged.order_id)
+                    pegs.remove_filled(pegged)
             self.notify_trade(trade)
-            
-            order.quantity -= execution_quantity
-            best_bid_order.quantity -= execution_quantity
-            
-            if best_bid_order.quantity <= 0:
-                best_bid_orders.popleft()
-                if not best_bid_orders:
-                    del order_book.bids[best_bid_price]
-            
-            if order.order_type == OrderType.FOK and order.quantity > 0:
-                break
-        
+        if executions and self.execution_listeners:
+            self._notify_takers(executions, takers)
         return executions
     
+    def restore_order_book(self, symbol: str, saved_state: dict):
+        """Install a book loaded by PersistenceManager and keep the sequencer ahead of its IDs"""
+        order_book = self._new_order_book(symbol)
+        self._load_order_book(order_book, saved_state)
+        self.order_books[symbol] = order_book
+        self.notify_book_update(symbol, order_book)
+        return order_book
+    
+    def _load_order_book(self, order_book, saved_state: dict):
+        for levels in (saved_state["bids"], saved_state["asks"]):
+            for orders in levels.values():
+                for order in orders:
+                    if order.order_id is None:
+                        # Saved before integer IDs; levels are in time priority, so new IDs keep it
+                        order.order_id = self.sequencer.next_order_id()
+                    order_book.add_order(order)
+                    self.order_index.add(order)
+                    if self.risk is not None:
+                        self.risk.on_rest(order.user_id, order.price, order.quantity)
+                    self.sequencer.observe_order_id(order.order_id)
+        order_book.stop_orders = saved_state.get("stop_orders", [])
+        order_book.take_profit_orders = saved_state.get("take_profit_orders", [])
+        for order in saved_state.get("pegged_orders", []):
+            order_book.pegs.add(order)
+        for order in order_book.stop_orders + order_book.take_profit_orders + order_book.pegs.orders():
+            if order.order_id is None:
+                order.order_id = self.sequencer.next_order_id()
+            self.order_index.add(order, trigger=True)
+            self.sequencer.observe_order_id(order.order_id)
+    
     def shutdown(self):
         """Shutdown the matching engine and save state if persistence is enabled"""
         if self.persistence_manager:
+            # Books never loaded this session are unchanged on disk
             for symbol, order_book in self.order_books.items():
-                self.persistence_manager.save_order_book(symbol, order_book)
\ No newline at end of file
+                self.persistence_manager.save_order_book(symbol, order_book)
+            self.persistence_manager.save_sequence_state(self.sequencer.state())
\ No newline at end of file
@@ -0,0 +1,74 @@
+import gc
+import tracemalloc
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.order_book import OrderBook
+from engine.compact_order_book import CompactOrderBook
+
+class MemoryBenchmark:
+    """
+    Measures the resting-order footprint of an order book implementation with
+    tracemalloc. Orders are built one at a time and handed to the book, so
+    only what the book retains is counted.
+    """
+
+    def __init__(self, book_factory=OrderBook):
+        self.book_factory = book_factory
+
+    def _make_order(self, i: int, num_levels: int) -> Order:
+        side = OrderSide.BUY if i % 2 == 0 else OrderSide.SELL
+        offset = (i // 2) % num_levels
+        price = 50000 - offset if side == OrderSide.BUY else 50001 + offset
+        return Order(
+            order_id=i + 1,
+            symbol="BTC-USDT",
+            order_type=OrderType.LIMIT,
+            side=side,
+            quantity=Decimal("0.015"),
+            price=Decimal(price) + Decimal("0.5"),
+            timestamp=1_700_000_000_000_000_000 + i
+        )
+
+    def _retained_bytes(self, num_orders: int, num_levels: int) -> int:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            book = self.book_factory("BTC-USDT")
+            for i in range(num_orders):
+                book.add_order(self._make_order(i, num_levels))
+            gc.collect()
+            retained = tracemalloc.get_traced_memory()[0] - baseline
+        finally:
+            tracemalloc.stop()
+        del book
+        return retained
+
+    def measure_memory(self, num_orders: int = 100000, num_levels: int = 100) -> dict:
+        # Many orders on few levels isolates the per-order cost; one order per
+        # level then leaves the per-level overhead as the remainder
+        deep = self._retained_bytes(num_orders, num_levels)
+        per_order = deep / num_orders
+        wide_levels = min(num_orders, 10000)
+        wide = self._retained_bytes(wide_levels, wide_levels // 2)
+        per_level = max(wide - per_order * wide_levels, 0) / wide_levels
+        return {
+            "book": self.book_factory.__name__,
+            "num_orders": num_orders,
+            "num_levels": num_levels * 2,
+            "total_bytes": deep,
+            "bytes_per_resting_order": per_order,
+            "bytes_per_price_level": per_level
+        }
+
+def compare_backends(num_orders: int = 100000, num_levels: int = 100) -> dict:
+    results = [MemoryBenchmark(factory).measure_memory(num_orders, num_levels)
+               for factory in (OrderBook, CompactOrderBook)]
+    return {
+        "results": results,
+        "reduction_per_order": results[0]["bytes_per_resting_order"] / results[1]["bytes_per_resting_order"]
+    }
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(compare_backends(), indent=2))
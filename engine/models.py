@@ -1,8 +1,7 @@
 from decimal import Decimal
-from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, Field, model_validator
-import uuid
+from pydantic import BaseModel, model_validator
+from .fixed_point import check_fixed
 
 class OrderType(str, Enum):
     MARKET = "market"
@@ -17,8 +16,13 @@ class OrderSide(str, Enum):
     BUY = "buy"
     SELL = "sell"
 
+class PegType(str, Enum):
+    PRIMARY = "primary"  # Same-side best displayed price, less peg_offset
+    MIDPOINT = "midpoint"  # Midpoint of the best displayed bid and ask
+
 class Order(BaseModel):
-    order_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    # order_id and timestamp (ns) are assigned by the engine's Sequencer on acceptance
+    order_id: int | None = None
     symbol: str
     order_type: OrderType
     side: OrderSide
@@ -26,32 +30,46 @@ class Order(BaseModel):
     price: Decimal | None = None
     stop_price: Decimal | None = None
     take_profit_price: Decimal | None = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: int | None = None
+    parent_order_id: int | None = None  # Set on orders spawned by a stop/take-profit trigger
+    user_id: str | None = None  # Owner, for the per-user order index; inherited by triggered orders
+    peg_type: PegType | None = None  # Pegged limit orders take their price from the book instead of `price`
+    peg_offset: Decimal = Decimal("0")  # Primary pegs only: distance behind the best price
     
     class Config:
         arbitrary_types_allowed = True
         json_encoders = {
-            Decimal: lambda v: str(v),
-            datetime: lambda v: v.isoformat()
+            Decimal: lambda v: str(v)
         }
         
     @model_validator(mode="after")
     def check_valid_order(self):
         if self.quantity is None or self.quantity <= 0:
             raise ValueError('Order quantity must be positive')
-        if self.order_type in [OrderType.LIMIT, OrderType.STOP_LIMIT, OrderType.TAKE_PROFIT] and (self.price is None or self.price <= 0):
+        # Rejected here, before sequencing, rather than when a fixed-point record of a fill is written
+        check_fixed(self.quantity, 'Order quantity')
+        check_fixed(self.price, 'Order price')
+        check_fixed(self.stop_price, 'Stop price')
+        check_fixed(self.take_profit_price, 'Take-profit price')
+        check_fixed(self.peg_offset, 'Peg offset')
+        if self.peg_type is not None:
+            if self.order_type != OrderType.LIMIT or self.price is not None:
+                raise ValueError('Pegged orders must be limit orders without a price')
+            if self.peg_offset < 0 or (self.peg_type == PegType.MIDPOINT and self.peg_offset != 0):
+                raise ValueError('Peg offset must be non-negative, and zero for midpoint pegs')
+        elif self.order_type in [OrderType.LIMIT, OrderType.STOP_LIMIT, OrderType.TAKE_PROFIT] and (self.price is None or self.price <= 0):
             raise ValueError('Order price must be positive for limit/stop/take-profit orders')
         return self
 
 class Trade(BaseModel):
-    trade_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    trade_id: int
+    timestamp: int  # Nanoseconds since epoch, from the engine clock
     symbol: str
     price: Decimal
     quantity: Decimal
     aggressor_side: OrderSide
-    maker_order_id: str
-    taker_order_id: str
+    maker_order_id: int
+    taker_order_id: int
     maker_fee: Decimal = Decimal("0")
     taker_fee: Decimal = Decimal("0")
     fee_currency: str = "USDT"
\ No newline at end of file
@@ -0,0 +1,149 @@
+from decimal import Decimal
+import logging
+
+class _Tournament:
+    """
+    Tournament tree over a fixed number of slots: each internal node holds
+    the slot winning its subtree, so changing one slot replays only the
+    matches on its path to the root, O(log slots), and the overall winner is
+    read from the root in O(1). Empty slots (None) lose every match; equal
+    values go to the lower slot.
+    """
+
+    def __init__(self, capacity: int, highest: bool):
+        size = 1
+        while size < capacity:
+            size *= 2
+        self.size = size
+        self.highest = highest  # Bids: highest wins; asks: lowest wins
+        self.values = [None] * size
+        self.winners = [0] * size + list(range(size))  # node -> winning slot; leaves at size + slot
+        for node in range(size - 1, 0, -1):
+            self.winners[node] = self.winners[2 * node]
+
+    def _play(self, left: int, right: int) -> int:
+        a, b = self.values[left], self.values[right]
+        if b is None:
+            return left
+        if a is None:
+            return right
+        if self.highest:
+            return right if b > a else left
+        return right if b < a else left
+
+    def update(self, slot: int, value: Decimal | None):
+        self.values[slot] = value
+        winners = self.winners
+        node = (self.size + slot) >> 1
+        while node:
+            winners[node] = self._play(winners[2 * node], winners[2 * node + 1])
+            node >>= 1
+
+    def winner(self) -> int | None:
+        """Slot holding the best value, or None if every slot is empty"""
+        slot = self.winners[1]
+        return slot if self.values[slot] is not None else None
+
+class _SymbolQuotes:
+    """Every venue's top of book for one symbol, with a tournament per side"""
+
+    def __init__(self, capacity: int):
+        self.bids = _Tournament(capacity, highest=True)
+        self.asks = _Tournament(capacity, highest=False)
+        self.bid_sizes = [None] * self.bids.size
+        self.ask_sizes = [None] * self.asks.size
+
+class NBBO:
+    """
+    National best bid and offer across away venues, kept per symbol from
+    their top-of-book quote feeds. Each quote replaces one venue's bid and
+    ask, which updates that venue's slot in a tournament tree per side in
+    O(log venues); the best price per side is then cached in best_bids and
+    best_asks, so the matching loop reads a protected price with one
+    dictionary lookup.
+    """
+
+    def __init__(self, venues=()):
+        self.venues = {}  # venue -> slot, in registration order
+        self.quotes = {}  # symbol -> _SymbolQuotes
+        self.best_bids = {}  # symbol -> best away bid; absent when no venue bids
+        self.best_asks = {}  # symbol -> best away ask
+        self.updates = 0
+        self.logger = logging.getLogger(__name__)
+        for venue in venues:
+            self.add_venue(venue)
+
+    def add_venue(self, venue: str) -> int:
+        slot = self.venues.get(venue)
+        if slot is not None:
+            return slot
+        slot = self.venues[venue] = len(self.venues)
+        self._grow(slot + 1)
+        self.logger.info("Away venue %s added", venue)
+        return slot
+
+    def _grow(self, venues: int):
+        """Rebuild the trees of symbols with fewer slots than venues; only when a venue is added"""
+        for symbol, old in self.quotes.items():
+            if old.bids.size >= venues:
+                continue
+            quotes = self.quotes[symbol] = _SymbolQuotes(2 * old.bids.size)
+            for slot in range(old.bids.size):
+                quotes.bids.update(slot, old.bids.values[slot])
+                quotes.asks.update(slot, old.asks.values[slot])
+                quotes.bid_sizes[slot] = old.bid_sizes[slot]
+                quotes.ask_sizes[slot] = old.ask_sizes[slot]
+
+    def on_quote(self, venue: str, symbol: str, bid: Decimal | None, bid_size: Decimal | None,
+                 ask: Decimal | None, ask_size: Decimal | None):
+        """Replace a venue's top of book; a missing price or a zero size withdraws that side"""
+        slot = self.venues.get(venue)
+        if slot is None:
+            slot = self.add_venue(venue)
+        quotes = self.quotes.get(symbol)
+        if quotes is None:
+            quotes = self.quotes[symbol] = _SymbolQuotes(len(self.venues))
+        if not bid_size:
+            bid = None
+        if not ask_size:
+            ask = None
+        if bid is not None and ask is not None and bid >= ask:
+            raise ValueError(f"Quote from {venue} for {symbol} is locked or crossed: {bid} / {ask}")
+        self.updates += 1
+        quotes.bid_sizes[slot] = bid_size if bid is not None else None
+        quotes.ask_sizes[slot] = ask_size if ask is not None else None
+        # A side is only replayed when its price changes; size-only updates cost nothing more
+        if quotes.bids.values[slot] != bid:
+            quotes.bids.update(slot, bid)
+            self._cache(self.best_bids, symbol, quotes.bids)
+        if quotes.asks.values[slot] != ask:
+            quotes.asks.update(slot, ask)
+            self._cache(self.best_asks, symbol, quotes.asks)
+
+    @staticmethod
+    def _cache(best: dict, symbol: str, tree: _Tournament):
+        slot = tree.winner()
+        if slot is None:
+            best.pop(symbol, None)
+        else:
+            best[symbol] = tree.values[slot]
+
+    def quote(self, symbol: str) -> dict:
+        """Best away bid and ask with their size and venue, plus every venue's quote"""
+        quotes = self.quotes.get(symbol)
+        names = list(self.venues)
+        result = {"symbol": symbol, "bid": None, "bid_size": None, "bid_venue": None,
+                  "ask": None, "ask_size": None, "ask_venue": None, "venues": {}}
+        if quotes is None:
+            return result
+        for side, tree, sizes in (("bid", quotes.bids, quotes.bid_sizes), ("ask", quotes.asks, quotes.ask_sizes)):
+            slot = tree.winner()
+            if slot is not None:
+                result[side], result[side + "_size"], result[side + "_venue"] = tree.values[slot], sizes[slot], names[slot]
+        for venue, slot in self.venues.items():
+            result["venues"][venue] = {"bid": quotes.bids.values[slot], "bid_size": quotes.bid_sizes[slot],
+                                       "ask": quotes.asks.values[slot], "ask_size": quotes.ask_sizes[slot]}
+        return result
+
+    def stats(self) -> dict:
+        return {"venues": list(self.venues), "symbols": len(self.quotes), "updates": self.updates}
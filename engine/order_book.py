@@ -2,6 +2,7 @@ from sortedcontainers import SortedDict
 from collections import deque
 from decimal import Decimal
 from .models import Order, OrderSide
+from .peg_book import PegBook
 import logging
 
 class OrderBook:
@@ -12,7 +13,11 @@ class OrderBook:
         self.stop_orders = []  # Stop-loss and stop-limit orders
         self.take_profit_orders = []  # Take-profit orders
         self.logger = logging.getLogger(__name__)
-        self.order_map = {}  # order_id -> (price, index in queue)
+        self.order_map = {}  # order_id -> resting order
+        self.depth = None  # BucketedDepth when the engine maintains grouped depth
+        self.level_totals = None  # LevelTotals once a publisher needs per-level quantities
+        self.digest = None  # BookDigest when the engine journals or follows a journal
+        self.pegs = PegBook()  # Pegged orders, priced from this book's best bid and ask
     
     def add_order(self, order: Order):
         book = self.bids if order.side == OrderSide.BUY else self.asks
@@ -21,20 +26,26 @@ class OrderBook:
         if price not in book:
             book[price] = deque()
         book[price].append(order)
-        self.logger.debug(f"Added order {order.order_id} to {order.side} book at {price}")
-        self.order_map[order.order_id] = (price, len(book[price])-1)
+        self.logger.debug("Added order %s to %s book at %s", order.order_id, order.side, price)
+        self.order_map[order.order_id] = order
+        if self.depth is not None:
+            self.depth.update(order.side, price, order.quantity)
+        if self.level_totals is not None:
+            self.level_totals.update(order.side, price, order.quantity)
+        if self.digest is not None:
+            self.digest.update(order.side, price, order.order_id, 0, order.quantity)
     
     def add_stop_order(self, order: Order):
         self.stop_orders.append(order)
         self.stop_orders.sort(key=lambda o: o.stop_price, 
                              reverse=(order.side == OrderSide.SELL))
-        self.logger.debug(f"Added stop order {order.order_id} at {order.stop_price}")
+        self.logger.debug("Added stop order %s at %s", order.order_id, order.stop_price)
     
     def add_take_profit_order(self, order: Order):
         self.take_profit_orders.append(order)
         self.take_profit_orders.sort(key=lambda o: o.take_profit_price, 
                                     reverse=(order.side == OrderSide.BUY))
-        self.logger.debug(f"Added take-profit order {order.order_id} at {order.take_profit_price}")
+        self.logger.debug("Added take-profit order %s at %s", order.order_id, order.take_profit_price)
     
     def remove_order(self, price: Decimal, order_id: str, side: OrderSide):
         book = self.bids if side == OrderSide.BUY else self.asks
@@ -43,12 +54,55 @@ class OrderBook:
             for i, order in enumerate(orders):
                 if order.order_id == order_id:
                     del orders[i]
-                    self.logger.debug(f"Removed order {order_id} from {side} book at {price}")
+                    self.order_map.pop(order_id, None)
+                    if self.depth is not None:
+                        self.depth.update(side, price, -order.quantity)
+                    if self.level_totals is not None:
+                        self.level_totals.update(side, price, -order.quantity)
+                    if self.digest is not None:
+                        self.digest.update(side, price, order_id, order.quantity, 0)
+                    self.logger.debug("Removed order %s from %s book at %s", order_id, side, price)
                     if not orders:
                         del book[price]
                     return True
         return False
     
+    def get_order(self, order_id: int):
+        """Resting order by ID, or None"""
+        return self.order_map.get(order_id)
+    
+    def cancel_order(self, order_id: int) -> bool:
+        """Remove a live order by ID alone: resting orders via order_map, then pegged orders, then the trigger lists"""
+        order = self.order_map.get(order_id)
+        if order is not None:
+            return self.remove_order(order.price, order_id, order.side)
+        if self.pegs.remove(order_id) is not None:
+            return True
+        for orders in (self.stop_orders, self.take_profit_orders):
+            for order in orders:
+                if order.order_id == order_id:
+                    orders.remove(order)
+                    return True
+        return False
+    
+    def reduce_order(self, order: Order, quantity: Decimal):
+        """Take quantity off a resting order (a fill or an amend down); the caller removes it once empty"""
+        order.quantity -= quantity
+        if self.depth is not None:
+            self.depth.update(order.side, order.price, -quantity)
+        if self.level_totals is not None:
+            self.level_totals.update(order.side, order.price, -quantity)
+        if self.digest is not None:
+            self.digest.update(order.side, order.price, order.order_id, order.quantity + quantity, order.quantity)
+    
+    def remove_filled(self, book: SortedDict, price: Decimal):
+        """Drop the fully filled order at the head of a level, and the level once empty"""
+        orders = book[price]
+        filled = orders.popleft()
+        self.order_map.pop(filled.order_id, None)
+        if not orders:
+            del book[price]
+    
     @property
     def best_bid(self) -> Decimal | None:
         return self.bids.peekitem(0)[0] if self.bids else None
@@ -0,0 +1,46 @@
+from .models import Order
+
+class OrderIndex:
+    """
+    Live orders (resting, stop and take-profit) by ID and by user and symbol,
+    maintained by MatchingEngine alongside the books. Looking up an order is
+    O(1), and a user's orders are found without scanning any book.
+    """
+
+    def __init__(self):
+        self.orders = {}  # order_id -> (symbol, user_id, the order if outside the price levels (trigger, pegged) or None)
+        self.by_user = {}  # user_id -> {symbol -> {order_id: None}}, in arrival order
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def add(self, order: Order, trigger: bool = False):
+        self.orders[order.order_id] = (order.symbol, order.user_id, order if trigger else None)
+        if order.user_id is not None:
+            symbols = self.by_user.setdefault(order.user_id, {})
+            symbols.setdefault(order.symbol, {})[order.order_id] = None
+
+    def remove(self, order_id: int):
+        entry = self.orders.pop(order_id, None)
+        if entry is None:
+            return
+        symbol, user_id, _ = entry
+        if user_id is None:
+            return
+        symbols = self.by_user[user_id]
+        order_ids = symbols[symbol]
+        del order_ids[order_id]
+        if not order_ids:
+            del symbols[symbol]
+            if not symbols:
+                del self.by_user[user_id]
+
+    def get(self, order_id: int) -> tuple | None:
+        return self.orders.get(order_id)
+
+    def user_orders(self, user_id: str, symbol: str = None) -> list:
+        """(symbol, order_id) of a user's live orders, optionally for one symbol"""
+        symbols = self.by_user.get(user_id, {})
+        if symbol is not None:
+            return [(symbol, order_id) for order_id in symbols.get(symbol, ())]
+        return [(s, order_id) for s, order_ids in symbols.items() for order_id in order_ids]
@@ -0,0 +1,102 @@
+from collections import deque
+from decimal import Decimal
+from sortedcontainers import SortedDict
+from .models import Order, OrderSide, PegType
+from .fixed_point import round_fixed
+
+_TWO = Decimal("2")
+
+class PegBook:
+    """
+    Resting pegged orders of one symbol, kept by side, peg type and offset
+    rather than by price. A level's price is derived from the displayed best
+    bid and ask only when it is matched against or looked up, so a move in
+    the BBO reprices every pegged order at once without touching any of them.
+    Pegged orders are not displayed and never set the BBO they follow; with
+    an NBBO attached the engine passes the national best instead.
+    """
+
+    def __init__(self):
+        # (side, peg type) -> offset -> FIFO of orders; the smallest offset is closest to the peg
+        self.levels = {(side, peg_type): SortedDict() for side in OrderSide for peg_type in PegType}
+        self.order_map = {}  # order_id -> order
+        self.sizes = {OrderSide.BUY: 0, OrderSide.SELL: 0}  # Orders per side
+
+    def __len__(self) -> int:
+        return len(self.order_map)
+
+    def add(self, order: Order):
+        levels = self.levels[order.side, order.peg_type]
+        orders = levels.get(order.peg_offset)
+        if orders is None:
+            orders = levels[order.peg_offset] = deque()
+        orders.append(order)
+        self.order_map[order.order_id] = order
+        self.sizes[order.side] += 1
+
+    def remove(self, order_id: int) -> Order | None:
+        order = self.order_map.pop(order_id, None)
+        if order is None:
+            return None
+        levels = self.levels[order.side, order.peg_type]
+        orders = levels[order.peg_offset]
+        orders.remove(order)
+        if not orders:
+            del levels[order.peg_offset]
+        self.sizes[order.side] -= 1
+        return order
+
+    def remove_filled(self, order: Order):
+        """Drop a fully filled order, which is at the head of its level"""
+        levels = self.levels[order.side, order.peg_type]
+        orders = levels[order.peg_offset]
+        orders.popleft()
+        if not orders:
+            del levels[order.peg_offset]
+        del self.order_map[order.order_id]
+        self.sizes[order.side] -= 1
+
+    def get_order(self, order_id: int) -> Order | None:
+        return self.order_map.get(order_id)
+
+    @staticmethod
+    def peg_price(side: OrderSide, peg_type: PegType, offset: Decimal,
+                  best_bid: Decimal | None, best_ask: Decimal | None) -> Decimal | None:
+        """Price of a peg at the given BBO, or None while its reference price is missing"""
+        if peg_type is PegType.MIDPOINT:
+            if best_bid is None or best_ask is None:
+                return None
+            # Rounded so a midpoint print fits the fixed-point trade records
+            return round_fixed((best_bid + best_ask) / _TWO)
+        if side is OrderSide.BUY:
+            return best_bid - offset if best_bid is not None else None
+        return best_ask + offset if best_ask is not None else None
+
+    def best(self, side: OrderSide, best_bid: Decimal | None, best_ask: Decimal | None) -> tuple | None:
+        """(price, order) of the pegged order on side that trades first at this BBO: best price, then earliest"""
+        best = None
+        for peg_type in PegType:
+            levels = self.levels[side, peg_type]
+            if not levels:
+                continue
+            offset, orders = levels.peekitem(0)
+            price = self.peg_price(side, peg_type, offset, best_bid, best_ask)
+            if price is None:
+                continue
+            order = orders[0]
+            if best is None or (price > best[0] if side is OrderSide.BUY else price < best[0]) or \
+                    (price == best[0] and order.order_id < best[1].order_id):
+                best = (price, order)
+        return best
+
+    def midpoint_heads(self) -> tuple | None:
+        """Earliest midpoint buy and sell, if both sides have one"""
+        bids = self.levels[OrderSide.BUY, PegType.MIDPOINT]
+        asks = self.levels[OrderSide.SELL, PegType.MIDPOINT]
+        if not bids or not asks:
+            return None
+        return bids.peekitem(0)[1][0], asks.peekitem(0)[1][0]
+
+    def orders(self) -> list:
+        """Every pegged order, by side, peg type, offset and arrival"""
+        return [order for levels in self.levels.values() for orders in levels.values() for order in orders]
@@ -1,10 +1,14 @@
 import json
+import os
 from pathlib import Path
 from decimal import Decimal
 import logging
 from collections import deque
+from datetime import datetime, timedelta, timezone
 from .order_book import OrderBook
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 class PersistenceManager:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
@@ -14,14 +18,14 @@ class PersistenceManager:
     def save_order_book(self, symbol: str, order_book: OrderBook):
         try:
             file_path = self.data_dir / f"{symbol}_orderbook.json"
-            with open(file_path, 'w') as f:
-                data = {
-                    "bids": self._serialize_levels(order_book.bids),
-                    "asks": self._serialize_levels(order_book.asks),
-                    "stop_orders": [self._serialize_order(order) for order in order_book.stop_orders],
-                    "take_profit_orders": [self._serialize_order(order) for order in order_book.take_profit_orders]
-                }
-                json.dump(data, f, default=str)
+            data = {
+                "bids": self._serialize_levels(order_book.bids),
+                "asks": self._serialize_levels(order_book.asks),
+                "stop_orders": [self._serialize_order(order) for order in order_book.stop_orders],
+                "take_profit_orders": [self._serialize_order(order) for order in order_book.take_profit_orders],
+                "pegged_orders": [self._serialize_order(order) for order in order_book.pegs.orders()]
+            }
+            self._write_atomic(file_path, data)
             self.logger.info(f"Saved order book for {symbol}")
         except Exception as e:
             self.logger.error(f"Failed to save order book: {str(e)}")
@@ -49,12 +53,53 @@ class PersistenceManager:
                     result["take_profit_orders"] = [self._deserialize_order(order) for order in data["take_profit_orders"]]
                 else:
                     result["take_profit_orders"] = []
-                    
+                result["pegged_orders"] = [self._deserialize_order(order) for order in data.get("pegged_orders", [])]
+                legacy = sum(order.order_id is None for order in self._orders(result))
+                if legacy:
+                    self.logger.warning(f"Snapshot for {symbol} predates integer order IDs; "
+                                        f"{legacy} orders will be given new IDs")
                 return result
         except Exception as e:
             self.logger.error(f"Failed to load order book: {str(e)}")
             return None
     
+    def list_order_books(self) -> list:
+        """Symbols with a saved order book"""
+        return [path.name[:-len("_orderbook.json")] for path in self.data_dir.glob("*_orderbook.json")]
+    
+    def _write_atomic(self, file_path: Path, data: dict):
+        """Write to a temporary file and rename it over file_path, so a failed save keeps the last snapshot"""
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
+    def save_sequence_state(self, state: dict):
+        try:
+            self._write_atomic(self.data_dir / "sequence.json", state)
+        except Exception as e:
+            self.logger.error(f"Failed to save sequence state: {str(e)}")
+    
+    def load_sequence_state(self) -> dict:
+        file_path = self.data_dir / "sequence.json"
+        if not file_path.exists():
+            return None
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    
+    def _orders(self, result: dict):
+        for levels in (result["bids"], result["asks"]):
+            for orders in levels.values():
+                yield from orders
+        for key in ("stop_orders", "take_profit_orders", "pegged_orders"):
+            yield from result[key]
+    
     def _serialize_levels(self, levels):
         serialized = []
         for price, orders in levels.items():
@@ -82,13 +127,17 @@ class PersistenceManager:
             "price": str(order.price) if order.price else None,
             "stop_price": str(order.stop_price) if hasattr(order, 'stop_price') and order.stop_price else None,
             "take_profit_price": str(order.take_profit_price) if hasattr(order, 'take_profit_price') and order.take_profit_price else None,
-            "timestamp": order.timestamp.isoformat()
+            "timestamp": order.timestamp,
+            "parent_order_id": order.parent_order_id,
+            "user_id": order.user_id,
+            "peg_type": getattr(order, "peg_type", None),
+            "peg_offset": str(order.peg_offset) if getattr(order, "peg_type", None) else None
         }
     
     def _deserialize_order(self, order_dict):
         from .models import Order, OrderType, OrderSide
         return Order(
-            order_id=order_dict["order_id"],
+            order_id=self._deserialize_id(order_dict["order_id"]),
             symbol=order_dict["symbol"],
             order_type=OrderType(order_dict["order_type"]),
             side=OrderSide(order_dict["side"]),
@@ -96,5 +145,25 @@ class PersistenceManager:
             price=Decimal(order_dict["price"]) if order_dict["price"] else None,
             stop_price=Decimal(order_dict["stop_price"]) if order_dict.get("stop_price") else None,
             take_profit_price=Decimal(order_dict["take_profit_price"]) if order_dict.get("take_profit_price") else None,
-            timestamp=order_dict["timestamp"]
-        ) 
\ No newline at end of file
+            timestamp=self._deserialize_timestamp(order_dict["timestamp"]),
+            parent_order_id=self._deserialize_id(order_dict.get("parent_order_id")),
+            user_id=order_dict.get("user_id"),
+            peg_type=order_dict.get("peg_type"),
+            peg_offset=Decimal(order_dict["peg_offset"]) if order_dict.get("peg_offset") else Decimal("0")
+        )
+    
+    def _deserialize_id(self, order_id):
+        """Integer order ID; UUIDs from snapshots written before integer IDs load as None for the engine to reassign"""
+        try:
+            return int(order_id)
+        except (TypeError, ValueError):
+            return None
+    
+    def _deserialize_timestamp(self, timestamp):
+        """Nanoseconds since epoch; older snapshots hold naive UTC ISO8601 strings"""
+        if isinstance(timestamp, str):
+            dt = datetime.fromisoformat(timestamp)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return (dt - _EPOCH) // timedelta(microseconds=1) * 1000
+        return int(timestamp)
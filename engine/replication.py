@@ -0,0 +1,213 @@
+import json
+import struct
+import time
+import zlib
+from decimal import Decimal
+from pathlib import Path
+import logging
+from .fixed_point import to_fixed
+from .models import Order, OrderSide
+
+_ENTRY = struct.Struct("<bqqq")  # side/list tag, price, order_id, quantity
+_MASK = 2 ** 64 - 1
+
+def _entry(tag: int, price: Decimal, order_id: int, quantity: Decimal) -> int:
+    return zlib.crc32(_ENTRY.pack(tag, to_fixed(price), order_id, to_fixed(quantity)))
+
+class BookDigest:
+    """
+    Digest of a book's resting orders: the sum of one CRC32 per order, so it
+    can be kept up to date on every add, reduce and remove instead of being
+    recomputed from every order. It does not depend on queue order.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, order_book=None):
+        self.value = 0
+        if order_book is not None:
+            for side, levels in ((OrderSide.BUY, order_book.bids), (OrderSide.SELL, order_book.asks)):
+                for price, orders in levels.items():
+                    for order in orders:
+                        self.update(side, price, order.order_id, 0, order.quantity)
+
+    def update(self, side: OrderSide, price: Decimal, order_id: int, old_quantity: Decimal, new_quantity: Decimal):
+        """An order's resting quantity changed; 0 means absent"""
+        tag = 0 if side == OrderSide.BUY else 1
+        value = self.value
+        if old_quantity:
+            value -= _entry(tag, price, order_id, old_quantity)
+        if new_quantity:
+            value += _entry(tag, price, order_id, new_quantity)
+        self.value = value & _MASK
+
+def book_checksum(order_book) -> int:
+    """Checksum of every live order of a book; identical books give identical checksums"""
+    digest = order_book.digest if order_book.digest is not None else BookDigest(order_book)
+    # Trigger and pegged orders change outside the book's add/reduce/remove, and are few: scanned each time
+    crc = 0
+    for tag, orders in ((2, order_book.stop_orders), (3, order_book.take_profit_orders), (4, order_book.pegs.orders())):
+        for order in orders:
+            crc = zlib.crc32(_ENTRY.pack(tag, 0, order.order_id, to_fixed(order.quantity)), crc)
+    return (digest.value + crc) & _MASK
+
+def engine_checksums(engine) -> dict:
+    return {symbol: book_checksum(order_book) for symbol, order_book in sorted(engine.order_books.items())}
+
+class EventJournal:
+    """
+    Appends the primary engine's inbound events (orders, cancels, amends,
+    market price updates, away quotes) to a JSON-lines journal in sequence order. Every
+    `checksum_every` events a checksum record of all books is written too,
+    so a follower can detect divergence without comparing full books. The
+    books keep their digests up to date as they change, so a checksum record
+    does not rescan resting orders on the matching thread.
+    """
+
+    def __init__(self, engine, path: str, checksum_every: int = 1000):
+        self.engine = engine
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.last_seq = self._last_journaled_seq()
+        # Continue the sequence of an existing journal after a restart
+        engine.sequencer.observe_event_seq(self.last_seq)
+        self.file = open(self.path, "a")
+        self.checksum_every = checksum_every
+        self.events_since_checksum = 0
+        engine.enable_book_digests()
+        engine.add_event_listener(self.on_event)
+
+    def _last_journaled_seq(self) -> int:
+        if not self.path.exists():
+            return 0
+        with open(self.path, "rb") as f:
+            f.seek(max(f.seek(0, 2) - 65536, 0))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if "seq" in record:
+                return record["seq"]
+        return 0
+
+    def _write(self, record: dict):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def on_event(self, event: dict):
+        # Listeners run before the event is applied, so the books reflect
+        # everything up to and including last_seq at this point
+        if self.events_since_checksum >= self.checksum_every:
+            self.checkpoint()
+        self._write(event)
+        self.last_seq = event["seq"]
+        self.events_since_checksum += 1
+
+    def checkpoint(self):
+        self._write({"type": "checksum", "after_seq": self.last_seq, "books": engine_checksums(self.engine)})
+        self.events_since_checksum = 0
+
+    def close(self):
+        self.checkpoint()
+        self.file.close()
+
+class ReplicaFollower:
+    """
+    Hot standby: tails an EventJournal and applies each event to its own
+    MatchingEngine. Matching only uses the event's timestamp and the
+    sequencer, so the replica stays book-identical to the primary; checksum
+    records are verified as they arrive. Call promote() on primary failure.
+    """
+
+    def __init__(self, engine, path: str):
+        self.engine = engine
+        self.path = Path(path)
+        self.offset = 0
+        self.applied_seq = 0
+        self.checksums_verified = 0
+        self.diverged = False
+        self.promoted = False
+        self.logger = logging.getLogger(__name__)
+        engine.enable_book_digests()
+
+    def poll(self) -> int:
+        """Apply all complete events appended since the last poll; returns how many"""
+        if not self.path.exists():
+            return 0
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        applied = 0
+        end = data.rfind(b"\n") + 1  # Leave a partially written last line for the next poll
+        for line in data[:end].splitlines():
+            if line:
+                self.apply(json.loads(line))
+                applied += 1
+        self.offset += end
+        return applied
+
+    def apply(self, event: dict):
+        event_type = event["type"]
+        if event_type == "checksum":
+            self._verify(event)
+            return
+        self.engine.sequencer.observe_event_seq(event["seq"])
+        try:
+            if event_type == "order":
+                trigger_price = event.get("trigger_price")
+                self.engine.process_order(
+                    Order.model_validate(event["order"]),
+                    user_id=event.get("user_id"),
+                    trigger_price=Decimal(trigger_price) if trigger_price is not None else None
+                )
+            elif event_type == "cancel":
+                self.engine.cancel_order(event["symbol"], event["order_id"], timestamp=event["timestamp"])
+            elif event_type == "amend":
+                price = event.get("price")
+                self.engine.amend_order(event["symbol"], event["order_id"], Decimal(event["quantity"]),
+                                        Decimal(price) if price is not None else None, timestamp=event["timestamp"])
+            elif event_type == "auction_start":
+                self.engine.start_auction(event["symbol"], timestamp=event["timestamp"])
+            elif event_type == "auction_end":
+                self.engine.end_auction(event["symbol"], timestamp=event["timestamp"])
+            elif event_type == "market_price":
+                self.engine.update_market_price(event["symbol"], Decimal(event["price"]), timestamp=event["timestamp"])
+            elif event_type == "away_quote":
+                self.engine.update_away_quote(
+                    event["venue"], event["symbol"],
+                    *(Decimal(event[key]) if event[key] is not None else None
+                      for key in ("bid", "bid_size", "ask", "ask_size")),
+                    timestamp=event["timestamp"]
+                )
+        except ValueError as e:
+            # The primary rejected the same event the same way
+            self.logger.debug("Replayed event %s was rejected: %s", event["seq"], e)
+        except Exception:
+            # Keep following; if the replica's books are now off, the next checksum record reports it
+            self.logger.exception("Replaying event %s failed", event["seq"])
+        self.applied_seq = event["seq"]
+
+    def _verify(self, record: dict):
+        if record["after_seq"] != self.applied_seq:
+            return
+        # Only the primary's loaded books are listed; the rest are still as in their snapshot on both sides
+        books = {symbol: book_checksum(self.engine.order_books[symbol]) for symbol in record["books"]}
+        if books != record["books"]:
+            self.diverged = True
+            self.logger.error("Replica diverged from primary after event %s", record["after_seq"])
+        else:
+            self.checksums_verified += 1
+
+    def run(self, poll_interval: float = 0.01, should_stop=lambda: False):
+        while not self.promoted and not should_stop():
+            if not self.poll():
+                time.sleep(poll_interval)
+
+    def promote(self):
+        """Catch up on the journal tail and take over as primary"""
+        self.poll()
+        self.promoted = True
+        self.logger.info("Replica promoted at event %s", self.applied_seq)
+        return self.engine
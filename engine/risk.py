@@ -0,0 +1,197 @@
+import json
+import time
+from decimal import Decimal
+from pydantic import BaseModel
+import logging
+from .models import Order, OrderType, OrderSide
+
+_ZERO = Decimal("0")
+
+class RiskLimits(BaseModel):
+    """Pre-trade limits; None disables a check"""
+    price_collar: Decimal | None = None  # Max distance of a price from the last trade price as a fraction, e.g. 0.05 = ±5%
+    max_order_quantity: Decimal | None = None
+    max_order_notional: Decimal | None = None  # Price x quantity; market orders are valued at the last trade price
+    max_open_notional: Decimal | None = None  # Per user, over resting orders on every symbol
+    max_position: Decimal | None = None  # Per user and symbol, absolute net filled quantity
+
+class CheckStats:
+    """
+    Calls and rejections of one check, plus latency of the sampled calls in
+    power-of-two ns buckets.
+    """
+    __slots__ = ("checked", "rejected", "timed", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.checked = 0
+        self.rejected = 0
+        self.timed = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = [0] * 64  # bucket i holds latencies below 2**i ns
+
+    def record(self, ns: int):
+        self.timed += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.histogram[ns.bit_length()] += 1
+
+    def percentile(self, fraction: float) -> int:
+        """Upper bound of the bucket holding the given fraction of timed calls"""
+        threshold = self.timed * fraction
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= threshold:
+                return 1 << i
+        return 0
+
+    def summary(self) -> dict:
+        return {
+            "checked": self.checked,
+            "rejected": self.rejected,
+            "timed": self.timed,
+            "mean_ns": self.total_ns // self.timed if self.timed else 0,
+            "p50_ns": self.percentile(0.5),
+            "p99_ns": self.percentile(0.99),
+            "max_ns": self.max_ns
+        }
+
+class RiskManager:
+    """
+    Pre-trade risk stage run by MatchingEngine.process_order before an order
+    is sequenced. Per-user open notional and positions are counters the
+    engine updates as orders rest, fill and cancel, so each check is a few
+    dictionary lookups and never scans a user's orders. Rejections raise
+    ValueError, like the instrument checks.
+    """
+
+    CHECKS = ("price_collar", "max_order_quantity", "max_order_notional", "max_open_notional", "max_position")
+
+    def __init__(self, limits: RiskLimits = None, symbol_limits: dict = None, sample_every: int = 16):
+        self.limits = limits or RiskLimits()
+        self.symbol_limits = symbol_limits or {}  # symbol -> RiskLimits replacing the defaults
+        self.open_notional = {}  # user_id -> price x quantity of resting orders
+        self.positions = {}  # user_id -> {symbol -> net filled quantity, buys positive}
+        self.check_stats = {name: CheckStats() for name in self.CHECKS}
+        # Latency is timed on one order in sample_every; reading the clock costs as much as a check
+        self.sample_every = sample_every
+        self.calls = 0
+        # The enabled checks per limit set, as (check, limit, stats), so check() skips disabled ones for free
+        self.plan = self._plan(self.limits)
+        self.symbol_plans = {symbol: self._plan(limits) for symbol, limits in self.symbol_limits.items()}
+        self.logger = logging.getLogger(__name__)
+
+    def _plan(self, limits: RiskLimits) -> list:
+        return [(getattr(self, "_" + name), getattr(limits, name), self.check_stats[name])
+                for name in self.CHECKS if getattr(limits, name) is not None]
+
+    @classmethod
+    def load(cls, path: str) -> "RiskManager":
+        """Read {"default": limits, "symbols": {symbol: limits}} from a JSON file"""
+        with open(path) as f:
+            config = json.load(f)
+        manager = cls(RiskLimits.model_validate(config.get("default", {})),
+                      {symbol: RiskLimits.model_validate(limits) for symbol, limits in config.get("symbols", {}).items()})
+        manager.logger.info("Loaded risk limits from %s (%s symbol overrides)", path, len(manager.symbol_limits))
+        return manager
+
+    def check(self, order: Order, last_price: Decimal = None, released: Decimal = Decimal("0")):
+        """
+        Raise ValueError if the order breaks a limit. released is open
+        notional the order replaces (an amended order's current exposure).
+        """
+        plan = self.symbol_plans.get(order.symbol, self.plan)
+        reference = order.price if order.price is not None else last_price
+        self.calls += 1
+        timed = self.calls % self.sample_every == 0
+        t0 = time.perf_counter_ns() if timed else 0
+        for check, limit, stats in plan:
+            error = check(order, limit, reference, last_price, released)
+            stats.checked += 1
+            if timed:
+                t1 = time.perf_counter_ns()
+                stats.record(t1 - t0)
+                t0 = t1
+            if error is not None:
+                stats.rejected += 1
+                raise ValueError(error)
+
+    def _price_collar(self, order, limit, reference, last_price, released):
+        if order.price is None or last_price is None:
+            return None
+        if abs(order.price - last_price) > last_price * limit:
+            return f"Price {order.price} is outside the {limit} collar around the last trade price {last_price}"
+        return None
+
+    def _max_order_quantity(self, order, limit, reference, last_price, released):
+        if order.quantity > limit:
+            return f"Quantity {order.quantity} exceeds the maximum order quantity of {limit}"
+        return None
+
+    def _max_order_notional(self, order, limit, reference, last_price, released):
+        if reference is not None and reference * order.quantity > limit:
+            return f"Notional {reference * order.quantity} exceeds the maximum order notional of {limit}"
+        return None
+
+    def _max_open_notional(self, order, limit, reference, last_price, released):
+        # Only priced limit orders count; IOC, FOK and market orders never rest, and pegged orders have no fixed price
+        user_id = order.user_id
+        if user_id is None or order.order_type is not OrderType.LIMIT or order.price is None:
+            return None
+        open_notional = self.open_notional.get(user_id, _ZERO) + order.price * order.quantity
+        if released:
+            open_notional -= released
+        if open_notional > limit:
+            return f"Open notional {open_notional} of user {order.user_id} would exceed the limit of {limit}"
+        return None
+
+    def _max_position(self, order, limit, reference, last_price, released):
+        user_id = order.user_id
+        if user_id is None:
+            return None
+        positions = self.positions.get(user_id)
+        position = positions.get(order.symbol, _ZERO) if positions else _ZERO
+        worst = position + order.quantity if order.side is OrderSide.BUY else position - order.quantity
+        # Orders that bring the position back towards flat are always accepted
+        if abs(worst) > limit and abs(worst) > abs(position):
+            return f"Position {worst} of user {order.user_id} on {order.symbol} would exceed the limit of {limit}"
+        return None
+
+    def on_rest(self, user_id: str, price: Decimal, quantity: Decimal):
+        """Quantity added to (positive) or taken off (negative) a user's resting orders at price"""
+        if user_id is None:
+            return
+        open_notional = self.open_notional.get(user_id, _ZERO) + price * quantity
+        if open_notional:
+            self.open_notional[user_id] = open_notional
+        else:
+            del self.open_notional[user_id]
+
+    def on_fill(self, user_id: str, order, quantity: Decimal, resting: bool = True):
+        """A fill of quantity on order; a resting order's fill also releases its open notional"""
+        if user_id is None:
+            return
+        positions = self.positions.get(user_id)
+        if positions is None:
+            positions = self.positions[user_id] = {}
+        symbol = order.symbol
+        positions[symbol] = positions.get(symbol, _ZERO) + (quantity if order.side is OrderSide.BUY else -quantity)
+        if resting:
+            open_notional = self.open_notional[user_id] - order.price * quantity
+            if open_notional:
+                self.open_notional[user_id] = open_notional
+            else:
+                del self.open_notional[user_id]
+
+    def exposure(self, user_id: str) -> dict:
+        return {
+            "user_id": user_id,
+            "open_notional": self.open_notional.get(user_id, _ZERO),
+            "positions": dict(self.positions.get(user_id, {}))
+        }
+
+    def stats(self) -> dict:
+        """Per-check calls, rejections and latency, for the checks that have run"""
+        return {name: stats.summary() for name, stats in self.check_stats.items() if stats.checked}
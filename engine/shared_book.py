@@ -0,0 +1,182 @@
+import struct
+from multiprocessing import shared_memory, resource_tracker
+from .fixed_point import to_fixed, from_fixed
+from .depth import LevelTotals
+import logging
+
+# Segment layout (all little-endian int64, prices/quantities fixed-point):
+#   header:    max_symbols, depth, num_symbols
+#   directory: max_symbols x 32-byte symbol names
+#   slots:     max_symbols x [seq, best_bid, best_ask, last_price, n_bids, n_asks,
+#                             depth x (bid price, bid qty), depth x (ask price, ask qty)]
+# A price of 0 means "none". `seq` is a seqlock counter: odd while the
+# publisher is writing, so readers retry instead of returning a torn snapshot.
+HEADER = struct.Struct("<qqq")
+NAME = struct.Struct("32s")
+SLOT_HEADER = struct.Struct("<qqqqqq")
+LEVEL = struct.Struct("<qq")
+SEQ = struct.Struct("<q")
+
+def _slot_size(depth: int) -> int:
+    return SLOT_HEADER.size + 2 * depth * LEVEL.size
+
+def _rendered(value: int) -> str:
+    return f"{from_fixed(value).normalize():f}"
+
+class SharedBookPublisher:
+    """
+    Publishes best bid/ask, last trade price and top-N depth of every book of
+    one MatchingEngine into a named shared-memory segment after each change.
+    Runs in the single matching process; any number of SharedBookReaders in
+    other processes can serve order book queries from the segment. Level
+    quantities come from LevelTotals the publisher attaches to each book, so
+    an update costs O(depth) however many orders the levels hold.
+    """
+
+    def __init__(self, engine, name: str, max_symbols: int = 64, depth: int = 10):
+        self.engine = engine
+        self.depth = depth
+        self.max_symbols = max_symbols
+        self.slot_size = _slot_size(depth)
+        self.slots_offset = HEADER.size + max_symbols * NAME.size
+        self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                              size=self.slots_offset + max_symbols * self.slot_size)
+        HEADER.pack_into(self.shm.buf, 0, max_symbols, depth, 0)
+        self.slots = {}  # symbol -> slot index
+        self.scratch = bytearray(self.slot_size)  # One slot, packed before it is copied in
+        self.logger = logging.getLogger(__name__)
+        engine.add_book_listener(self.on_book_update)
+
+    def _slot(self, symbol: str) -> int | None:
+        slot = self.slots.get(symbol)
+        if slot is None:
+            if len(self.slots) >= self.max_symbols:
+                self.logger.warning("Shared book segment full, not publishing %s", symbol)
+                return None
+            name = symbol.encode()
+            if len(name) > NAME.size:
+                # A truncated name could collide with another symbol's
+                self.logger.warning("Symbol %s is longer than %s bytes, not publishing it", symbol, NAME.size)
+                return None
+            slot = self.slots[symbol] = len(self.slots)
+            NAME.pack_into(self.shm.buf, HEADER.size + slot * NAME.size, name)
+            # Publish the directory entry only after the name is written
+            HEADER.pack_into(self.shm.buf, 0, self.max_symbols, self.depth, len(self.slots))
+        return slot
+
+    def _levels(self, levels, totals: dict) -> list:
+        return [(to_fixed(price), to_fixed(totals[price])) for price in levels.islice(stop=self.depth)]
+
+    def on_book_update(self, symbol: str, order_book):
+        slot = self._slot(symbol)
+        if slot is None:
+            return
+        totals = order_book.level_totals
+        if totals is None:
+            totals = order_book.level_totals = LevelTotals(order_book)
+        last_price = self.engine.last_trade_prices.get(symbol)
+        buf = self.shm.buf
+        offset = self.slots_offset + slot * self.slot_size
+        seq = SEQ.unpack_from(buf, offset)[0]
+        # Pack into a scratch copy first: a value that does not fit must not leave the seqlock odd
+        data = self.scratch
+        try:
+            bids = self._levels(order_book.bids, totals.bids)
+            asks = self._levels(order_book.asks, totals.asks)
+            SLOT_HEADER.pack_into(data, 0, seq + 1,
+                                  bids[0][0] if bids else 0,
+                                  asks[0][0] if asks else 0,
+                                  to_fixed(last_price) if last_price is not None else 0,
+                                  len(bids), len(asks))
+            position = SLOT_HEADER.size
+            for price, quantity in bids:
+                LEVEL.pack_into(data, position, price, quantity)
+                position += LEVEL.size
+            position = SLOT_HEADER.size + self.depth * LEVEL.size
+            for price, quantity in asks:
+                LEVEL.pack_into(data, position, price, quantity)
+                position += LEVEL.size
+        except (ValueError, struct.error) as e:
+            self.logger.error("Could not publish %s: %s", symbol, e)
+            return
+        SEQ.pack_into(buf, offset, seq + 1)  # Odd: write in progress
+        buf[offset + SEQ.size:offset + self.slot_size] = data[SEQ.size:]
+        SEQ.pack_into(buf, offset, seq + 2)  # Even: snapshot complete
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach without registering with the resource tracker, which would
+    otherwise unlink the publisher's segment when this process exits"""
+    try:
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:  # Python < 3.13 has no `track` argument
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name, create=False)
+        finally:
+            resource_tracker.register = register
+
+class SharedBookReader:
+    """Read-only view of a SharedBookPublisher segment, safe to use from any process"""
+
+    def __init__(self, name: str, max_retries: int = 1000):
+        self.shm = _attach(name)
+        self.max_symbols, self.depth, _ = HEADER.unpack_from(self.shm.buf, 0)
+        self.slot_size = _slot_size(self.depth)
+        self.slots_offset = HEADER.size + self.max_symbols * NAME.size
+        self.max_retries = max_retries
+        self.slots = {}
+
+    def _slot(self, symbol: str) -> int | None:
+        slot = self.slots.get(symbol)
+        if slot is None:
+            num_symbols = HEADER.unpack_from(self.shm.buf, 0)[2]
+            for i in range(len(self.slots), num_symbols):
+                name = NAME.unpack_from(self.shm.buf, HEADER.size + i * NAME.size)[0]
+                self.slots[name.rstrip(b"\0").decode()] = i
+            slot = self.slots.get(symbol)
+        return slot
+
+    def snapshot(self, symbol: str) -> dict | None:
+        slot = self._slot(symbol)
+        if slot is None:
+            return None
+        buf = self.shm.buf
+        offset = self.slots_offset + slot * self.slot_size
+        for _ in range(self.max_retries):
+            seq = SEQ.unpack_from(buf, offset)[0]
+            if seq & 1:
+                continue
+            data = bytes(buf[offset:offset + self.slot_size])
+            if SEQ.unpack_from(buf, offset)[0] == seq:
+                break
+        else:
+            raise RuntimeError(f"Could not read a consistent snapshot for {symbol}")
+        _, best_bid, best_ask, last_price, n_bids, n_asks = SLOT_HEADER.unpack_from(data, 0)
+        bids_offset = SLOT_HEADER.size
+        asks_offset = bids_offset + self.depth * LEVEL.size
+        return {
+            "sequence": seq // 2,
+            "best_bid": from_fixed(best_bid) if best_bid else None,
+            "best_ask": from_fixed(best_ask) if best_ask else None,
+            "last_trade_price": from_fixed(last_price) if last_price else None,
+            "bids": [LEVEL.unpack_from(data, bids_offset + i * LEVEL.size) for i in range(n_bids)],
+            "asks": [LEVEL.unpack_from(data, asks_offset + i * LEVEL.size) for i in range(n_asks)]
+        }
+
+    def get_depth(self, symbol: str, levels: int = 10) -> dict:
+        """Same shape as OrderBook.get_depth"""
+        snapshot = self.snapshot(symbol)
+        if snapshot is None:
+            return {"bids": [], "asks": []}
+        return {
+            "bids": [(_rendered(p), _rendered(q)) for p, q in snapshot["bids"][:levels]],
+            "asks": [(_rendered(p), _rendered(q)) for p, q in snapshot["asks"][:levels]]
+        }
+
+    def close(self):
+        self.shm.close()
@@ -0,0 +1,293 @@
+import asyncio
+import inspect
+import threading
+import time
+import logging
+from collections import deque
+from .models import Trade
+
+POLICIES = ("drop", "block")
+MAX_GAPS = 100  # Most recent lost ranges kept per consumer for stats()
+
+class _Consumer:
+    __slots__ = ("name", "callback", "policy", "position", "delivered", "dropped", "errors", "max_lag",
+                 "parked", "gaps", "thread", "task", "loop", "wakeup")
+
+    def __init__(self, name: str, callback, position: int, policy: str):
+        self.name = name
+        self.callback = callback
+        self.policy = policy
+        self.position = position  # Sequence number of the next trade to deliver
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_lag = 0
+        self.parked = deque()  # (sequence, trade) the callback kept failing on, retried later
+        self.gaps = deque(maxlen=MAX_GAPS)  # [first, last] sequence ranges lost to this consumer
+        self.thread = None
+        self.task = None
+        self.loop = None  # Set for asyncio consumers
+        self.wakeup = None
+
+    def lose(self, first: int, last: int):
+        self.dropped += last + 1 - first
+        if self.gaps and self.gaps[-1][1] == first - 1:
+            self.gaps[-1][1] = last
+        else:
+            self.gaps.append([first, last])
+
+class TradeDispatcher:
+    """
+    Moves trade listeners off the matching path. Register `publish` as an
+    engine trade listener: the match loop only stores each trade in a
+    bounded ring buffer, and every consumer reads it from its own thread
+    (add_listener) or asyncio task (add_async_listener) at its own cursor.
+    Registered as an execution listener instead, it carries whole
+    ExecutionReports the same way.
+
+    A cursor only moves past a trade once its callback returned. A callback
+    that still raises after `max_retries` attempts parks the trade: the
+    cursor moves on, and parked trades are retried every `park_retry`
+    seconds until they succeed, so a failing consumer never stalls the
+    others and a transient failure loses nothing (parked trades arrive out
+    of order). When a consumer falls `capacity` trades behind, its policy
+    decides: "block" makes the matcher wait for it, however long that takes,
+    so it sees every trade; "drop" skips its oldest undelivered trades so
+    matching never waits. Asyncio consumers may share the matcher's thread,
+    so they always drop. Trades lost to a consumer, by dropping or by
+    overflowing its `capacity` parked trades, are counted in `dropped` and
+    listed by sequence range in `gaps`.
+    """
+
+    def __init__(self, capacity: int = 65536, policy: str = "drop", batch_size: int = 256,
+                 max_retries: int = 3, retry_delay: float = 0.05, park_retry: float = 1.0):
+        if capacity <= 0:
+            raise ValueError("Dispatcher capacity must be positive")
+        self._check_policy(policy)
+        self.capacity = capacity
+        self.policy = policy  # Default for add_listener
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.park_retry = park_retry
+        self.buffer = [None] * capacity
+        self.head = 0  # Sequence number the next published trade gets
+        self.consumers = []
+        self.closed = False
+        self.condition = threading.Condition()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _check_policy(policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown dispatcher policy {policy}")
+
+    def publish(self, trade: Trade):
+        condition = self.condition
+        with condition:
+            head = self.head
+            oldest = head - self.capacity  # Slot about to be overwritten
+            for consumer in self.consumers:
+                if consumer.position > oldest:
+                    continue
+                if consumer.policy == "block":
+                    # Backpressure: the matcher waits until the consumer frees the slot, or the dispatcher closes
+                    condition.wait_for(lambda: consumer.position > oldest or self.closed)
+                if consumer.position <= oldest:
+                    consumer.lose(consumer.position, oldest)
+                    consumer.position = oldest + 1
+            self.buffer[head % self.capacity] = trade
+            self.head = head + 1
+            condition.notify_all()
+            for consumer in self.consumers:
+                lag = self.head - consumer.position
+                if lag > consumer.max_lag:
+                    consumer.max_lag = lag
+                if consumer.loop is not None and not consumer.wakeup.is_set():
+                    self._wake(consumer)
+
+    @staticmethod
+    def _wake(consumer: _Consumer):
+        if not consumer.loop.is_closed():  # The loop is gone after server shutdown; nothing to wake
+            consumer.loop.call_soon_threadsafe(consumer.wakeup.set)
+
+    def add_listener(self, callback, name: str = None, policy: str = None) -> str:
+        """Deliver trades published from now on to callback on a dedicated thread"""
+        policy = policy or self.policy
+        self._check_policy(policy)
+        with self.condition:
+            consumer = _Consumer(name or getattr(callback, "__qualname__", "listener"), callback, self.head, policy)
+            self.consumers.append(consumer)
+        consumer.thread = threading.Thread(target=self._run_thread, args=(consumer,),
+                                           name=f"trades-{consumer.name}", daemon=True)
+        consumer.thread.start()
+        return consumer.name
+
+    def add_async_listener(self, callback, name: str = None) -> str:
+        """Deliver trades to callback (sync or async) from a task on the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self.condition:
+            consumer = _Consumer(name or getattr(callback, "__qualname__", "listener"), callback, self.head, "drop")
+            consumer.loop = loop
+            consumer.wakeup = asyncio.Event()
+            self.consumers.append(consumer)
+        consumer.task = loop.create_task(self._run_async(consumer))
+        return consumer.name
+
+    def _take_batch(self, consumer: _Consumer) -> tuple:
+        """(first sequence number, trades) available to consumer; call with the condition held"""
+        start = consumer.position
+        end = min(self.head, start + self.batch_size)
+        return start, [self.buffer[i % self.capacity] for i in range(start, end)]
+
+    def _advance(self, consumer: _Consumer, start: int, count: int, delivered: int):
+        with self.condition:
+            # The publisher may have moved a dropping cursor into or past this batch
+            consumer.position = max(consumer.position, start + count)
+            consumer.delivered += delivered
+            self.condition.notify_all()
+
+    def _failed(self, consumer: _Consumer, sequence: int, attempt: int) -> bool:
+        """Count a raising callback; True while the trade should be retried"""
+        consumer.errors += 1
+        self.logger.exception("Trade listener %s failed on published item %s", consumer.name, sequence)
+        return attempt < self.max_retries
+
+    def _park(self, consumer: _Consumer, sequence: int, trade):
+        with self.condition:
+            if len(consumer.parked) >= self.capacity:
+                lost, _ = consumer.parked.popleft()
+                consumer.lose(lost, lost)
+            consumer.parked.append((sequence, trade))
+        self.logger.warning("Trade listener %s parked published item %s for retry", consumer.name, sequence)
+
+    def _unpark(self, consumer: _Consumer) -> list:
+        with self.condition:
+            parked = list(consumer.parked)
+            consumer.parked.clear()
+        return parked
+
+    def _deliver(self, consumer: _Consumer, sequence: int, trade) -> bool:
+        attempt = 0
+        while True:
+            try:
+                consumer.callback(trade)
+                return True
+            except Exception:
+                attempt += 1
+                if not self._failed(consumer, sequence, attempt):
+                    return False
+                time.sleep(self.retry_delay)
+
+    def _retry_parked(self, consumer: _Consumer) -> int:
+        """One more attempt at each parked trade; returns how many went through"""
+        delivered = 0
+        for sequence, trade in self._unpark(consumer):
+            try:
+                consumer.callback(trade)
+                delivered += 1
+            except Exception:
+                consumer.errors += 1
+                self._park(consumer, sequence, trade)
+        return delivered
+
+    def _run_thread(self, consumer: _Consumer):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: consumer.position < self.head or self.closed,
+                                        self.park_retry if consumer.parked else None)
+                closing = consumer.position >= self.head and self.closed
+                start, batch = self._take_batch(consumer)
+            delivered = self._retry_parked(consumer) if consumer.parked else 0
+            if closing:
+                # Closed and drained; what is still parked stays counted in stats
+                self._advance(consumer, start, 0, delivered)
+                return
+            for sequence, trade in enumerate(batch, start):
+                if self._deliver(consumer, sequence, trade):
+                    delivered += 1
+                else:
+                    self._park(consumer, sequence, trade)
+            self._advance(consumer, start, len(batch), delivered)
+
+    async def _deliver_async(self, consumer: _Consumer, sequence: int, trade, retries: bool = True) -> bool:
+        attempt = 0
+        while True:
+            try:
+                result = consumer.callback(trade)
+                if inspect.isawaitable(result):
+                    await result
+                return True
+            except Exception:
+                attempt += 1
+                if not retries:
+                    consumer.errors += 1
+                    return False
+                if not self._failed(consumer, sequence, attempt):
+                    return False
+                await asyncio.sleep(self.retry_delay)
+
+    async def _run_async(self, consumer: _Consumer):
+        while True:
+            with self.condition:
+                if consumer.position < self.head:
+                    start, batch = self._take_batch(consumer)
+                elif self.closed:
+                    return
+                else:
+                    consumer.wakeup.clear()
+                    batch = None
+            if batch is None:
+                if not consumer.parked:
+                    await consumer.wakeup.wait()
+                    continue
+                try:
+                    await asyncio.wait_for(consumer.wakeup.wait(), self.park_retry)
+                except asyncio.TimeoutError:
+                    pass
+                start, batch = consumer.position, []
+            delivered = 0
+            for sequence, trade in self._unpark(consumer):
+                if await self._deliver_async(consumer, sequence, trade, retries=False):
+                    delivered += 1
+                else:
+                    self._park(consumer, sequence, trade)
+            for sequence, trade in enumerate(batch, start):
+                if await self._deliver_async(consumer, sequence, trade):
+                    delivered += 1
+                else:
+                    self._park(consumer, sequence, trade)
+            self._advance(consumer, start, len(batch), delivered)
+
+    def stats(self) -> dict:
+        """Per-consumer lag (trades and seconds behind the matcher) and delivery counters"""
+        now_ns = time.time_ns()
+        with self.condition:
+            consumers = {}
+            for consumer in self.consumers:
+                lag = self.head - consumer.position
+                oldest = self.buffer[consumer.position % self.capacity] if lag else None
+                consumers[consumer.name] = {
+                    "policy": consumer.policy,
+                    "position": consumer.position,
+                    "lag": lag,
+                    "lag_seconds": max(0, now_ns - oldest.timestamp) / 1e9 if oldest else 0.0,
+                    "max_lag": consumer.max_lag,
+                    "delivered": consumer.delivered,
+                    "dropped": consumer.dropped,
+                    "errors": consumer.errors,
+                    "parked": len(consumer.parked),
+                    "gaps": [list(gap) for gap in consumer.gaps]
+                }
+            return {"published": self.head, "capacity": self.capacity, "policy": self.policy, "consumers": consumers}
+
+    def close(self, timeout: float = 5.0):
+        """Stop accepting waits, let thread consumers drain what is buffered, and join them"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        for consumer in self.consumers:
+            if consumer.thread is not None:
+                consumer.thread.join(timeout)
+            else:
+                self._wake(consumer)
@@ -0,0 +1,154 @@
+import mmap
+import struct
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+import logging
+from .fixed_point import to_fixed, from_fixed
+from .models import Trade, OrderSide
+from .sequencer import ns_to_iso
+
+# timestamp, trade_id, maker_order_id, taker_order_id, price, quantity (fixed-point), aggressor side
+RECORD = struct.Struct("<qqqqqqb7x")
+INDEX_ENTRY = struct.Struct("<qq")  # timestamp, record number
+NS_PER_DAY = 86_400 * 1_000_000_000
+_SIDES = (OrderSide.BUY, OrderSide.SELL)
+
+class _LogFile:
+    """Append handle for one symbol/day data file and its sparse index"""
+
+    def __init__(self, data_path: Path, index_path: Path):
+        self.data = open(data_path, "ab")
+        self.index = open(index_path, "ab")
+        self.records = self.data.tell() // RECORD.size
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+class TradeLog:
+    """
+    Append-only binary trade history, one fixed-size record per trade in
+    `<data_dir>/trades/<symbol>/<YYYYMMDD>.bin`. Every `index_every`-th record
+    is also written to a sparse `.idx` file, so time-range reads bisect the
+    index and then scan the memory-mapped data file from that record on.
+    Register with MatchingEngine.add_trade_listener(trade_log.on_trade), or
+    add_execution_listener(trade_log.on_execution) when the engine produces execution reports.
+    """
+
+    def __init__(self, data_dir: str = "data", index_every: int = 1024):
+        self.root = Path(data_dir) / "trades"
+        self.index_every = index_every
+        self.files = {}  # (symbol, day) -> _LogFile
+        self.logger = logging.getLogger(__name__)
+
+    def _paths(self, symbol: str, day: str) -> tuple:
+        directory = self.root / symbol
+        return directory / f"{day}.bin", directory / f"{day}.idx"
+
+    @staticmethod
+    def _day(timestamp_ns: int) -> str:
+        return datetime.fromtimestamp(timestamp_ns // 1_000_000_000, tz=timezone.utc).strftime("%Y%m%d")
+
+    def _log_file(self, symbol: str, timestamp: int) -> _LogFile:
+        day = self._day(timestamp)
+        log_file = self.files.get((symbol, day))
+        if log_file is None:
+            # Close the previous day's file for this symbol before rolling over
+            for key in [k for k in self.files if k[0] == symbol]:
+                self.files.pop(key).close()
+            data_path, index_path = self._paths(symbol, day)
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+            log_file = self.files[(symbol, day)] = _LogFile(data_path, index_path)
+        return log_file
+
+    def _append(self, log_file: _LogFile, timestamp: int, trade_id: int, maker_order_id: int,
+                taker_order_id: int, price, quantity, side: OrderSide):
+        if log_file.records % self.index_every == 0:
+            log_file.index.write(INDEX_ENTRY.pack(timestamp, log_file.records))
+        log_file.data.write(RECORD.pack(
+            timestamp,
+            trade_id,
+            maker_order_id,
+            taker_order_id,
+            to_fixed(price),
+            to_fixed(quantity),
+            0 if side == OrderSide.BUY else 1
+        ))
+        log_file.records += 1
+
+    def on_trade(self, trade: Trade):
+        self._append(self._log_file(trade.symbol, trade.timestamp), trade.timestamp, trade.trade_id,
+                     trade.maker_order_id, trade.taker_order_id, trade.price, trade.quantity, trade.aggressor_side)
+
+    def on_execution(self, report):
+        """All fills of an ExecutionReport, read from its columns without building Trade models"""
+        if not report.prices:
+            return
+        log_file = self._log_file(report.symbol, report.timestamp)  # One timestamp, so one day
+        for trade_id, price, quantity, maker_order_id in zip(report.trade_ids, report.prices, report.quantities,
+                                                             report.maker_order_ids):
+            self._append(log_file, report.timestamp, trade_id, maker_order_id, report.order_id, price, quantity,
+                         report.side)
+
+    def flush(self):
+        # Copied: with a TradeDispatcher, on_trade may open files on another thread meanwhile
+        for log_file in list(self.files.values()):
+            log_file.data.flush()
+            log_file.index.flush()
+
+    def close(self):
+        for log_file in self.files.values():
+            log_file.close()
+        self.files.clear()
+
+    def _start_record(self, index_path: Path, from_ns: int) -> int:
+        """Last indexed record strictly before from_ns; records are in time order"""
+        if not index_path.exists():
+            return 0
+        raw = index_path.read_bytes()
+        entries = [INDEX_ENTRY.unpack_from(raw, offset)
+                   for offset in range(0, len(raw) - len(raw) % INDEX_ENTRY.size, INDEX_ENTRY.size)]
+        position = bisect_left([timestamp for timestamp, _ in entries], from_ns) - 1
+        return entries[position][1] if position >= 0 else 0
+
+    def read_range(self, symbol: str, from_ns: int, to_ns: int, page_size: int = 1000):
+        """Yield pages (lists of trade dicts) with from_ns <= timestamp <= to_ns"""
+        self.flush()
+        page = []
+        day_ns = from_ns - from_ns % NS_PER_DAY
+        while day_ns <= to_ns:
+            data_path, index_path = self._paths(symbol, self._day(day_ns))
+            day_ns += NS_PER_DAY
+            if not data_path.exists() or data_path.stat().st_size < RECORD.size:
+                continue
+            with open(data_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                end = len(mapped) - len(mapped) % RECORD.size
+                offset = self._start_record(index_path, from_ns) * RECORD.size
+                while offset < end:
+                    record = RECORD.unpack_from(mapped, offset)
+                    offset += RECORD.size
+                    if record[0] < from_ns:
+                        continue
+                    if record[0] > to_ns:
+                        break
+                    page.append(self._to_dict(symbol, record))
+                    if len(page) >= page_size:
+                        yield page
+                        page = []
+        if page:
+            yield page
+
+    @staticmethod
+    def _to_dict(symbol: str, record: tuple) -> dict:
+        timestamp, trade_id, maker_order_id, taker_order_id, price, quantity, side = record
+        return {
+            "timestamp": ns_to_iso(timestamp),
+            "symbol": symbol,
+            "trade_id": str(trade_id),
+            "price": f"{from_fixed(price).normalize():f}",
+            "quantity": f"{from_fixed(quantity).normalize():f}",
+            "aggressor_side": _SIDES[side].value,
+            "maker_order_id": str(maker_order_id),
+            "taker_order_id": str(taker_order_id)
+        }
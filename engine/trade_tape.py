@@ -0,0 +1,249 @@
+from .models import Trade, OrderSide
+from .sequencer import ns_to_iso
+import threading
+
+# NumPy is imported with the first SymbolTape, so processes that never
+# record a trade (read-only API workers, engine-only tools) don't load it
+np = None
+
+def _import_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+
+BUY = 0
+SELL = 1
+NS_PER_SECOND = 1_000_000_000
+
+class SymbolTape:
+    """
+    Columnar ring buffer of the most recent `capacity` trades of one symbol.
+    Each field is a NumPy array, so analytics run as vectorized operations
+    over the whole window instead of Python loops. The arrays start at
+    `initial_capacity` slots and double as trades arrive until they reach
+    `capacity`, so a quiet symbol holds a few kilobytes rather than the full window.
+    Prices and quantities are kept as float64 for analytics; the engine
+    remains the source of truth for exact Decimal values.
+    Writes come from a trade listener (a dispatcher thread when one is used)
+    and queries from API handlers, so both hold `lock`.
+    """
+
+    def __init__(self, capacity: int, initial_capacity: int = 1024):
+        _import_numpy()
+        self.capacity = capacity
+        size = min(capacity, initial_capacity)
+        self.price = np.zeros(size, dtype=np.float64)
+        self.quantity = np.zeros(size, dtype=np.float64)
+        self.side = np.zeros(size, dtype=np.int8)  # Aggressor side
+        self.timestamp = np.zeros(size, dtype=np.int64)
+        self.trade_id = np.zeros(size, dtype=np.int64)
+        self.maker_order_id = np.zeros(size, dtype=np.int64)
+        self.taker_order_id = np.zeros(size, dtype=np.int64)
+        self.head = 0  # Next slot to write
+        self.count = 0
+        self.lock = threading.RLock()  # Reentrant so TradeTape can group several queries
+
+    def _grow(self, needed: int):
+        """Reallocate the columns for at least `needed` trades, up to capacity"""
+        # Only called while the arrays are below capacity, so the ring has never wrapped
+        size = len(self.price)
+        while size < needed:
+            size *= 2
+        size = min(size, self.capacity)
+        for name in ("price", "quantity", "side", "timestamp", "trade_id", "maker_order_id", "taker_order_id"):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+        self.head = self.count
+
+    def append(self, price: float, quantity: float, side: int, timestamp: int,
+               trade_id: int, maker_order_id: int, taker_order_id: int):
+        with self.lock:
+            size = len(self.price)
+            if self.count == size < self.capacity:
+                self._grow(size + 1)
+                size = len(self.price)
+            i = self.head
+            self.price[i] = price
+            self.quantity[i] = quantity
+            self.side[i] = side
+            self.timestamp[i] = timestamp
+            self.trade_id[i] = trade_id
+            self.maker_order_id[i] = maker_order_id
+            self.taker_order_id[i] = taker_order_id
+            self.head = (i + 1) % size
+            if self.count < size:
+                self.count += 1
+
+    def extend(self, price, quantity, side, timestamp, trade_id, maker_order_id, taker_order_id):
+        """Bulk append equal-length arrays (e.g. when warming up from the trade log)"""
+        with self.lock:
+            columns = (price, quantity, side, timestamp, trade_id, maker_order_id, taker_order_id)
+            n = len(price)
+            if self.count + n > len(self.price) and len(self.price) < self.capacity:
+                self._grow(self.count + n)
+            size = len(self.price)
+            if n >= size:
+                columns = [np.asarray(c)[n - size:] for c in columns]
+                n = size
+            positions = (self.head + np.arange(n)) % size
+            for target, values in zip(self._columns(), columns):
+                target[positions] = values
+            self.head = (self.head + n) % size
+            self.count = min(self.count + n, size)
+
+    def _columns(self):
+        return (self.price, self.quantity, self.side, self.timestamp,
+                self.trade_id, self.maker_order_id, self.taker_order_id)
+
+    def _mask(self, since_ns: int | None):
+        # Slot order does not matter for aggregates, so the ring is never unrolled
+        if since_ns is None:
+            return slice(0, self.count)
+        return self.timestamp[:self.count] >= since_ns
+
+    def trade_count(self, since_ns: int = None) -> int:
+        with self.lock:
+            mask = self._mask(since_ns)
+            return self.count if since_ns is None else int(np.count_nonzero(mask))
+
+    def vwap(self, since_ns: int = None) -> float | None:
+        with self.lock:
+            mask = self._mask(since_ns)
+            quantity = self.quantity[:self.count][mask]
+            volume = quantity.sum()
+            if volume == 0:
+                return None
+            return float(np.dot(self.price[:self.count][mask], quantity) / volume)
+
+    def volume_by_side(self, since_ns: int = None) -> dict:
+        with self.lock:
+            mask = self._mask(since_ns)
+            volumes = np.bincount(self.side[:self.count][mask], weights=self.quantity[:self.count][mask], minlength=2)
+            return {OrderSide.BUY.value: float(volumes[BUY]), OrderSide.SELL.value: float(volumes[SELL])}
+
+    def volume_profile(self, bucket: float, since_ns: int = None) -> list:
+        """Traded volume per price bucket, as [(bucket_floor, volume)] in ascending price"""
+        with self.lock:
+            mask = self._mask(since_ns)
+            buckets = np.floor(self.price[:self.count][mask] / bucket).astype(np.int64)
+            if not len(buckets):
+                return []
+            weights = self.quantity[:self.count][mask]
+            lowest = buckets.min()
+            if buckets.max() - lowest <= len(buckets):
+                # Dense bucket range: a single O(n) bincount, no sort
+                volumes = np.bincount(buckets - lowest, weights=weights)
+                keys = np.nonzero(volumes)[0]
+                return [(float((lowest + k) * bucket), float(volumes[k])) for k in keys]
+            keys, inverse = np.unique(buckets, return_inverse=True)
+            volumes = np.bincount(inverse, weights=weights)
+            return [(float(k * bucket), float(v)) for k, v in zip(keys, volumes)]
+
+    def recent(self, limit: int) -> list:
+        """Newest `limit` trades, newest first"""
+        with self.lock:
+            n = min(limit, self.count)
+            positions = (self.head - 1 - np.arange(n)) % len(self.price)
+            return [{
+                "timestamp": ns_to_iso(int(self.timestamp[i])),
+                "trade_id": str(self.trade_id[i]),
+                "price": float(self.price[i]),
+                "quantity": float(self.quantity[i]),
+                "aggressor_side": OrderSide.BUY.value if self.side[i] == BUY else OrderSide.SELL.value,
+                "maker_order_id": str(self.maker_order_id[i]),
+                "taker_order_id": str(self.taker_order_id[i])
+            } for i in positions]
+
+class TradeTape:
+    """
+    Per-symbol in-memory trade tape. Register with
+    MatchingEngine.add_trade_listener(tape.on_trade), or
+    add_execution_listener(tape.on_execution) when the engine produces execution reports.
+    """
+
+    def __init__(self, capacity: int = 100_000, initial_capacity: int = 1024):
+        self.capacity = capacity  # Most recent trades kept per symbol
+        self.initial_capacity = initial_capacity
+        self.tapes = {}  # symbol -> SymbolTape
+
+    def tape(self, symbol: str) -> SymbolTape:
+        tape = self.tapes.get(symbol)
+        if tape is None:
+            tape = self.tapes[symbol] = SymbolTape(self.capacity, self.initial_capacity)
+        return tape
+
+    def on_trade(self, trade: Trade):
+        self.tape(trade.symbol).append(
+            float(trade.price),
+            float(trade.quantity),
+            BUY if trade.aggressor_side == OrderSide.BUY else SELL,
+            trade.timestamp,
+            trade.trade_id,
+            trade.maker_order_id,
+            trade.taker_order_id
+        )
+
+    def on_execution(self, report):
+        """All fills of an ExecutionReport, read from its columns without building Trade models"""
+        if not report.prices:
+            return
+        tape = self.tape(report.symbol)
+        side = BUY if report.side == OrderSide.BUY else SELL
+        with tape.lock:  # Readers see all of the report's fills or none
+            for trade_id, price, quantity, maker_order_id in zip(report.trade_ids, report.prices, report.quantities,
+                                                                 report.maker_order_ids):
+                tape.append(float(price), float(quantity), side, report.timestamp, trade_id, maker_order_id,
+                            report.order_id)
+
+    def recent(self, symbol: str, limit: int = 100) -> list:
+        tape = self.tapes.get(symbol)
+        return tape.recent(limit) if tape else []
+
+    def stats(self, symbol: str, since_ns: int = None) -> dict:
+        tape = self.tapes.get(symbol)
+        if tape is None:
+            return {"trade_count": 0, "vwap": None, "volume": {OrderSide.BUY.value: 0.0, OrderSide.SELL.value: 0.0}}
+        with tape.lock:  # One consistent window for all three
+            return {
+                "trade_count": tape.trade_count(since_ns),
+                "vwap": tape.vwap(since_ns),
+                "volume": tape.volume_by_side(since_ns)
+            }
+
+    def volume_profile(self, symbol: str, bucket: float, since_ns: int = None) -> list:
+        tape = self.tapes.get(symbol)
+        return tape.volume_profile(bucket, since_ns) if tape else []
+
+if __name__ == "__main__":
+    import json
+    import time
+    import numpy as np
+    n = 1_000_000
+    rng = np.random.default_rng(7)
+    tape = SymbolTape(n)
+    start_ns = time.time_ns()
+    tape.extend(
+        50000 + rng.normal(0, 50, n),
+        rng.uniform(0.001, 2, n),
+        rng.integers(0, 2, n, dtype=np.int8),
+        start_ns + np.arange(n, dtype=np.int64) * 1_000_000,
+        np.arange(1, n + 1),
+        np.arange(1, n + 1),
+        np.arange(n + 1, 2 * n + 1)
+    )
+    since_ns = start_ns + (n // 2) * 1_000_000
+    results = {}
+    for name, query in [
+        ("vwap_all", lambda: tape.vwap()),
+        ("vwap_window", lambda: tape.vwap(since_ns)),
+        ("volume_by_side", lambda: tape.volume_by_side()),
+        ("volume_profile_10", lambda: tape.volume_profile(10.0)),
+        ("trade_count_window", lambda: tape.trade_count(since_ns))
+    ]:
+        t0 = time.perf_counter()
+        query()
+        results[name] = (time.perf_counter() - t0) * 1e3
+    print(json.dumps({"num_trades": n, "query_milliseconds": results}, indent=2))
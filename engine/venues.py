@@ -0,0 +1,74 @@
+import asyncio
+import random
+from decimal import Decimal
+import logging
+
+class SimulatedVenue:
+    """
+    Local stand-in for an away market's quote feed. Each step moves one
+    symbol's mid price by a random number of ticks and publishes the
+    venue's new top of book to the quote listeners as
+    (venue, symbol, bid, bid_size, ask, ask_size), the same call a real
+    feed adapter makes (MatchingEngine.update_away_quote).
+    """
+
+    def __init__(self, name: str, mids: dict, tick: Decimal = Decimal("0.01"), max_spread_ticks: int = 5,
+                 max_size: int = 10, seed: int = None):
+        self.name = name
+        self.mids = dict(mids)  # symbol -> current mid price
+        self.tick = tick
+        self.max_spread_ticks = max_spread_ticks
+        self.max_size = max_size
+        self.rng = random.Random(seed)
+        self.symbols = list(self.mids)
+        self.quote_listeners = []
+        self.published = 0
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_env(cls, names: str, quotes: str, seed: int = None) -> list:
+        """Venues named in "ARCA,BATS" quoting around mids given as "BTC-USDT=50000,ETH-USDT=3000" """
+        mids = {}
+        for item in quotes.split(","):
+            if item.strip():
+                symbol, mid = item.split("=")
+                mids[symbol.strip()] = Decimal(mid)
+        if not mids:
+            raise ValueError("Simulated venues need at least one symbol and mid price to quote")
+        return [cls(name.strip(), mids, seed=None if seed is None else seed + i)
+                for i, name in enumerate(names.split(",")) if name.strip()]
+
+    def add_quote_listener(self, listener):
+        self.quote_listeners.append(listener)
+
+    def next_quote(self) -> tuple:
+        """Random-walk one symbol's mid and return the venue's quote around it"""
+        rng = self.rng
+        symbol = self.symbols[rng.randrange(len(self.symbols))]
+        mid = self.mids[symbol] + self.tick * rng.randint(-2, 2)
+        if mid <= self.tick * self.max_spread_ticks:
+            mid = self.tick * (self.max_spread_ticks + 1)
+        self.mids[symbol] = mid
+        bid = mid - self.tick * rng.randint(1, self.max_spread_ticks)
+        ask = mid + self.tick * rng.randint(1, self.max_spread_ticks)
+        return (self.name, symbol, bid, Decimal(rng.randint(1, self.max_size)),
+                ask, Decimal(rng.randint(1, self.max_size)))
+
+    def publish(self, count: int = 1):
+        for _ in range(count):
+            quote = self.next_quote()
+            for listener in self.quote_listeners:
+                listener(*quote)
+            self.published += 1
+
+    async def run(self, rate: float = 100.0, should_stop=lambda: False):
+        """Publish about rate quotes per second, in batches per event-loop tick"""
+        interval = 0.01
+        per_tick = max(1, round(rate * interval))
+        self.logger.info("Simulated venue %s quoting %s at %s quotes/s", self.name, self.symbols, rate)
+        while not should_stop():
+            try:
+                self.publish(per_tick)
+            except ValueError as e:
+                self.logger.warning("Quote from %s was rejected: %s", self.name, e)
+            await asyncio.sleep(interval)
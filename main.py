@@ -1,60 +1,199 @@
 from fastapi import FastAPI, WebSocket
 from fastapi.responses import RedirectResponse
 from api import rest_api, websocket_api
-from engine.matching_engine import MatchingEngine
 from engine.persistence import PersistenceManager
-from engine.order_book import OrderBook  # Add this import
-import uvicorn
+from engine.async_logging import configure_async_logging
+from api.admission import AdmissionController, AdmissionMiddleware
+import asyncio
 import logging
+import os
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Configure logging; handlers run on a background thread, off the matching path
+log_listener = configure_async_logging(level=logging.INFO)
 
 app = FastAPI()
 persistence = PersistenceManager()
-engine = MatchingEngine(persistence_manager=persistence)
-ws_manager = websocket_api.WebSocketManager(engine)
+# The REST router's engine, resolved at startup; read-only workers (ORDERBOOK_SHM_READER) have none
+engine = None
+ws_manager = None
+
+def known_symbol(symbol: str) -> bool:
+    return engine is not None and engine.is_known_symbol(symbol)
+
+# Per-client and per-symbol token buckets plus an in-flight cap on POST /order (ADMISSION_CONTROL=0 disables)
+admission = None
+if os.environ.get("ADMISSION_CONTROL", "1") != "0":
+    admission = AdmissionController.from_env(known_symbols=known_symbol)
+    # Only set ADMISSION_CLIENT_HEADER behind a proxy that authenticates clients and sets that header
+    app.add_middleware(AdmissionMiddleware, controller=admission,
+                       client_header=os.environ.get("ADMISSION_CLIENT_HEADER") or None)
+book_publisher = None
+journal = None
+follower = None
+audit_log = None
 
 # Include routers
+if os.environ.get("REST_FAST_PATH") == "1":
+    from api import fast_rest_api
+    app.include_router(fast_rest_api.router)  # Registered first, so it shadows the same paths below
 app.include_router(rest_api.router)  # Changed from rest_api.app to rest_api.router
 
 @app.on_event("startup")
 async def startup_event():
+    global engine, ws_manager, book_publisher, journal, follower, audit_log
+    if rest_api.SHM_READER_NAME:
+        # Serves books from the matching process's segment; no engine, so nothing is loaded or saved
+        logging.info("Starting read-only worker on %s", rest_api.SHM_READER_NAME)
+        return
     logging.info("Starting matching engine")
+    engine = rest_api.get_engine()
+    # Share the engine that the REST router submits orders to, so WebSocket feeds see its trades
+    ws_manager = websocket_api.WebSocketManager(engine, candle_aggregator=rest_api.candles,
+                                                dispatcher=rest_api.dispatcher)
+    ws_manager.start()
+    # Publish top-of-book and depth for read-only API workers (ORDERBOOK_SHM_READER)
+    # Optional features import their modules only when enabled, keeping cold start short
+    shm_name = os.environ.get("ORDERBOOK_SHM_PUBLISH")
+    if shm_name:
+        from engine.shared_book import SharedBookPublisher
+        book_publisher = SharedBookPublisher(engine, shm_name)
     # REMOVE: await engine.start_processing()  <-- This line is causing the error
     
-    # Load saved state
-    logging.info("Loading saved order books...")
-    for symbol in ["BTC-USDT"]:
-        saved_state = persistence.load_order_book(symbol)
-        if saved_state:
-            order_book = OrderBook(symbol)
-            order_book.bids = saved_state["bids"]
-            order_book.asks = saved_state["asks"]
-            engine.order_books[symbol] = order_book
+    # Only listed instruments can be traded when INSTRUMENTS names a registry file
+    if os.environ.get("INSTRUMENTS"):
+        from engine.instruments import InstrumentRegistry
+        engine.instruments = InstrumentRegistry.load(os.environ["INSTRUMENTS"])
+    # Pre-trade risk limits (price collars, order size, per-user exposure) from RISK_LIMITS
+    if os.environ.get("RISK_LIMITS"):
+        from engine.risk import RiskManager
+        engine.risk = RiskManager.load(os.environ["RISK_LIMITS"])
+    # Away-market quotes set the NBBO that orders must not trade through (NBBO=1); SIMULATED_VENUES
+    # names local stand-in venues quoting SIMULATED_QUOTES ("BTC-USDT=50000,...") at SIMULATED_QUOTE_RATE/s
+    if os.environ.get("NBBO") == "1" or os.environ.get("SIMULATED_VENUES"):
+        from engine.nbbo import NBBO
+        engine.nbbo = NBBO()
+    # Saved order books are loaded on first access rather than all at startup
+    engine.attach_persistence(persistence)
+
+    # Primary journals inbound events (ENGINE_JOURNAL); a hot standby tails them (ENGINE_FOLLOW)
+    follow_path = os.environ.get("ENGINE_FOLLOW")
+    if follow_path or os.environ.get("ENGINE_JOURNAL"):
+        from engine.replication import EventJournal, ReplicaFollower
+    if follow_path:
+        follower = ReplicaFollower(engine, follow_path)
+        rest_api.read_only_reason = "Hot standby: order entry is disabled until promotion"
+        asyncio.create_task(follow_journal())
+    elif os.environ.get("ENGINE_JOURNAL"):
+        journal = EventJournal(engine, os.environ["ENGINE_JOURNAL"])
+    # A standby replays the primary's journaled quotes instead of running its own venues
+    if os.environ.get("SIMULATED_VENUES") and not follow_path:
+        from engine.venues import SimulatedVenue
+        rate = float(os.environ.get("SIMULATED_QUOTE_RATE", 100))
+        for venue in SimulatedVenue.from_env(os.environ["SIMULATED_VENUES"], os.environ.get("SIMULATED_QUOTES", "")):
+            venue.add_quote_listener(engine.update_away_quote)
+            asyncio.create_task(venue.run(rate))
+
+    # Binary audit stream of every inbound event and trade (AUDIT_LOG)
+    if os.environ.get("AUDIT_LOG"):
+        from engine.audit_log import AuditLog
+        audit_log = AuditLog(engine, os.environ["AUDIT_LOG"])
+
+    # Low-latency binary order entry on the same engine (GATEWAY_PORT)
+    gateway_port = os.environ.get("GATEWAY_PORT")
+    if gateway_port:
+        from api.binary_gateway import BinaryGateway
+        await BinaryGateway(engine).start(port=int(gateway_port))
     logging.info("Matching engine started")
 
+async def follow_journal():
+    while not follower.promoted:
+        # Yield between batches so API reads keep being served while catching up
+        await asyncio.sleep(0 if follower.poll() else 0.01)
+
 @app.on_event("shutdown")
 def shutdown_event():
     logging.info("Shutting down matching engine")
-    engine.shutdown()
+    # Read-only workers never save: their stale IDs and books would overwrite the primary's
+    if engine is not None:
+        engine.shutdown()
+        if rest_api.dispatcher:
+            rest_api.dispatcher.close()  # Drains buffered trades into the trade log before it closes
+        rest_api.trade_log.close()
+    if book_publisher:
+        book_publisher.close()
+    if journal:
+        journal.close()
+    if audit_log:
+        audit_log.close()
+    log_listener.stop()
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
+    if ws_manager is None:
+        await websocket.close()  # Read-only workers have no engine to stream from
+        return
     await ws_manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_text()
-            # Handle client messages if needed
+            await ws_manager.handle_message(websocket, data)
     except Exception as e:
         logging.error(f"WebSocket error: {str(e)}")
     finally:
         ws_manager.disconnect(websocket)
 
+@app.post("/admin/promote")
+def promote_standby():
+    """Promote a hot standby to primary after catching up on the journal tail"""
+    global journal
+    if not follower or follower.promoted:
+        return {"status": "not_standby"}
+    follower.promote()
+    rest_api.read_only_reason = None
+    if os.environ.get("ENGINE_JOURNAL"):
+        from engine.replication import EventJournal
+        journal = EventJournal(engine, os.environ["ENGINE_JOURNAL"])
+    return {"status": "promoted", "applied_seq": follower.applied_seq, "diverged": follower.diverged}
+
+@app.get("/admin/admission")
+def admission_stats():
+    """Requests admitted to the engine and shed by admission control, by reason"""
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission.stats()}
+
+@app.get("/admin/dispatcher")
+def dispatcher_stats():
+    """Per-listener cursor, lag and delivery counters of the post-trade dispatcher"""
+    if rest_api.dispatcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **rest_api.dispatcher.stats()}
+
+@app.get("/admin/risk")
+def risk_stats():
+    """Calls, rejections and latency of each pre-trade risk check"""
+    if engine is None or engine.risk is None:
+        return {"enabled": False}
+    return {"enabled": True, "checks": engine.risk.stats()}
+
+@app.get("/admin/risk/{user_id}")
+def risk_exposure(user_id: str):
+    """A user's open notional and net position per symbol, as the risk checks see them"""
+    if engine is None or engine.risk is None:
+        return {"enabled": False}
+    return {"enabled": True, **engine.risk.exposure(user_id)}
+
+@app.get("/admin/nbbo")
+def nbbo_stats():
+    """Away venues feeding the NBBO, symbols quoted and quote updates applied"""
+    if engine is None or engine.nbbo is None:
+        return {"enabled": False}
+    return {"enabled": True, **engine.nbbo.stats()}
+
 @app.get("/")
 def redirect_to_docs():
     return RedirectResponse(url="/docs")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
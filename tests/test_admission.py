@@ -0,0 +1,113 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api import rest_api
+from api.admission import TokenBucket, AdmissionController, AdmissionMiddleware
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Trades are appended to the trade log under ./data
+    monkeypatch.chdir(tmp_path)
+    rest_api.get_engine().order_books.clear()
+    clock = FakeClock()
+    controller = AdmissionController(client_rate=1, client_burst=2, symbol_rate=1, symbol_burst=3, clock=clock)
+    app = FastAPI()
+    app.include_router(rest_api.router)
+    # As if behind a proxy that authenticates clients and sets X-Client-Id
+    app.add_middleware(AdmissionMiddleware, controller=controller, client_header="X-Client-Id")
+    return TestClient(app), controller, clock
+
+def order(symbol="ADM-USDT"):
+    return {"symbol": symbol, "order_type": "limit", "side": "buy", "quantity": "1", "price": "100"}
+
+def test_token_bucket_refills_at_rate_up_to_burst():
+    bucket = TokenBucket(rate=2, burst=2, now=0.0)
+    assert bucket.take(0.0) and bucket.take(0.0)
+    assert not bucket.take(0.0)
+    assert bucket.take(0.5)
+    assert not bucket.take(0.5)
+    assert bucket.take(100.0) and bucket.take(100.0)
+    assert not bucket.take(100.0)
+
+def test_client_over_rate_is_shed_before_parsing(client):
+    http, controller, clock = client
+    headers = {"X-Client-Id": "noisy"}
+    assert http.post("/order", json=order(), headers=headers).status_code == 200
+    assert http.post("/order", json=order(), headers=headers).status_code == 200
+    # Invalid JSON would be a 422 if it reached FastAPI
+    response = http.post("/order", content=b'{"symbol": "ADM-USDT", broken', headers=headers)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert controller.shed["client_rate"] == 1
+    assert controller.admitted == 2
+    assert controller.in_flight == 0
+
+    clock.now += 1
+    assert http.post("/order", json=order(), headers=headers).status_code == 200
+
+def test_clients_have_separate_buckets_but_share_symbol_bucket(client):
+    http, controller, _ = client
+    for client_id in ("a", "b", "c"):
+        assert http.post("/order", json=order(), headers={"X-Client-Id": client_id}).status_code == 200
+    response = http.post("/order", json=order(), headers={"X-Client-Id": "d"})
+    assert response.status_code == 429
+    assert controller.shed["symbol_rate"] == 1
+    assert http.post("/order", json=order("OTHER-USDT"), headers={"X-Client-Id": "d"}).status_code == 200
+
+def test_reads_are_not_rate_limited(client):
+    http, controller, _ = client
+    for _ in range(5):
+        assert http.get("/orderbook/ADM-USDT").status_code == 200
+    assert controller.admitted == 0
+
+def test_in_flight_limit():
+    controller = AdmissionController(max_in_flight=2)
+    assert controller.admit("a", "X") is None
+    assert controller.admit("b", "X") is None
+    assert controller.admit("c", "X") == "in_flight"
+    controller.release()
+    assert controller.admit("c", "X") is None
+    assert controller.stats() == {"admitted": 3, "in_flight": 2,
+                                  "shed": {"in_flight": 1, "client_rate": 0, "symbol_rate": 0}}
+
+def test_client_header_is_ignored_unless_configured():
+    controller = AdmissionController(client_rate=1, client_burst=2)
+    app = FastAPI()
+    app.include_router(rest_api.router)
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    http = TestClient(app)
+    statuses = [http.post("/order", json=order(), headers={"X-Client-Id": f"spoofed-{n}"}).status_code
+                for n in range(3)]
+    assert statuses == [200, 200, 429]
+    assert list(controller.client_buckets) == ["testclient"]
+
+def test_least_recently_used_buckets_are_evicted():
+    controller = AdmissionController(client_rate=1, client_burst=1, clock=FakeClock())
+    controller.MAX_BUCKETS = 3
+    for client_id in ("a", "b", "c", "a", "d"):
+        controller.admit(client_id, None)
+        controller.release()
+    assert list(controller.client_buckets) == ["c", "a", "d"]
+
+def test_unknown_symbols_share_one_bucket():
+    controller = AdmissionController(symbol_rate=1, symbol_burst=1, clock=FakeClock(),
+                                     known_symbols={"BTC-USDT"}.__contains__)
+    assert controller.admit("a", "BTC-USDT") is None
+    assert controller.admit("a", "MADE-UP-1") is None
+    assert controller.admit("a", "MADE-UP-2") == "symbol_rate"
+    assert list(controller.symbol_buckets) == ["BTC-USDT", None]
+
+def test_benchmark_uses_scratch_engine(client):
+    http, _, _ = client
+    response = http.get("/benchmark", params={"num_orders": 200})
+    assert response.status_code == 200
+    assert response.json()["num_orders_processed"] == 200
+    assert "BTC-USDT" not in rest_api.get_engine().order_books
+    assert http.get("/benchmark", params={"num_orders": 10_000_000}).status_code == 422
@@ -76,3 +76,16 @@ def test_take_profit_order(engine):
     )
     executions = engine.process_order(buy_order)
     assert any(e.price == Decimal("51000.0") for e in executions)
+
+def test_stop_order_rests_until_triggered_and_fires_once(engine):
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.BUY,
+                               quantity=Decimal("5.0"), price=Decimal("48000.0")))
+    stop_order = Order(symbol="BTC-USDT", order_type=OrderType.STOP_LOSS, side=OrderSide.SELL,
+                       quantity=Decimal("1.0"), stop_price=Decimal("49000.0"))
+    # Resting liquidity must not fill a stop order before its trigger
+    assert engine.process_order(stop_order) == []
+    assert engine.order_books["BTC-USDT"].stop_orders == [stop_order]
+
+    engine.update_market_price("BTC-USDT", Decimal("49000.0"))
+    assert engine.order_books["BTC-USDT"].stop_orders == []
+    assert engine.order_books["BTC-USDT"].get_depth()["bids"] == [("48000.0", "4.0")]
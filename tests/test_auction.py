@@ -0,0 +1,121 @@
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.auction import clearing_price
+
+@pytest.fixture
+def engine():
+    return MatchingEngine()
+
+def limit(side, quantity, price):
+    return Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.LIMIT,
+        side=side,
+        quantity=Decimal(quantity),
+        price=Decimal(price)
+    )
+
+def test_clearing_price_maximizes_volume():
+    bids = {Decimal("102"): Decimal("3"), Decimal("101"): Decimal("2"), Decimal("99"): Decimal("5")}
+    asks = {Decimal("98"): Decimal("1"), Decimal("100"): Decimal("3"), Decimal("103"): Decimal("4")}
+    price, volume, imbalance = clearing_price(bids, asks)
+    assert (price, volume, imbalance) == (Decimal("100"), Decimal("4"), Decimal("1"))
+
+def test_clearing_price_tie_breaks_on_reference_price():
+    bids = {Decimal("105"): Decimal("1")}
+    asks = {Decimal("95"): Decimal("1")}
+    assert clearing_price(bids, asks)[0] == Decimal("95")
+    assert clearing_price(bids, asks, reference_price=Decimal("104"))[0] == Decimal("105")
+    assert clearing_price({}, asks) == (None, 0, 0)
+
+def test_auction_accumulates_and_uncrosses(engine):
+    engine.start_auction("BTC-USDT")
+    indicatives = []
+    engine.add_auction_listener(lambda symbol, indicative: indicatives.append(indicative))
+    assert engine.process_order(limit(OrderSide.SELL, "1", "98")) == []
+    engine.process_order(limit(OrderSide.BUY, "3", "102"))
+    engine.process_order(limit(OrderSide.SELL, "2", "100"))
+    engine.process_order(limit(OrderSide.BUY, "2", "101"))
+    engine.process_order(limit(OrderSide.SELL, "1", "100"))
+    engine.process_order(limit(OrderSide.BUY, "5", "99"))
+    engine.process_order(limit(OrderSide.SELL, "4", "103"))
+    assert indicatives[-1]["price"] == Decimal("100")
+    assert indicatives[-1]["volume"] == Decimal("4")
+    with pytest.raises(ValueError, match="auction"):
+        engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.MARKET,
+                                   side=OrderSide.BUY, quantity=Decimal("1")))
+
+    trades = engine.end_auction("BTC-USDT")
+    assert all(trade.price == Decimal("100") for trade in trades)
+    assert sum(trade.quantity for trade in trades) == Decimal("4")
+    # Price-time priority: the 102 bid fills before the 101 bid; asks fill 98, then 100 in arrival order
+    assert [(t.maker_order_id, t.taker_order_id, t.quantity) for t in trades] == [
+        (1, 2, Decimal("1")), (2, 3, Decimal("2")), (4, 5, Decimal("1"))
+    ]
+    depth = engine.order_books["BTC-USDT"].get_depth()
+    assert depth["bids"][0] == ("101", "1")
+    assert depth["asks"][0] == ("103", "4")
+    assert engine.last_trade_prices["BTC-USDT"] == Decimal("100")
+    assert "BTC-USDT" not in engine.auctions
+    # Continuous matching resumes
+    assert engine.process_order(limit(OrderSide.SELL, "1", "101"))
+
+def test_cancel_and_amend_update_indicative(engine):
+    engine.start_auction("BTC-USDT")
+    engine.process_order(limit(OrderSide.BUY, "2", "101"))
+    engine.process_order(limit(OrderSide.SELL, "3", "100"))
+    assert engine.get_indicative("BTC-USDT")["volume"] == Decimal("2")
+    engine.amend_order("BTC-USDT", 1, Decimal("1"))
+    assert engine.get_indicative("BTC-USDT")["volume"] == Decimal("1")
+    engine.amend_order("BTC-USDT", 2, Decimal("3"), Decimal("102"))
+    assert engine.get_indicative("BTC-USDT")["price"] is None
+    engine.cancel_order("BTC-USDT", 1)
+    assert engine.auctions["BTC-USDT"].bid_volume == {}
+    assert engine.end_auction("BTC-USDT") == []
+
+def test_indicative_matches_a_full_pass_and_skips_orders_outside_the_cross(engine):
+    import random
+    rng = random.Random(7)
+    engine.start_auction("BTC-USDT")
+    notified = []
+    engine.add_auction_listener(lambda symbol, indicative: notified.append(indicative))
+    for i in range(500):
+        side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+        engine.process_order(limit(side, rng.randrange(1, 5), 95 + rng.randrange(10)))
+        if i % 7 == 0:
+            engine.cancel_order("BTC-USDT", rng.randrange(1, i + 2))
+        auction = engine.auctions["BTC-USDT"]
+        price, volume, imbalance = clearing_price(dict(auction.bid_volume), dict(auction.ask_volume))
+        assert engine.get_indicative("BTC-USDT") == {"price": price, "volume": volume, "imbalance": imbalance}
+    assert notified[-1] == engine.get_indicative("BTC-USDT")
+
+    count = len(notified)
+    engine.process_order(limit(OrderSide.BUY, "1", "50"))
+    engine.process_order(limit(OrderSide.SELL, "1", "150"))
+    assert len(notified) == count
+    # Amending a crossed order out of the cross still reports the drop in volume
+    crossed = engine.order_books["BTC-USDT"].bids.peekitem(0)[1][0]
+    engine.amend_order("BTC-USDT", crossed.order_id, crossed.quantity + 1, Decimal("60"))
+    assert notified[-1] == engine.get_indicative("BTC-USDT")
+    assert len(notified) == count + 1
+
+def test_stops_crossed_during_an_auction_trigger_when_it_ends(engine):
+    engine.process_order(limit(OrderSide.BUY, "1", "100"))  # 1
+    engine.process_order(limit(OrderSide.SELL, "1", "100"))  # 2: last price 100
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.STOP_LOSS, side=OrderSide.SELL,
+                               quantity=Decimal("1"), stop_price=Decimal("95")))  # 3
+    engine.process_order(limit(OrderSide.BUY, "2", "90"))  # 4
+    engine.start_auction("BTC-USDT")
+    engine.update_market_price("BTC-USDT", Decimal("94"))
+    # Held, not lost: still pending and still indexed
+    assert [order.order_id for order in engine.order_books["BTC-USDT"].stop_orders] == [3]
+    assert engine.get_order_status(3)["status"] == "pending_trigger"
+    trades = []
+    engine.add_trade_listener(trades.append)
+    assert engine.end_auction("BTC-USDT") == []
+    # Nothing uncrossed, but the stop fired as a market sell into the 90 bid
+    assert [(t.price, t.quantity, t.maker_order_id) for t in trades] == [(Decimal("90"), Decimal("1"), 4)]
+    assert engine.order_books["BTC-USDT"].stop_orders == []
+    assert engine.get_order_status(4)["quantity"] == Decimal("1")
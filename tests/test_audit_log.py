@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.fixed_point import to_fixed
+from engine.audit_log import AuditLog, read_audit_log, ORDER, CANCEL, TRADE
+from engine.async_logging import configure_async_logging
+
+@pytest.fixture(params=[False, True], ids=["trades", "execution_reports"])
+def engine(request):
+    return MatchingEngine(execution_reports=request.param)
+
+def limit(side, quantity, price):
+    return Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.LIMIT,
+        side=side,
+        quantity=Decimal(quantity),
+        price=Decimal(price)
+    )
+
+def test_audit_log_records_events_and_trades(engine, tmp_path):
+    audit_log = AuditLog(engine, tmp_path / "audit.bin")
+    engine.process_order(limit(OrderSide.SELL, "1", "50000"))
+    engine.process_order(limit(OrderSide.SELL, "1", "50010"))
+    engine.process_order(limit(OrderSide.BUY, "0.5", "50000"))
+    engine.cancel_order("BTC-USDT", 2)
+    audit_log.close()
+
+    records = list(read_audit_log(tmp_path / "audit.bin"))
+    assert [r["type"] for r in records] == [ORDER, ORDER, ORDER, TRADE, CANCEL]
+    assert [r["seq"] for r in records if r["type"] != TRADE] == [1, 2, 3, 4]
+    assert records[0]["side"] == "sell" and records[0]["order_type"] == "limit"
+    assert records[0]["price"] == to_fixed(Decimal("50000"))
+    trade = records[3]
+    assert trade["ids"] == (1, 1, 3)  # trade_id, maker, taker
+    assert trade["side"] == "buy"
+    assert trade["quantity"] == to_fixed(Decimal("0.5"))
+    assert records[4]["ids"][0] == 2
+
+class SlowHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.done = threading.Event()
+
+    def emit(self, record):
+        time.sleep(0.05)  # A stalled disk or terminal
+        self.records.append(record.getMessage())
+        if len(self.records) == 10:
+            self.done.set()
+
+def test_async_logging_does_not_block_caller():
+    handler = SlowHandler()
+    logger = logging.getLogger("test_async_logging")
+    logger.propagate = False
+    listener = configure_async_logging(handlers=[handler], logger=logger)
+    start = time.perf_counter()
+    for i in range(10):
+        logger.info("message %s", i)
+    assert time.perf_counter() - start < 0.05
+    assert handler.done.wait(5)
+    listener.stop()
+    assert handler.records == [f"message {i}" for i in range(10)]
+
+def test_writer_survives_unpackable_records(engine, tmp_path):
+    audit_log = AuditLog(engine, tmp_path / "audit.bin")
+    audit_log.queue.put({"type": "cancel", "symbol": "BTC-USDT", "seq": 2 ** 64, "timestamp": 0})  # struct.error
+    audit_log.queue.put(object())
+    engine.process_order(limit(OrderSide.SELL, "1", "50000"))
+    audit_log.close()
+    assert [r["type"] for r in read_audit_log(tmp_path / "audit.bin")] == [ORDER]
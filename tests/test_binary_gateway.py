@@ -0,0 +1,83 @@
+import asyncio
+from decimal import Decimal
+from engine.fixed_point import to_fixed, from_fixed
+from engine.matching_engine import MatchingEngine
+from engine.models import Order, OrderType, OrderSide
+from api.binary_gateway import (BinaryGateway, MESSAGES, NEW_ORDER, CANCEL, AMEND, ACK, FILL, REJECT,
+                                ACCEPTED, CANCELED, AMENDED, MAKER, TAKER)
+
+def new_order(client_order_id, side, quantity, price, order_type=1):
+    return MESSAGES[NEW_ORDER].pack(NEW_ORDER, client_order_id, b"BTC-USDT", order_type, side,
+                                    to_fixed(Decimal(quantity)), to_fixed(Decimal(price)), 0)
+
+async def read_messages(reader, count):
+    messages = []
+    buffer = b""
+    while len(messages) < count:
+        buffer += await asyncio.wait_for(reader.read(65536), timeout=5)
+        while buffer and len(buffer) >= MESSAGES[buffer[0]].size:
+            message = MESSAGES[buffer[0]]
+            messages.append(message.unpack_from(buffer))
+            buffer = buffer[message.size:]
+    return messages
+
+async def scenario():
+    engine = MatchingEngine()
+    server = await BinaryGateway(engine).start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    maker_reader, maker_writer = await asyncio.open_connection("127.0.0.1", port)
+    taker_reader, taker_writer = await asyncio.open_connection("127.0.0.1", port)
+
+    # Pipeline three requests in one write: two resting sells and an amend
+    maker_writer.write(new_order(1, 1, "1", "100") + new_order(2, 1, "2", "101")
+                       + MESSAGES[AMEND].pack(AMEND, 3, b"BTC-USDT", 2, to_fixed(Decimal("1.5")), 0))
+    acks = await read_messages(maker_reader, 3)
+    assert [(m[0], m[1], m[3]) for m in acks] == [(ACK, 1, ACCEPTED), (ACK, 2, ACCEPTED), (ACK, 3, AMENDED)]
+    assert from_fixed(acks[2][4]) == Decimal("1.5")
+
+    taker_writer.write(new_order(7, 0, "2", "101"))
+    ack, fill_1, fill_2 = await read_messages(taker_reader, 3)
+    assert ack[0] == ACK and from_fixed(ack[4]) == 0
+    assert [(m[0], from_fixed(m[4]), from_fixed(m[5]), m[7]) for m in (fill_1, fill_2)] == [
+        (FILL, Decimal("100"), Decimal("1"), TAKER), (FILL, Decimal("101"), Decimal("1"), TAKER)]
+    maker_fills = await read_messages(maker_reader, 2)
+    assert [(m[1], m[7]) for m in maker_fills] == [(1, MAKER), (3, MAKER)]  # Amend took over client ID 3
+
+    maker_writer.write(MESSAGES[CANCEL].pack(CANCEL, 4, b"BTC-USDT", acks[1][2])
+                       + MESSAGES[CANCEL].pack(CANCEL, 5, b"BTC-USDT", 999))
+    cancel_ack, reject = await read_messages(maker_reader, 2)
+    assert cancel_ack[3] == CANCELED
+    assert reject[0] == REJECT and reject[1] == 5
+    assert engine.order_books["BTC-USDT"].get_depth() == {"bids": [], "asks": []}
+
+    maker_writer.close()
+    taker_writer.close()
+    server.close()
+    await server.wait_closed()
+
+def test_binary_gateway_order_entry():
+    asyncio.run(scenario())
+
+async def makers_hear_of_fills_from_other_channels():
+    engine = MatchingEngine()
+    gateway = BinaryGateway(engine)
+    assert engine.event_listeners == []  # Inbound orders are not turned into event records for the gateway
+    server = await gateway.start("127.0.0.1", 0)
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+    writer.write(new_order(1, 1, "1", "100") + new_order(2, 1, "1", "101"))
+    (_, _, filled_id, _, _), (_, _, canceled_id, _, _) = await read_messages(reader, 2)
+
+    # A taker entered directly on the engine (as the REST API does)
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY,
+                               quantity=Decimal("1")))
+    [fill] = await read_messages(reader, 1)
+    assert (fill[0], fill[1], fill[2], fill[7]) == (FILL, 1, filled_id, MAKER)
+    engine.cancel_order("BTC-USDT", canceled_id)
+    assert gateway.owners == {}
+
+    writer.close()
+    server.close()
+    await server.wait_closed()
+
+def test_makers_hear_of_fills_from_other_channels():
+    asyncio.run(makers_hear_of_fills_from_other_channels())
@@ -0,0 +1,87 @@
+import pytest
+import threading
+from types import SimpleNamespace
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.candles import CandleAggregator
+from engine.sequencer import Sequencer
+
+NS = 1_000_000_000
+
+@pytest.fixture
+def clock():
+    return {"now": 1_700_000_000 * NS}
+
+@pytest.fixture
+def engine(clock):
+    return MatchingEngine(sequencer=Sequencer(clock=lambda: clock["now"]))
+
+def cross(engine, price, quantity):
+    engine.process_order(Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.LIMIT,
+        side=OrderSide.SELL,
+        quantity=Decimal(quantity),
+        price=Decimal(price)
+    ))
+    engine.process_order(Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.MARKET,
+        side=OrderSide.BUY,
+        quantity=Decimal(quantity)
+    ))
+
+def test_candles_aggregate_ohlcv_and_vwap(engine, clock):
+    candles = CandleAggregator()
+    engine.add_trade_listener(candles.on_trade)
+    cross(engine, "100", "1")
+    cross(engine, "110", "1")
+    cross(engine, "90", "2")
+    clock["now"] += 60 * NS
+    cross(engine, "105", "1")
+
+    bars = candles.get_candles("BTC-USDT", "1m")
+    assert len(bars) == 2
+    first, second = bars
+    assert (first["open"], first["high"], first["low"], first["close"]) == ("100", "110", "90", "90")
+    assert first["volume"] == "4"
+    assert Decimal(first["vwap"]) == Decimal("97.5")
+    assert first["trade_count"] == 3
+    assert second["open"] == "105"
+    assert len(candles.get_candles("BTC-USDT", "1h")) == 1
+    assert candles.get_candles("ETH-USDT", "1m") == []
+    with pytest.raises(ValueError):
+        candles.get_candles("BTC-USDT", "2m")
+
+def test_candle_ring_buffer_is_fixed_size(engine, clock):
+    candles = CandleAggregator(capacity=3)
+    updates = []
+    candles.add_listener(lambda symbol, interval, bar: updates.append((interval, bar.close)))
+    engine.add_trade_listener(candles.on_trade)
+    for i in range(5):
+        cross(engine, str(100 + i), "1")
+        clock["now"] += NS
+
+    bars = candles.get_candles("BTC-USDT", "1s", limit=10)
+    assert [bar["close"] for bar in bars] == ["102", "103", "104"]
+    assert [bar["close"] for bar in candles.get_candles("BTC-USDT", "1s", limit=1)] == ["104"]
+    assert ("1s", Decimal("104")) in updates
+
+def test_candle_readers_never_see_a_half_reset_bar():
+    candles = CandleAggregator(intervals={"1s": 1}, capacity=16)
+    done = threading.Event()
+    def write():
+        for i in range(1, 20001):
+            # One trade per second, so every trade reuses a ring slot for a new bar
+            candles.on_trade(SimpleNamespace(symbol="BTC-USDT", timestamp=i * NS, price=Decimal(i),
+                                             quantity=Decimal("1")))
+        done.set()
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not done.is_set():
+        for bar in candles.get_candles("BTC-USDT", "1s", limit=16):
+            assert bar["open"] == bar["high"] == bar["low"] == bar["close"] == bar["vwap"]
+            assert bar["volume"] == "1" and bar["trade_count"] == 1
+    writer.join()
+    assert candles.get_candles("BTC-USDT", "1s", limit=1)[0]["close"] == "20000"
@@ -0,0 +1,22 @@
+import subprocess
+import sys
+from engine.cold_start import probe, measure, REPO_ROOT
+
+def test_engine_core_imports_without_web_stack_or_numpy():
+    for module in ("engine.matching_engine", "engine.replication", "api.binary_gateway"):
+        assert probe(module)["heavy"] == []
+
+def test_measure_reports_loaded_modules_and_timings():
+    # Timings depend on the machine, so only what was imported is asserted
+    result = measure("engine", runs=1)
+    assert result["heavy_modules"] == []
+    assert result["first_order_ms"] >= result["import_ms"] > 0
+
+def test_importing_the_app_builds_no_engine():
+    # main's startup, or a route, builds the engine; importing the app must not
+    for module in ("api.rest_api", "main"):
+        code = (f"import sys, {module}; from api import rest_api as r; "
+                f"print(r.engine is None, r.trade_log is None, 'numpy' in sys.modules)")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=REPO_ROOT).stdout
+        assert output.split() == ["True", "True", "False"], module
@@ -0,0 +1,72 @@
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.memory_benchmark import MemoryBenchmark
+
+@pytest.fixture
+def engine():
+    return MatchingEngine(order_book_factory=CompactOrderBook)
+
+def limit(side, quantity, price):
+    return Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.LIMIT,
+        side=side,
+        quantity=Decimal(quantity),
+        price=Decimal(price)
+    )
+
+def test_compact_book_matches_in_price_time_priority(engine):
+    engine.process_order(limit(OrderSide.SELL, "0.5", "50001"))
+    first = limit(OrderSide.SELL, "0.5", "50000")
+    second = limit(OrderSide.SELL, "0.5", "50000")
+    engine.process_order(first)
+    engine.process_order(second)
+
+    executions = engine.process_order(limit(OrderSide.BUY, "1.2", "50001"))
+    assert [t.maker_order_id for t in executions] == [first.order_id, second.order_id, 1]
+    assert [t.quantity for t in executions] == [Decimal("0.5"), Decimal("0.5"), Decimal("0.2")]
+
+    book = engine.order_books["BTC-USDT"]
+    assert book.best_ask == Decimal("50001")
+    assert book.get_depth()["asks"] == [("50001", "0.30000000")]
+    assert list(book.order_map) == [1]
+
+def test_compact_book_remove_reuses_slots():
+    book = CompactOrderBook("BTC-USDT")
+    orders = [limit(OrderSide.BUY, "1", "100") for _ in range(3)]
+    for i, order in enumerate(orders, start=1):
+        order.order_id = i
+        book.add_order(order)
+    assert book.remove_order(Decimal("100"), 2, OrderSide.BUY)
+    assert not book.remove_order(Decimal("100"), 2, OrderSide.BUY)
+    assert [o.order_id for o in book.bids[Decimal("100")]] == [1, 3]
+
+    replacement = limit(OrderSide.BUY, "2", "99")
+    replacement.order_id = 4
+    book.add_order(replacement)
+    assert book.pool.size == 3
+    assert len(book.pool.order_id) == 3  # Freed slot was reused
+    assert book.bids[Decimal("99")][0].to_order().quantity == Decimal("2")
+
+def test_unrepresentable_order_leaves_no_empty_level(engine):
+    engine.process_order(limit(OrderSide.SELL, "1", "10"))
+    # Rejected at entry, before the sell above can trade
+    with pytest.raises(ValueError):
+        engine.process_order(limit(OrderSide.BUY, "1.000000001", "10"))
+    book = engine.order_books["BTC-USDT"]
+    assert book.get_depth()["asks"] == [("10", "1.00000000")]
+    # Added to the book directly, the order fails before any level is created
+    unchecked = Order.model_construct(order_id=9, symbol="BTC-USDT", order_type=OrderType.LIMIT,
+                                      side=OrderSide.BUY, quantity=Decimal("1.000000001"), price=Decimal("9"),
+                                      timestamp=None, parent_order_id=None)
+    with pytest.raises(ValueError):
+        book.add_order(unchecked)
+    assert book.get_depth()["bids"] == [] and book.pool.size == 1
+
+def test_compact_book_uses_less_memory():
+    full = MemoryBenchmark().measure_memory(num_orders=2000, num_levels=10)
+    compact = MemoryBenchmark(CompactOrderBook).measure_memory(num_orders=2000, num_levels=10)
+    assert compact["bytes_per_resting_order"] * 3 < full["bytes_per_resting_order"]
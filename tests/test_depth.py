@@ -0,0 +1,120 @@
+import asyncio
+import json
+import pytest
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.depth import BucketedDepth
+from engine.fuzzer import generate_flow, run_engine, SYMBOL
+from api import rest_api
+from api.websocket_api import WebSocketManager
+
+GROUPS = [Decimal("0.5"), Decimal("1"), Decimal("10")]
+
+@pytest.fixture(params=["order_book", "compact_order_book"])
+def engine(request):
+    if request.param == "compact_order_book":
+        return MatchingEngine(order_book_factory=CompactOrderBook, depth_groups=GROUPS)
+    return MatchingEngine(depth_groups=GROUPS)
+
+def limit(side, quantity, price, symbol="BTC-USDT"):
+    return Order(symbol=symbol, order_type=OrderType.LIMIT, side=side,
+                 quantity=Decimal(quantity), price=Decimal(price))
+
+def rescan(order_book, group: Decimal) -> dict:
+    """Grouped depth the slow way, from the raw price levels"""
+    result = {}
+    for name, levels, rounding in (("bids", order_book.bids, "__floor__"), ("asks", order_book.asks, "__ceil__")):
+        buckets = {}
+        for price, orders in levels.items():
+            key = getattr(price / group, rounding)() * group
+            buckets[key] = buckets.get(key, 0) + sum(o.quantity for o in orders)
+        result[name] = sorted(buckets.items(), reverse=(name == "bids"))
+    return result
+
+def maintained(order_book, group: Decimal) -> dict:
+    return {
+        name: [(Decimal(p), Decimal(q)) for p, q in rows]
+        for name, rows in order_book.depth.get(group, levels=10_000).items()
+    }
+
+def test_bids_group_down_and_asks_group_up(engine):
+    engine.process_order(limit(OrderSide.BUY, "1", "101.5"))
+    engine.process_order(limit(OrderSide.BUY, "2", "109"))
+    engine.process_order(limit(OrderSide.SELL, "3", "111"))
+    engine.process_order(limit(OrderSide.SELL, "1", "120"))
+    depth = engine.order_books["BTC-USDT"].depth.get(10, cumulative=True)
+    assert depth == {"bids": [("100", "3", "3")], "asks": [("120", "4", "4")]}
+
+def test_fills_cancels_and_amends_update_buckets(engine):
+    engine.process_order(limit(OrderSide.SELL, "1", "101"))
+    engine.process_order(limit(OrderSide.SELL, "2", "102"))
+    engine.process_order(limit(OrderSide.SELL, "5", "115"))
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY,
+                               quantity=Decimal("1.5")))
+    engine.amend_order("BTC-USDT", 3, Decimal("4"))
+    order_book = engine.order_books["BTC-USDT"]
+    assert maintained(order_book, Decimal("10")) == {
+        "bids": [], "asks": [(Decimal("110"), Decimal("1.5")), (Decimal("120"), Decimal("4"))]
+    }
+    engine.cancel_order("BTC-USDT", 2)
+    engine.cancel_order("BTC-USDT", 3)
+    assert order_book.depth.get(10) == {"bids": [], "asks": []}
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_rescan_after_random_flow(engine, seed):
+    run_engine(engine, generate_flow(seed, 1000))
+    order_book = engine.order_books[SYMBOL]
+    for group in GROUPS:
+        assert maintained(order_book, group) == rescan(order_book, group)
+
+def test_unknown_group_is_rejected():
+    depth = BucketedDepth([1])
+    with pytest.raises(ValueError):
+        depth.get(5)
+    with pytest.raises(ValueError):
+        BucketedDepth([0])
+
+def test_rest_grouped_depth(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rest_api.get_engine().order_books.clear()
+    app = FastAPI()
+    app.include_router(rest_api.router)
+    client = TestClient(app)
+    for price in ("101", "105", "99"):
+        client.post("/order", json={"symbol": "GRP-USDT", "order_type": "limit", "side": "buy",
+                                    "quantity": "1", "price": price})
+    response = client.get("/orderbook/GRP-USDT", params={"group": "10", "cumulative": "true"})
+    assert response.json() == {"bids": [["100", "2", "2"], ["90", "1", "3"]], "asks": []}
+    assert client.get("/orderbook/GRP-USDT", params={"group": "7"}).status_code == 400
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+def test_websocket_depth_channel():
+    engine = MatchingEngine(depth_groups=[Decimal("10")])
+    manager = WebSocketManager(engine)
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        manager.connections.add(websocket)
+        engine.process_order(limit(OrderSide.BUY, "1", "101"))
+        await manager.handle_message(websocket, json.dumps(
+            {"type": "subscribe", "channel": "depth", "symbol": "BTC-USDT", "group": "10"}))
+        # Two book changes in one tick are sent as one update
+        engine.process_order(limit(OrderSide.BUY, "2", "102"))
+        engine.process_order(limit(OrderSide.SELL, "1", "130"))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert [m["type"] for m in websocket.sent] == ["depth", "depth"]
+    assert websocket.sent[0]["data"]["bids"] == [["100", "1"]]
+    assert websocket.sent[1]["data"] == {"symbol": "BTC-USDT", "group": "10",
+                                         "bids": [["100", "3"]], "asks": [["130", "1"]]}
@@ -0,0 +1,147 @@
+import pytest
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.sequencer import Sequencer
+from engine.execution_report import FillBuffer, ExecutionReport
+from engine.candles import CandleAggregator
+from engine.trade_tape import TradeTape
+from engine.trade_log import TradeLog
+from api import rest_api
+
+@pytest.fixture
+def engine():
+    return MatchingEngine(execution_reports=True)
+
+def stopped_clock_engine(**kwargs):
+    # Resting orders at time 0, so the takers' explicit timestamps are not in the past
+    return MatchingEngine(sequencer=Sequencer(clock=lambda: 0), **kwargs)
+
+def limit(side, quantity, price, symbol="BTC-USDT"):
+    return Order(symbol=symbol, order_type=OrderType.LIMIT, side=side,
+                 quantity=Decimal(quantity), price=Decimal(price))
+
+def market(side, quantity, symbol="BTC-USDT", timestamp=None):
+    return Order(symbol=symbol, order_type=OrderType.MARKET, side=side, quantity=Decimal(quantity),
+                 timestamp=timestamp)
+
+def seed_asks(engine):
+    engine.process_order(limit(OrderSide.SELL, "1", "100"))
+    engine.process_order(limit(OrderSide.SELL, "2", "100"))
+    engine.process_order(limit(OrderSide.SELL, "1", "101"))
+    engine.process_order(limit(OrderSide.SELL, "5", "103"))
+
+def test_sweep_produces_one_report(engine):
+    seed_asks(engine)
+    reports, trades = [], []
+    engine.add_execution_listener(reports.append)
+    engine.add_trade_listener(trades.append)
+
+    report = engine.process_order(market(OrderSide.BUY, "5"))
+
+    assert reports == [report]
+    assert len(report) == 4
+    assert report.filled_quantity == Decimal("5")
+    assert report.remaining_quantity == Decimal("0")
+    assert report.levels == [[Decimal("100"), Decimal("3"), 2], [Decimal("101"), Decimal("1"), 1],
+                             [Decimal("103"), Decimal("1"), 1]]
+    assert report.average_price == Decimal("504") / 5
+    # Per-fill listeners still see every trade, after the match loop
+    assert [t.trade_id for t in trades] == report.trade_ids == [1, 2, 3, 4]
+    assert engine.last_trade_prices["BTC-USDT"] == Decimal("103")
+
+def test_report_trades_match_per_fill_engine():
+    engine = stopped_clock_engine(execution_reports=True)
+    per_fill = stopped_clock_engine()
+    seed_asks(engine)
+    seed_asks(per_fill)
+    expected = per_fill.process_order(market(OrderSide.BUY, "4.5", timestamp=1))
+    assert list(engine.process_order(market(OrderSide.BUY, "4.5", timestamp=1))) == expected
+
+def test_consumers_read_report_columns_like_trades(tmp_path):
+    engine = stopped_clock_engine(execution_reports=True)
+    per_fill = stopped_clock_engine()
+    consumers = {}
+    for name, source, subscribe in (("reports", engine, engine.add_execution_listener),
+                                    ("trades", per_fill, per_fill.add_trade_listener)):
+        candles, tape, trade_log = CandleAggregator(), TradeTape(), TradeLog(str(tmp_path / name))
+        for consumer in (candles, tape, trade_log):
+            subscribe(consumer.on_execution if source is engine else consumer.on_trade)
+        consumers[name] = (candles, tape, trade_log)
+        seed_asks(source)
+        source.process_order(market(OrderSide.BUY, "4.5", timestamp=1))
+    report = engine.process_order(market(OrderSide.BUY, "1", timestamp=2))
+    per_fill.process_order(market(OrderSide.BUY, "1", timestamp=2))
+    assert report._trades is None  # No Trade models were built
+    (candles, tape, trade_log), (expected_candles, expected_tape, expected_log) = consumers.values()
+    assert candles.get_candles("BTC-USDT", "1m") == expected_candles.get_candles("BTC-USDT", "1m")
+    assert tape.recent("BTC-USDT") == expected_tape.recent("BTC-USDT")
+    assert list(trade_log.read_range("BTC-USDT", 0, 10)) == list(expected_log.read_range("BTC-USDT", 0, 10))
+    assert len(tape.recent("BTC-USDT")) == 5
+
+def test_unfilled_and_resting_orders_return_empty_report(engine):
+    report = engine.process_order(limit(OrderSide.BUY, "1", "99"))
+    assert isinstance(report, ExecutionReport)
+    assert not report
+    assert report.summary()["average_price"] is None
+    assert report.remaining_quantity == Decimal("1")
+
+def test_triggered_orders_get_their_own_report(engine):
+    seed_asks(engine)
+    reports = []
+    engine.add_execution_listener(reports.append)
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.STOP_LOSS, side=OrderSide.BUY,
+                               quantity=Decimal("1"), stop_price=Decimal("100")))
+    engine.process_order(market(OrderSide.BUY, "1"))
+    assert [(r.order_id, r.trade_ids) for r in reports] == [(6, [1]), (7, [2])]
+    assert reports[1].prices == [Decimal("100")]
+
+def test_execution_listener_in_per_fill_mode():
+    engine = MatchingEngine()
+    seed_asks(engine)
+    reports = []
+    engine.add_execution_listener(reports.append)
+    trades = engine.process_order(market(OrderSide.BUY, "3.5"))
+    assert len(reports) == 1
+    assert reports[0].trades() == trades
+    assert reports[0].summary()["levels"] == [{"price": "100", "quantity": "3", "fills": 2},
+                                               {"price": "101", "quantity": "0.5", "fills": 1}]
+
+def test_auction_uncross_reports_per_taker(engine):
+    engine.start_auction("BTC-USDT")
+    engine.process_order(limit(OrderSide.SELL, "1", "100"))
+    engine.process_order(limit(OrderSide.SELL, "1", "100"))
+    engine.process_order(limit(OrderSide.BUY, "2", "100"))
+    reports = []
+    engine.add_execution_listener(reports.append)
+    trades = engine.end_auction("BTC-USDT")
+    assert len(trades) == 2
+    assert [(r.order_id, len(r)) for r in reports] == [(3, 2)]
+
+def test_fill_buffer_grows():
+    fills = FillBuffer(capacity=2)
+    for i in range(5):
+        fills.append(i, Decimal("1"), Decimal("1"), i)
+    assert fills.capacity == 8
+    assert fills.trade_ids[:fills.count] == [0, 1, 2, 3, 4]
+
+def test_rest_compact_summary(tmp_path, monkeypatch):
+    # Trades are appended to the trade log under ./data
+    monkeypatch.chdir(tmp_path)
+    rest_api.get_engine().order_books.clear()
+    app = FastAPI()
+    app.include_router(rest_api.router)
+    client = TestClient(app)
+    for price in ("100", "101"):
+        client.post("/order", json={"symbol": "REP-USDT", "order_type": "limit", "side": "sell",
+                                    "quantity": "1", "price": price})
+    response = client.post("/order", params={"fills": "false"}, json={
+        "symbol": "REP-USDT", "order_type": "market", "side": "buy", "quantity": "3"
+    }).json()
+    assert "executions" not in response
+    assert response["report"]["filled_quantity"] == "2"
+    assert response["report"]["remaining_quantity"] == "1"
+    assert response["report"]["average_price"] == "100.5"
+    assert [level["price"] for level in response["report"]["levels"]] == ["100", "101"]
@@ -0,0 +1,51 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api import rest_api, fast_rest_api
+
+@pytest.fixture
+def clients(tmp_path, monkeypatch):
+    # Trades are appended to the trade log under ./data
+    monkeypatch.chdir(tmp_path)
+    rest_api.get_engine().order_books.clear()
+    fast_rest_api._depth_cache.clear()
+    fast_app, slow_app = FastAPI(), FastAPI()
+    fast_app.include_router(fast_rest_api.router)
+    slow_app.include_router(rest_api.router)
+    return TestClient(fast_app), TestClient(slow_app)
+
+def order(side, quantity, price):
+    return {"symbol": "FAST-USDT", "order_type": "limit", "side": side, "quantity": quantity, "price": price}
+
+def test_fast_order_response_matches_standard(clients):
+    fast, slow = clients
+    slow.post("/order", json=order("sell", "1", "100"))
+    slow.post("/order", json=order("sell", "1", "100"))
+    fast_response = fast.post("/order", json=order("buy", "1", "100")).json()
+    slow_response = slow.post("/order", json=order("buy", "1", "100")).json()
+
+    assert fast_response.keys() == slow_response.keys()
+    assert fast_response["executions"][0].keys() == slow_response["executions"][0].keys()
+    assert fast_response["executions"][0]["price"] == slow_response["executions"][0]["price"]
+
+def test_fast_order_rejects_invalid_body(clients):
+    fast, _ = clients
+    response = fast.post("/order", json=order("buy", "-1", "100"))
+    assert response.status_code == 400
+
+def test_depth_cache_invalidated_on_book_change(clients):
+    fast, slow = clients
+    fast.post("/order", json=order("buy", "1", "99"))
+    assert fast.get("/orderbook/FAST-USDT").json() == slow.get("/orderbook/FAST-USDT").json()
+    assert "FAST-USDT" in fast_rest_api._depth_cache
+
+    fast.post("/order", json=order("buy", "2", "98"))
+    assert "FAST-USDT" not in fast_rest_api._depth_cache
+    depth = fast.get("/orderbook/FAST-USDT").json()
+    assert depth == slow.get("/orderbook/FAST-USDT").json()
+    assert depth["bids"] == [["99", "1"], ["98", "2"]]
+
+def test_unknown_symbol_is_not_cached(clients):
+    fast, _ = clients
+    assert fast.get("/orderbook/NOPE-USDT").json() == {"bids": [], "asks": []}
+    assert "NOPE-USDT" not in fast_rest_api._depth_cache
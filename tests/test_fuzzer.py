@@ -0,0 +1,13 @@
+from engine.fuzzer import fuzz, generate_flow, run_reference, run_engine, first_difference, CONFIGURATIONS
+
+def test_configurations_match_reference():
+    report = fuzz(range(5), num_events=800)
+    for name in CONFIGURATIONS:
+        assert report[name]["mismatches"] == []
+        assert report[name]["events_per_second"] > 0
+
+def test_fuzzer_detects_divergence():
+    flow = generate_flow(0, 300)
+    expected, _ = run_reference(flow)
+    actual, _ = run_engine(CONFIGURATIONS["order_book"](), flow[1:])
+    assert first_difference(expected, actual) is not None
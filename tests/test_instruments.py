@@ -0,0 +1,86 @@
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.persistence import PersistenceManager
+from engine.instruments import Instrument, InstrumentRegistry
+
+@pytest.fixture
+def registry():
+    return InstrumentRegistry([
+        Instrument(symbol="BTC-USDT", tick_size=Decimal("0.5"), lot_size=Decimal("0.001"),
+                   min_quantity=Decimal("0.01"), price_band=Decimal("0.1")),
+        Instrument(symbol="ETH-USDT")
+    ])
+
+@pytest.fixture
+def engine(registry):
+    return MatchingEngine(instruments=registry)
+
+def limit(side, quantity, price, symbol="BTC-USDT"):
+    return Order(
+        symbol=symbol,
+        order_type=OrderType.LIMIT,
+        side=side,
+        quantity=Decimal(quantity),
+        price=Decimal(price)
+    )
+
+def test_unknown_symbol_rejected_without_creating_book(engine):
+    with pytest.raises(ValueError, match="Unknown symbol"):
+        engine.process_order(limit(OrderSide.BUY, "1", "100", symbol="BTC-USTD"))
+    assert "BTC-USTD" not in engine.order_books
+    assert engine.order_books.get("BTC-USTD") is None
+
+def test_default_engine_accepts_any_symbol():
+    engine = MatchingEngine()
+    engine.process_order(limit(OrderSide.BUY, "1", "100", symbol="ANY-THING"))
+    assert engine.order_books["ANY-THING"].symbol == "ANY-THING"
+
+def test_tick_lot_and_minimum(engine):
+    with pytest.raises(ValueError, match="tick size"):
+        engine.process_order(limit(OrderSide.BUY, "1", "100.25"))
+    with pytest.raises(ValueError, match="lot size"):
+        engine.process_order(limit(OrderSide.BUY, "1.0005", "100"))
+    with pytest.raises(ValueError, match="minimum"):
+        engine.process_order(limit(OrderSide.BUY, "0.005", "100"))
+    engine.process_order(limit(OrderSide.BUY, "1.001", "100.5"))
+    with pytest.raises(ValueError, match="tick size"):
+        engine.amend_order("BTC-USDT", 1, Decimal("1"), Decimal("100.1"))
+
+def test_price_band_around_last_trade(engine):
+    engine.process_order(limit(OrderSide.SELL, "1", "100"))
+    engine.process_order(limit(OrderSide.BUY, "1", "100"))
+    with pytest.raises(ValueError, match="price band"):
+        engine.process_order(limit(OrderSide.BUY, "1", "89.5"))
+    engine.process_order(limit(OrderSide.BUY, "1", "90"))
+
+def test_books_load_lazily_from_snapshots(registry, tmp_path):
+    persistence = PersistenceManager(data_dir=str(tmp_path))
+    primary = MatchingEngine(persistence_manager=persistence, instruments=registry)
+    primary.process_order(limit(OrderSide.BUY, "1", "100"))
+    primary.process_order(limit(OrderSide.SELL, "2", "110"))
+    primary.process_order(limit(OrderSide.BUY, "1", "2000", symbol="ETH-USDT"))
+    primary.shutdown()
+
+    restarted = MatchingEngine(persistence_manager=PersistenceManager(data_dir=str(tmp_path)),
+                               instruments=registry)
+    assert len(restarted.order_books) == 0
+    assert restarted.order_books.get("BTC-USDT").get_depth() == {
+        "bids": [("100", "1")], "asks": [("110", "2")]
+    }
+    assert list(restarted.order_books) == ["BTC-USDT"]
+    # Order IDs of books not loaded yet are not handed out again
+    order = limit(OrderSide.BUY, "1", "100")
+    restarted.process_order(order)
+    assert order.order_id == 4
+
+def test_unsequenced_snapshots_load_at_attach(tmp_path):
+    persistence = PersistenceManager(data_dir=str(tmp_path))
+    engine = MatchingEngine()
+    engine.process_order(limit(OrderSide.BUY, "1", "100"))
+    persistence.save_order_book("BTC-USDT", engine.order_books["BTC-USDT"])
+
+    restarted = MatchingEngine(persistence_manager=persistence)
+    assert "BTC-USDT" in restarted.order_books
+    assert restarted.sequencer.next_order_id() == 2
@@ -0,0 +1,21 @@
+from api.load_generator import iso_to_ns, compare_reports, _percentiles
+from engine.sequencer import ns_to_iso
+
+def test_iso_round_trip():
+    ns = 1_700_000_000_123_456_789
+    assert iso_to_ns(ns_to_iso(ns)) == ns
+
+def test_percentiles():
+    stats = _percentiles(list(range(1, 1001)))
+    assert stats["count"] == 1000
+    assert stats["p50"] == 501 and stats["p99"] == 991 and stats["max"] == 1000
+    assert _percentiles([]) == {"count": 0}
+
+def test_compare_reports():
+    baseline = {"config": {"orders": 10}, "rest": {"orders_per_second": 100.0, "latency_microseconds": {"p50": 0}}}
+    current = {"config": {"orders": 10}, "rest": {"orders_per_second": 150.0, "latency_microseconds": {"p50": 5}},
+               "gateway": {"orders_per_second": 1.0}}
+    assert compare_reports(baseline, current) == [
+        ("rest.orders_per_second", 100.0, 150.0, 50.0),
+        ("rest.latency_microseconds.p50", 0, 5, None)
+    ]
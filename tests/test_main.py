@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+from engine.cold_start import REPO_ROOT
+from engine.matching_engine import MatchingEngine
+from engine.shared_book import SharedBookPublisher
+
+SAVED = {
+    "sequence.json": json.dumps({"last_order_id": 100, "last_trade_id": 50}),
+    "BTC-USDT_orderbook.json": json.dumps({"bids": [], "asks": [], "stop_orders": [], "take_profit_orders": [],
+                                           "pegged_orders": []})
+}
+# What the primary saves while the reader is running
+PRIMARY = {
+    "sequence.json": json.dumps({"last_order_id": 500, "last_trade_id": 400}),
+    "BTC-USDT_orderbook.json": json.dumps({"bids": [], "asks": [["101", [{
+        "order_id": 500, "symbol": "BTC-USDT", "order_type": "limit", "side": "sell", "quantity": "1",
+        "price": "101", "timestamp": 1}]]], "stop_orders": [], "take_profit_orders": [], "pegged_orders": []})
+}
+READER = """
+import json, sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+import main
+with TestClient(main.app) as client:
+    assert client.get("/orderbook/BTC-USDT").status_code == 200
+    assert client.get("/tape/BTC-USDT").status_code == 503
+    order = {"symbol": "BTC-USDT", "order_type": "limit", "side": "buy", "quantity": "1", "price": "100"}
+    assert client.post("/order", json=order).status_code == 503
+    for name, text in json.loads(sys.argv[1]).items():
+        Path("data", name).write_text(text)
+assert main.engine is None and main.rest_api.engine is None
+"""
+
+def test_reader_worker_never_builds_an_engine_or_saves(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    for name, text in SAVED.items():
+        (data / name).write_text(text)
+    name = f"book_test_main_{os.getpid()}"
+    publisher = SharedBookPublisher(MatchingEngine(), name)
+    try:
+        subprocess.run([sys.executable, "-c", READER, json.dumps(PRIMARY)], check=True, cwd=tmp_path,
+                       capture_output=True, env={**os.environ, "PYTHONPATH": str(REPO_ROOT),
+                                                 "ORDERBOOK_SHM_READER": name})
+    finally:
+        publisher.close()
+    assert {path.name: path.read_text() for path in data.iterdir()} == PRIMARY
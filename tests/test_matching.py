@@ -80,4 +80,22 @@ def test_fok_order(engine):
     )
     
     executions = engine.process_order(buy_order)
-    assert len(executions) == 0  # Should not execute at all
\ No newline at end of file
+    assert len(executions) == 0  # Should not execute at all
+def test_ioc_sell_respects_limit_price(engine):
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.BUY,
+                               quantity=Decimal("1.0"), price=Decimal("49000.0")))
+    ioc_order = Order(symbol="BTC-USDT", order_type=OrderType.IOC, side=OrderSide.SELL,
+                      quantity=Decimal("1.0"), price=Decimal("50000.0"))
+    assert engine.process_order(ioc_order) == []
+
+def test_fok_fills_across_makers_or_not_at_all(engine):
+    for price in ("50000.0", "50001.0"):
+        engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.BUY,
+                                   quantity=Decimal("0.5"), price=Decimal(price)))
+    too_big = Order(symbol="BTC-USDT", order_type=OrderType.FOK, side=OrderSide.SELL,
+                    quantity=Decimal("1.5"), price=Decimal("50000.0"))
+    assert engine.process_order(too_big) == []
+    fok_order = Order(symbol="BTC-USDT", order_type=OrderType.FOK, side=OrderSide.SELL,
+                      quantity=Decimal("1.0"), price=Decimal("50000.0"))
+    executions = engine.process_order(fok_order)
+    assert [e.quantity for e in executions] == [Decimal("0.5"), Decimal("0.5")]
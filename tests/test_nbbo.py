@@ -0,0 +1,169 @@
+import random
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide, PegType
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.nbbo import NBBO
+from engine.venues import SimulatedVenue
+from engine.replication import EventJournal, ReplicaFollower, engine_checksums
+from engine.audit_log import AuditLog, read_audit_log, AWAY_QUOTE
+from engine.fixed_point import to_fixed
+
+SYMBOL = "BTC-USDT"
+
+@pytest.fixture(params=["order_book", "compact_order_book", "execution_reports"])
+def engine(request):
+    if request.param == "compact_order_book":
+        return MatchingEngine(order_book_factory=CompactOrderBook, nbbo=NBBO())
+    return MatchingEngine(execution_reports=request.param == "execution_reports", nbbo=NBBO())
+
+def order(order_type, side, quantity, price=None, **fields):
+    return Order(symbol=SYMBOL, order_type=order_type, side=side, quantity=Decimal(quantity),
+                 price=Decimal(price) if price is not None else None, **fields)
+
+def quote(engine, venue, bid, ask, size="1"):
+    return engine.update_away_quote(venue, SYMBOL, Decimal(bid) if bid else None, Decimal(size),
+                                    Decimal(ask) if ask else None, Decimal(size))
+
+def fills(executions):
+    return [(t.price, t.quantity) for t in executions]
+
+def test_nbbo_matches_a_full_scan_of_venue_quotes():
+    rng = random.Random(7)
+    nbbo = NBBO(["A", "B"])
+    latest = {}
+    for i in range(3000):
+        # Venues keep joining, so trees built for fewer venues have to grow
+        venue = f"V{rng.randrange(min(2 + i // 200, 13))}" if rng.random() < 0.9 else rng.choice(["A", "B"])
+        symbol = rng.choice(["BTC-USDT", "ETH-USDT"])
+        bid = Decimal(rng.randint(90, 100)) if rng.random() < 0.9 else None
+        ask = Decimal(rng.randint(101, 110)) if rng.random() < 0.9 else None
+        size = Decimal(rng.randint(0, 3))
+        nbbo.on_quote(venue, symbol, bid, size, ask, size)
+        latest[venue, symbol] = (bid, ask) if size else (None, None)
+        for s in ("BTC-USDT", "ETH-USDT"):
+            bids = [b for (v, sym), (b, a) in latest.items() if sym == s and b is not None]
+            asks = [a for (v, sym), (b, a) in latest.items() if sym == s and a is not None]
+            assert nbbo.best_bids.get(s) == (max(bids) if bids else None)
+            assert nbbo.best_asks.get(s) == (min(asks) if asks else None)
+    best = nbbo.quote("BTC-USDT")
+    assert best["venues"][best["bid_venue"]]["bid"] == best["bid"]
+
+def test_locked_or_crossed_quote_is_rejected():
+    nbbo = NBBO()
+    with pytest.raises(ValueError, match="crossed"):
+        nbbo.on_quote("A", SYMBOL, Decimal("101"), Decimal("1"), Decimal("100"), Decimal("1"))
+    with pytest.raises(ValueError, match="NBBO"):
+        MatchingEngine().update_away_quote("A", SYMBOL, Decimal("99"), Decimal("1"), Decimal("100"), Decimal("1"))
+
+def test_buys_stop_before_trading_through_the_best_away_ask(engine):
+    for price in ("100", "101", "102"):
+        engine.process_order(order(OrderType.LIMIT, OrderSide.SELL, "1", price))
+    quote(engine, "A", "99", "101.5")
+    quote(engine, "B", "98", "101")
+    # Trading at the protected price itself is allowed
+    assert fills(engine.process_order(order(OrderType.MARKET, OrderSide.BUY, "3"))) == [
+        (Decimal("100"), Decimal("1")), (Decimal("101"), Decimal("1"))
+    ]
+    # FOK only counts liquidity it could take without a trade-through
+    assert len(engine.process_order(order(OrderType.FOK, OrderSide.BUY, "1", "102"))) == 0
+    # A limit remainder that would lock or cross the protected quote is canceled, not rested
+    engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "1", "102"))  # 6
+    assert engine.get_order_status(6) is None
+    assert engine.order_books[SYMBOL].best_bid is None
+    # Once the away ask is withdrawn the local 102 is the best price again
+    quote(engine, "A", "99", None)
+    quote(engine, "B", None, None)
+    assert fills(engine.process_order(order(OrderType.IOC, OrderSide.BUY, "1", "102"))) == [
+        (Decimal("102"), Decimal("1"))
+    ]
+
+def test_sells_stop_before_trading_through_the_best_away_bid(engine):
+    for price in ("100", "99", "98"):
+        engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "1", price))
+    quote(engine, "A", "99.5", "103")
+    assert fills(engine.process_order(order(OrderType.IOC, OrderSide.SELL, "3", "98"))) == [
+        (Decimal("100"), Decimal("1"))
+    ]
+    assert engine.get_order_status(2)["status"] == "resting"
+
+def test_protection_never_leaves_the_book_crossed(engine):
+    engine.process_order(order(OrderType.LIMIT, OrderSide.SELL, "1", "100.5"))  # 1
+    quote(engine, "A", "99", "100")
+    assert len(engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "1", "101"))) == 0  # 2
+    assert engine.get_order_status(2) is None
+    # Resting below the protected ask is fine
+    engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "1", "99.5"))  # 3
+    assert engine.get_order_status(3)["status"] == "resting"
+    quote(engine, "A", None, None)
+    book = engine.order_books[SYMBOL]
+    assert book.best_bid < book.best_ask
+    # Sells are protected the same way
+    quote(engine, "A", "100.2", "100.4")
+    engine.process_order(order(OrderType.LIMIT, OrderSide.SELL, "1", "100.1"))  # 4
+    assert engine.get_order_status(4) is None
+    assert (book.best_bid, book.best_ask) == (Decimal("99.5"), Decimal("100.5"))
+
+def test_pegs_follow_the_national_best(engine):
+    engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "1", "100"))  # 1
+    engine.process_order(order(OrderType.LIMIT, OrderSide.SELL, "1", "104"))  # 2
+    engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "1", peg_type=PegType.PRIMARY))  # 3
+    engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "2", peg_type=PegType.MIDPOINT))  # 4
+    assert engine.get_order_status(4)["price"] == Decimal("102")
+    quote(engine, "A", "101", "102")
+    assert engine.get_order_status(3)["price"] == Decimal("101")
+    assert engine.get_order_status(4)["price"] == Decimal("101.5")
+    # A midpoint sell crosses at the national midpoint
+    executions = engine.process_order(order(OrderType.LIMIT, OrderSide.SELL, "1", peg_type=PegType.MIDPOINT))
+    assert fills(executions) == [(Decimal("101.5"), Decimal("1"))]
+
+def test_away_quote_gives_resting_midpoint_pegs_a_price():
+    engine = MatchingEngine(nbbo=NBBO())
+    trades = []
+    engine.add_trade_listener(trades.append)
+    engine.process_order(order(OrderType.LIMIT, OrderSide.BUY, "1", peg_type=PegType.MIDPOINT))
+    engine.process_order(order(OrderType.LIMIT, OrderSide.SELL, "1", peg_type=PegType.MIDPOINT))
+    assert trades == []
+    crossed = quote(engine, "A", "99", "100")
+    assert fills(crossed) == [(Decimal("99.5"), Decimal("1"))]
+    assert trades == crossed
+
+def test_replica_and_audit_log_replay_away_quotes(tmp_path):
+    primary = MatchingEngine(nbbo=NBBO())
+    journal = EventJournal(primary, str(tmp_path / "journal.jsonl"), checksum_every=10)
+    audit_log = AuditLog(primary, tmp_path / "audit.bin")
+    venue = SimulatedVenue("A", {SYMBOL: Decimal("100")}, tick=Decimal("1"), seed=1)
+    venue.add_quote_listener(primary.update_away_quote)
+    rng = random.Random(3)
+    for _ in range(300):
+        venue.publish()
+        side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+        primary.process_order(order(rng.choice([OrderType.LIMIT, OrderType.IOC]), side, rng.randint(1, 3),
+                                    rng.randint(90, 110)))
+    journal.close()
+    audit_log.close()
+    replica = MatchingEngine(nbbo=NBBO())
+    follower = ReplicaFollower(replica, str(tmp_path / "journal.jsonl"))
+    follower.poll()
+    assert not follower.diverged and follower.checksums_verified > 0
+    assert engine_checksums(replica) == engine_checksums(primary)
+    assert replica.nbbo.quote(SYMBOL) == primary.nbbo.quote(SYMBOL)
+    last = [r for r in read_audit_log(tmp_path / "audit.bin") if r["type"] == AWAY_QUOTE][-1]
+    assert (last["price"], last["ids"][0]) == (to_fixed(primary.nbbo.best_bids[SYMBOL]),
+                                              to_fixed(primary.nbbo.best_asks[SYMBOL]))
+
+def test_simulated_venues_quote_a_random_walk():
+    nbbo = NBBO()
+    venues = SimulatedVenue.from_env("A, B", "BTC-USDT=50000,ETH-USDT=3000", seed=5)
+    for venue in venues:
+        venue.add_quote_listener(nbbo.on_quote)
+        venue.publish(500)
+    assert nbbo.stats() == {"venues": ["A", "B"], "symbols": 2, "updates": 1000}
+    for symbol, mid in (("BTC-USDT", 50000), ("ETH-USDT", 3000)):
+        best = nbbo.quote(symbol)
+        assert all(q["bid"] < q["ask"] for q in best["venues"].values())
+        assert abs(best["bid"] - mid) < 100
+    # The same seed replays the same quotes
+    assert SimulatedVenue.from_env("A", "BTC-USDT=1", seed=5)[0].next_quote() == \
+        SimulatedVenue.from_env("A", "BTC-USDT=1", seed=5)[0].next_quote()
@@ -36,3 +36,31 @@ def test_missing_required_fields(engine):
             quantity=None,  # Missing quantity
             price=Decimal("50000.0")
         )
+
+def test_values_beyond_fixed_point_precision_are_rejected_at_entry(engine):
+    with pytest.raises(ValueError, match="decimal places"):
+        Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY, quantity=Decimal("0.123456789"))
+    with pytest.raises(ValueError, match="decimal places"):
+        Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.BUY, quantity=Decimal("1"),
+              price=Decimal("1E+12"))
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                               quantity=Decimal("1"), price=Decimal("100")))
+    with pytest.raises(ValueError, match="decimal places"):
+        engine.amend_order("BTC-USDT", 1, Decimal("0.000000001"))
+    assert engine.get_order_status(1)["quantity"] == Decimal("1")
+
+def test_failing_listener_does_not_abort_a_match(engine):
+    def failing(*args):
+        raise RuntimeError("listener failure")
+    seen = []
+    engine.add_trade_listener(failing)
+    engine.add_trade_listener(seen.append)
+    engine.add_book_listener(failing)
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                               quantity=Decimal("1"), price=Decimal("100")))
+    trades = engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY,
+                                        quantity=Decimal("0.4")))
+    # The fill is applied and later listeners still hear about it
+    assert [t.quantity for t in trades] == [Decimal("0.4")]
+    assert seen == trades
+    assert engine.get_order_status(1)["quantity"] == Decimal("0.6")
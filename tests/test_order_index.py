@@ -0,0 +1,97 @@
+import pytest
+from decimal import Decimal
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.fuzzer import generate_flow, run_engine, SYMBOL
+from api import rest_api
+
+@pytest.fixture(params=["order_book", "compact_order_book"])
+def engine(request):
+    if request.param == "compact_order_book":
+        return MatchingEngine(order_book_factory=CompactOrderBook)
+    return MatchingEngine()
+
+def limit(side, quantity, price, user_id=None, symbol="BTC-USDT"):
+    return Order(
+        symbol=symbol,
+        order_type=OrderType.LIMIT,
+        side=side,
+        quantity=Decimal(quantity),
+        price=Decimal(price),
+        user_id=user_id
+    )
+
+def test_order_status_and_queue_position(engine):
+    engine.process_order(limit(OrderSide.BUY, "1", "100", "alice"))
+    engine.process_order(limit(OrderSide.BUY, "2", "100", "bob"))
+    engine.process_order(limit(OrderSide.SELL, "0.5", "100", "carol"))
+
+    status = engine.get_order_status(2)
+    assert status["status"] == "resting"
+    assert status["user_id"] == "bob"
+    assert (status["orders_ahead"], status["quantity_ahead"]) == (1, Decimal("0.5"))
+    assert engine.get_order_status(1)["quantity"] == Decimal("0.5")
+    assert engine.get_order_status(3) is None  # Filled on arrival
+
+    engine.process_order(limit(OrderSide.SELL, "0.5", "100"))
+    assert engine.get_order_status(1) is None
+    assert engine.get_order_status(2)["orders_ahead"] == 0
+
+def test_queue_position_walk_is_bounded(engine):
+    engine.queue_scan_limit = 2
+    for _ in range(4):
+        engine.process_order(limit(OrderSide.BUY, "1", "99", "alice"))
+    assert engine.get_order_status(3)["queue_position_exact"]
+    status = engine.get_order_status(4)
+    assert (status["orders_ahead"], status["quantity_ahead"], status["queue_position_exact"]) == (2, Decimal("2"), False)
+
+def test_mass_cancel_touches_only_that_user(engine):
+    engine.process_order(limit(OrderSide.BUY, "1", "99", "alice"))
+    engine.process_order(limit(OrderSide.SELL, "1", "101", "alice"))
+    engine.process_order(limit(OrderSide.BUY, "1", "99", "bob"))
+    engine.process_order(limit(OrderSide.BUY, "1", "2000", "alice", symbol="ETH-USDT"))
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.STOP_LOSS, side=OrderSide.SELL,
+                               quantity=Decimal("1"), stop_price=Decimal("90"), user_id="alice"))
+    assert [s["order_id"] for s in engine.get_user_orders("alice")] == [1, 2, 5, 4]
+    assert engine.get_order_status(5)["status"] == "pending_trigger"
+
+    assert engine.cancel_user_orders("alice", "BTC-USDT") == [1, 2, 5]
+    assert [s["order_id"] for s in engine.get_user_orders("alice")] == [4]
+    book = engine.order_books["BTC-USDT"]
+    assert [o.order_id for o in book.bids[Decimal("99")]] == [3]
+    assert not book.asks and not book.stop_orders
+    assert engine.get_user_orders("bob")[0]["order_id"] == 3
+
+def test_amended_and_triggered_orders_keep_owner(engine):
+    engine.process_order(limit(OrderSide.BUY, "2", "99", "alice"))
+    engine.amend_order("BTC-USDT", 1, Decimal("3"), Decimal("98"))
+    assert engine.get_order_status(1)["user_id"] == "alice"
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.STOP_LIMIT, side=OrderSide.BUY,
+                               quantity=Decimal("1"), stop_price=Decimal("100"), price=Decimal("97"),
+                               user_id="bob"))
+    engine.update_market_price("BTC-USDT", Decimal("100"))
+    assert [s["status"] for s in engine.get_user_orders("bob")] == ["resting"]
+
+def test_index_matches_books_after_random_flow(engine):
+    run_engine(engine, generate_flow(11, 1500))
+    order_book = engine.order_books[SYMBOL]
+    live = {o.order_id for levels in (order_book.bids, order_book.asks) for level in levels.values() for o in level}
+    live |= {o.order_id for o in order_book.stop_orders + order_book.take_profit_orders}
+    assert set(engine.order_index.orders) == live
+
+def test_order_endpoints(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rest_api.get_engine().order_books.clear()
+    app = FastAPI()
+    app.include_router(rest_api.router)
+    client = TestClient(app)
+    order_id = client.post("/order", json={"symbol": "IDX-USDT", "order_type": "limit", "side": "buy",
+                                           "quantity": "1", "price": "10", "user_id": "dave"}).json()["order_id"]
+    status = client.get(f"/order/{order_id}").json()
+    assert status["status"] == "resting" and status["user_id"] == "dave" and status["orders_ahead"] == 0
+    assert [o["order_id"] for o in client.get("/orders", params={"user": "dave"}).json()["orders"]] == [order_id]
+    assert client.delete("/orders", params={"user": "dave", "symbol": "IDX-USDT"}).json()["canceled"] == [order_id]
+    assert client.get(f"/order/{order_id}").status_code == 404
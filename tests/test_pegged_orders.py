@@ -0,0 +1,134 @@
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide, PegType
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.persistence import PersistenceManager
+from engine.replication import book_checksum
+
+SYMBOL = "BTC-USDT"
+
+@pytest.fixture(params=["order_book", "compact_order_book", "execution_reports"])
+def engine(request):
+    if request.param == "compact_order_book":
+        return MatchingEngine(order_book_factory=CompactOrderBook)
+    return MatchingEngine(execution_reports=request.param == "execution_reports")
+
+def limit(side, quantity, price, **fields):
+    return Order(symbol=SYMBOL, order_type=OrderType.LIMIT, side=side,
+                 quantity=Decimal(quantity), price=Decimal(price), **fields)
+
+def pegged(side, quantity, peg_type, offset="0", **fields):
+    return Order(symbol=SYMBOL, order_type=OrderType.LIMIT, side=side, quantity=Decimal(quantity),
+                 peg_type=peg_type, peg_offset=Decimal(offset), **fields)
+
+def market(side, quantity):
+    return Order(symbol=SYMBOL, order_type=OrderType.MARKET, side=side, quantity=Decimal(quantity))
+
+def fills(executions):
+    return [(t.price, t.quantity, t.maker_order_id) for t in executions]
+
+def test_primary_peg_joins_best_bid_behind_displayed_orders(engine):
+    engine.process_order(limit(OrderSide.BUY, "1", "100"))  # 1
+    engine.process_order(limit(OrderSide.BUY, "1", "99"))  # 2
+    engine.process_order(pegged(OrderSide.BUY, "2", PegType.PRIMARY))  # 3
+    engine.process_order(pegged(OrderSide.BUY, "1", PegType.PRIMARY, "0.5"))  # 4
+    assert engine.get_order_status(3)["price"] == Decimal("100")
+    assert engine.get_order_status(4)["price"] == Decimal("99.5")
+    # Pegged orders are not displayed
+    assert [price for price, _ in engine.order_books[SYMBOL].get_depth()["bids"]] == ["100", "99"]
+    # Peg prices are fixed as the sell arrives: the displayed 100 trades first, then the peg joined to it
+    executions = engine.process_order(market(OrderSide.SELL, "3.5"))
+    assert fills(executions) == [
+        (Decimal("100"), Decimal("1"), 1),
+        (Decimal("100"), Decimal("2"), 3),
+        (Decimal("99.5"), Decimal("0.5"), 4)
+    ]
+    # Order 4 now pegs to the new best bid
+    assert engine.get_order_status(4)["price"] == Decimal("98.5")
+    engine.cancel_order(SYMBOL, 2)
+    # With no displayed bid the peg has no price and cannot trade
+    assert engine.get_order_status(4)["price"] is None
+    assert len(engine.process_order(market(OrderSide.SELL, "1"))) == 0
+
+def test_primary_sell_peg_with_offset(engine):
+    engine.process_order(limit(OrderSide.SELL, "1", "101"))  # 1
+    engine.process_order(limit(OrderSide.SELL, "1", "103"))  # 2
+    engine.process_order(pegged(OrderSide.SELL, "1", PegType.PRIMARY, "1"))  # 3: ask + 1
+    assert fills(engine.process_order(limit(OrderSide.BUY, "3", "103"))) == [
+        (Decimal("101"), Decimal("1"), 1), (Decimal("102"), Decimal("1"), 3), (Decimal("103"), Decimal("1"), 2)
+    ]
+
+def test_midpoint_peg_trades_inside_the_spread(engine):
+    engine.process_order(limit(OrderSide.BUY, "1", "100"))  # 1
+    engine.process_order(limit(OrderSide.SELL, "1", "101"))  # 2
+    engine.process_order(pegged(OrderSide.BUY, "2", PegType.MIDPOINT))  # 3
+    assert engine.get_order_status(3)["price"] == Decimal("100.5")
+    # A better bid moves the midpoint without touching the pegged order
+    engine.process_order(limit(OrderSide.BUY, "1", "100.4"))  # 4
+    assert engine.get_order_status(3)["price"] == Decimal("100.7")
+    # A sell limit at the midpoint trades with the peg ahead of every displayed bid
+    assert fills(engine.process_order(limit(OrderSide.SELL, "1", "100.7"))) == [(Decimal("100.7"), Decimal("1"), 3)]
+    assert len(engine.process_order(limit(OrderSide.SELL, "1", "100.71"))) == 0
+
+def test_midpoint_pegs_cross_each_other(engine):
+    engine.process_order(pegged(OrderSide.BUY, "1", PegType.MIDPOINT))  # 1
+    engine.process_order(pegged(OrderSide.SELL, "3", PegType.MIDPOINT))  # 2
+    # No midpoint yet, so both rest
+    assert engine.get_order_status(1)["status"] == "pegged"
+    engine.process_order(limit(OrderSide.BUY, "1", "99"))  # 3
+    trades = []
+    engine.add_trade_listener(trades.append)
+    engine.process_order(limit(OrderSide.SELL, "1", "101"))  # 4: the book now has a midpoint
+    assert fills(trades) == [(Decimal("100"), Decimal("1"), 1)]
+    assert trades[0].taker_order_id == 2
+    executions = engine.process_order(pegged(OrderSide.BUY, "1", PegType.MIDPOINT))  # 6 (trade 5)
+    assert fills(executions) == [(Decimal("100"), Decimal("1"), 2)]
+    assert engine.get_order_status(2)["quantity"] == Decimal("1")
+    assert engine.get_order_status(6) is None
+
+def test_midpoint_pegs_cross_when_an_auction_ends(engine):
+    engine.process_order(pegged(OrderSide.BUY, "1", PegType.MIDPOINT))  # 1
+    engine.process_order(pegged(OrderSide.SELL, "1", PegType.MIDPOINT))  # 2
+    engine.start_auction(SYMBOL)
+    engine.process_order(limit(OrderSide.BUY, "1", "99"))  # 3
+    engine.process_order(limit(OrderSide.SELL, "1", "101"))  # 4
+    # Nothing uncrosses in the auction itself, but the pegs now have a midpoint
+    assert fills(engine.end_auction(SYMBOL)) == [(Decimal("100"), Decimal("1"), 1)]
+    assert len(engine.order_books[SYMBOL].pegs) == 0
+
+def test_cancel_status_and_auction():
+    engine = MatchingEngine()
+    engine.process_order(pegged(OrderSide.BUY, "1", PegType.PRIMARY, "2", user_id="alice"))
+    assert [s["status"] for s in engine.get_user_orders("alice")] == ["pegged"]
+    assert engine.cancel_user_orders("alice") == [1]
+    assert len(engine.order_books[SYMBOL].pegs) == 0
+    engine.start_auction(SYMBOL)
+    with pytest.raises(ValueError):
+        engine.process_order(pegged(OrderSide.BUY, "1", PegType.MIDPOINT))
+
+def test_validation():
+    with pytest.raises(ValueError):
+        Order(symbol=SYMBOL, order_type=OrderType.LIMIT, side=OrderSide.BUY, quantity=Decimal("1"),
+              price=Decimal("100"), peg_type=PegType.MIDPOINT)
+    with pytest.raises(ValueError):
+        Order(symbol=SYMBOL, order_type=OrderType.IOC, side=OrderSide.BUY, quantity=Decimal("1"),
+              peg_type=PegType.PRIMARY)
+    with pytest.raises(ValueError):
+        pegged(OrderSide.BUY, "1", PegType.MIDPOINT, "1")
+    with pytest.raises(ValueError):
+        pegged(OrderSide.BUY, "1", PegType.PRIMARY, "-1")
+
+def test_pegged_orders_survive_restart(tmp_path):
+    persistence = PersistenceManager(data_dir=str(tmp_path))
+    engine = MatchingEngine(persistence_manager=persistence)
+    engine.process_order(limit(OrderSide.BUY, "1", "100"))
+    engine.process_order(pegged(OrderSide.BUY, "2", PegType.PRIMARY, "1", user_id="alice"))
+    checksum = book_checksum(engine.order_books[SYMBOL])
+    engine.shutdown()
+    restarted = MatchingEngine(persistence_manager=PersistenceManager(data_dir=str(tmp_path)))
+    assert book_checksum(restarted.order_books[SYMBOL]) == checksum
+    assert restarted.get_order_status(2)["price"] == Decimal("99")
+    # Restored IDs are not reused
+    restarted.process_order(limit(OrderSide.BUY, "1", "98"))
+    assert restarted.get_order_status(3)["status"] == "resting"
@@ -1,11 +1,61 @@
+import json
+from decimal import Decimal
 from engine.persistence import PersistenceManager
 from engine.order_book import OrderBook
+from engine.compact_order_book import CompactOrderBook
+from engine.matching_engine import MatchingEngine
+from engine.models import Order, OrderType, OrderSide
 
-def test_order_book_persistence():
-    pm = PersistenceManager()
+def test_order_book_persistence(tmp_path):
+    pm = PersistenceManager(data_dir=str(tmp_path))
     order_book = OrderBook("BTC-USDT")
     # Add orders to order book
     pm.save_order_book("BTC-USDT", order_book)
     loaded = pm.load_order_book("BTC-USDT")
     assert loaded["bids"] == order_book.bids
-    assert loaded["asks"] == order_book.asks 
\ No newline at end of file
+    assert loaded["asks"] == order_book.asks
+
+def test_compact_book_snapshot_keeps_owners(tmp_path):
+    engine = MatchingEngine(persistence_manager=PersistenceManager(data_dir=str(tmp_path)),
+                            order_book_factory=CompactOrderBook)
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.BUY,
+                               quantity=Decimal("1"), price=Decimal("100"), user_id="alice"))
+    engine.shutdown()
+    restarted = MatchingEngine(persistence_manager=PersistenceManager(data_dir=str(tmp_path)),
+                               order_book_factory=CompactOrderBook)
+    restarted.order_books["BTC-USDT"]  # Saved books load on first access
+    assert [status["order_id"] for status in restarted.get_user_orders("alice")] == [1]
+
+def test_failed_save_keeps_the_previous_snapshot(tmp_path, monkeypatch):
+    pm = PersistenceManager(data_dir=str(tmp_path))
+    order_book = OrderBook("BTC-USDT")
+    order_book.add_order(Order(order_id=1, symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.BUY,
+                               quantity=Decimal("1"), price=Decimal("100"), timestamp=1))
+    pm.save_order_book("BTC-USDT", order_book)
+    def failing(order):
+        raise AttributeError("no user_id")
+    monkeypatch.setattr(pm, "_serialize_order", failing)
+    pm.save_order_book("BTC-USDT", order_book)
+    monkeypatch.undo()
+    assert list(pm.load_order_book("BTC-USDT")["bids"]) == [Decimal("100")]
+    assert [path.name for path in tmp_path.iterdir()] == ["BTC-USDT_orderbook.json"]
+
+def test_snapshot_with_uuid_ids_and_iso_timestamps_loads(tmp_path):
+    legacy = {"order_id": "6f1c0c1e-0b5a-4c7e-9a52-0d4a4f1d2b3c", "symbol": "BTC-USDT", "order_type": "limit",
+              "side": "buy", "quantity": "1", "price": "100", "stop_price": None, "take_profit_price": None,
+              "timestamp": "2024-01-02T03:04:05.123456"}
+    later = dict(legacy, order_id="0e9d7c55-3f0c-4d61-8f3b-1b2c3d4e5f60", timestamp="2024-01-02T03:04:06")
+    stop = dict(legacy, order_id="b7d4e8a2-5c61-4f0e-a3b9-8e7f6d5c4b3a", order_type="stop_loss", side="sell",
+                price=None, stop_price="90")
+    (tmp_path / "BTC-USDT_orderbook.json").write_text(json.dumps(
+        {"bids": [["100", [legacy, later]]], "asks": [], "stop_orders": [stop], "take_profit_orders": []}))
+    engine = MatchingEngine(persistence_manager=PersistenceManager(data_dir=str(tmp_path)))
+    order_book = engine.order_books["BTC-USDT"]
+    assert [order.order_id for order in order_book.bids[Decimal("100")]] == [1, 2]
+    assert order_book.bids[Decimal("100")][0].timestamp == 1704164645123456000
+    assert [order.order_id for order in order_book.stop_orders] == [3]
+    taker = Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                  quantity=Decimal("1"), price=Decimal("100"))
+    trades = engine.process_order(taker)
+    assert taker.order_id == 4
+    assert [trade.maker_order_id for trade in trades] == [1]
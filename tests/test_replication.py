@@ -0,0 +1,141 @@
+import random
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.replication import EventJournal, ReplicaFollower, engine_checksums, book_checksum, BookDigest
+
+def trade_key(trade):
+    return (trade.trade_id, trade.timestamp, trade.price, trade.quantity, trade.maker_order_id, trade.taker_order_id)
+
+def random_flow(engine, rng, n):
+    live = []
+    for _ in range(n):
+        roll = rng.random()
+        if roll < 0.1 and live:
+            engine.cancel_order("BTC-USDT", live.pop(rng.randrange(len(live))))
+            continue
+        if roll < 0.15:
+            engine.update_market_price("BTC-USDT", Decimal(rng.randint(95, 105)))
+            continue
+        side = rng.choice([OrderSide.BUY, OrderSide.SELL])
+        if roll < 0.25:
+            order = Order(symbol="BTC-USDT", order_type=OrderType.STOP_LIMIT, side=side,
+                          quantity=Decimal(rng.randint(1, 5)), stop_price=Decimal(rng.randint(95, 105)),
+                          price=Decimal(rng.randint(95, 105)))
+        elif roll < 0.35:
+            order = Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=side,
+                          quantity=Decimal(rng.randint(1, 5)))
+        else:
+            order = Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=side,
+                          quantity=Decimal(rng.randint(1, 5)), price=Decimal(rng.randint(95, 105)))
+        engine.process_order(order)
+        live.append(order.order_id)
+
+def test_replica_stays_book_identical(tmp_path):
+    journal_path = tmp_path / "journal.jsonl"
+    primary = MatchingEngine()
+    primary_trades = []
+    primary.add_trade_listener(lambda t: primary_trades.append(trade_key(t)))
+    journal = EventJournal(primary, str(journal_path), checksum_every=25)
+
+    replica = MatchingEngine()
+    replica_trades = []
+    replica.add_trade_listener(lambda t: replica_trades.append(trade_key(t)))
+    follower = ReplicaFollower(replica, str(journal_path))
+
+    rng = random.Random(42)
+    random_flow(primary, rng, 150)
+    follower.poll()
+    random_flow(primary, rng, 150)
+    journal.checkpoint()
+    follower.poll()
+
+    assert primary_trades and replica_trades == primary_trades
+    assert engine_checksums(replica) == engine_checksums(primary)
+    assert follower.checksums_verified >= 10
+    assert not follower.diverged
+
+    # After promotion the replica hands out fresh IDs where the primary stopped
+    promoted = follower.promote()
+    order = Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.BUY,
+                  quantity=Decimal("1"), price=Decimal("1"))
+    promoted.process_order(order)
+    assert order.order_id == primary.sequencer.next_order_id()
+    journal.file.close()
+
+def test_replica_detects_divergence(tmp_path):
+    journal_path = tmp_path / "journal.jsonl"
+    primary = MatchingEngine()
+    journal = EventJournal(primary, str(journal_path), checksum_every=1)
+    replica = MatchingEngine()
+    follower = ReplicaFollower(replica, str(journal_path))
+
+    primary.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                                quantity=Decimal("1"), price=Decimal("100")))
+    follower.poll()
+    # A change the primary never made
+    book = replica.order_books["BTC-USDT"]
+    book.reduce_order(book.asks[Decimal("100")][0], Decimal("0.5"))
+    primary.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                                quantity=Decimal("1"), price=Decimal("101")))
+    follower.poll()
+    assert follower.diverged
+    journal.close()
+
+def test_replica_replays_auction(tmp_path):
+    journal_path = tmp_path / "journal.jsonl"
+    primary = MatchingEngine()
+    primary_trades = []
+    primary.add_trade_listener(lambda t: primary_trades.append(trade_key(t)))
+    journal = EventJournal(primary, str(journal_path))
+    replica = MatchingEngine()
+    replica_trades = []
+    replica.add_trade_listener(lambda t: replica_trades.append(trade_key(t)))
+    follower = ReplicaFollower(replica, str(journal_path))
+
+    primary.start_auction("BTC-USDT")
+    rng = random.Random(7)
+    for _ in range(50):
+        primary.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT,
+                                    side=rng.choice([OrderSide.BUY, OrderSide.SELL]),
+                                    quantity=Decimal(rng.randint(1, 5)), price=Decimal(rng.randint(95, 105))))
+    primary.end_auction("BTC-USDT")
+    journal.checkpoint()
+    follower.poll()
+
+    assert primary_trades and replica_trades == primary_trades
+    assert follower.checksums_verified == 1 and not follower.diverged
+
+@pytest.mark.parametrize("factory", [None, CompactOrderBook])
+def test_maintained_digest_matches_a_full_scan(tmp_path, factory):
+    primary = MatchingEngine(order_book_factory=factory) if factory else MatchingEngine()
+    rng = random.Random(5)
+    random_flow(primary, rng, 100)  # Books loaded before the journal starts are scanned once
+    journal = EventJournal(primary, str(tmp_path / "journal.jsonl"))
+    random_flow(primary, rng, 300)
+    for order_book in primary.order_books.values():
+        assert order_book.digest.value == BookDigest(order_book).value
+        checksum = book_checksum(order_book)
+        order_book.digest = None
+        assert book_checksum(order_book) == checksum
+    journal.close()
+
+def test_replica_logs_unexpected_replay_errors(tmp_path, caplog):
+    journal_path = tmp_path / "journal.jsonl"
+    primary = MatchingEngine()
+    journal = EventJournal(primary, str(journal_path))
+    primary.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                                quantity=Decimal("1"), price=Decimal("100")))
+    primary.update_market_price("BTC-USDT", Decimal("100"))
+    journal.checkpoint()
+    replica = MatchingEngine()
+    follower = ReplicaFollower(replica, str(journal_path))
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+    replica.update_market_price = broken
+    assert follower.poll() == 3
+    assert "Replaying event 2 failed" in caplog.text
+    assert follower.applied_seq == 2 and follower.checksums_verified == 1
+    journal.file.close()
@@ -0,0 +1,148 @@
+import random
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.risk import RiskManager, RiskLimits
+from engine.fuzzer import generate_flow, SYMBOL
+
+def limit(side, quantity, price, user_id=None, symbol="BTC-USDT"):
+    return Order(symbol=symbol, order_type=OrderType.LIMIT, side=side, user_id=user_id,
+                 quantity=Decimal(quantity), price=Decimal(price))
+
+def market(side, quantity, user_id=None, symbol="BTC-USDT"):
+    return Order(symbol=symbol, order_type=OrderType.MARKET, side=side, user_id=user_id, quantity=Decimal(quantity))
+
+def test_price_collar_around_last_trade():
+    engine = MatchingEngine(risk=RiskManager(RiskLimits(price_collar=Decimal("0.05"))))
+    # No last trade yet, so any price is accepted
+    engine.process_order(limit(OrderSide.SELL, "1", "100"))
+    engine.process_order(market(OrderSide.BUY, "1"))
+    engine.process_order(limit(OrderSide.BUY, "1", "95"))
+    with pytest.raises(ValueError, match="collar"):
+        engine.process_order(limit(OrderSide.BUY, "1", "94.99"))
+    with pytest.raises(ValueError, match="collar"):
+        engine.amend_order("BTC-USDT", 3, Decimal("1"), Decimal("106"))
+    # Rejected orders take no order ID
+    assert engine.process_order(limit(OrderSide.SELL, "1", "105")) == []
+    assert engine.order_books["BTC-USDT"].get_order(4) is not None
+
+def test_order_size_limits_per_symbol():
+    risk = RiskManager(RiskLimits(max_order_notional=Decimal("1000")),
+                       {"ETH-USDT": RiskLimits(max_order_quantity=Decimal("5"))}, sample_every=1)
+    engine = MatchingEngine(risk=risk)
+    engine.process_order(limit(OrderSide.BUY, "10", "100"))
+    with pytest.raises(ValueError, match="notional"):
+        engine.process_order(limit(OrderSide.BUY, "10.01", "100"))
+    # Market orders are valued at the last trade price
+    engine.process_order(market(OrderSide.SELL, "1"))
+    with pytest.raises(ValueError, match="notional"):
+        engine.process_order(market(OrderSide.SELL, "11"))
+    with pytest.raises(ValueError, match="quantity"):
+        engine.process_order(limit(OrderSide.BUY, "6", "1", symbol="ETH-USDT"))
+    stats = risk.stats()
+    assert stats["max_order_notional"]["checked"] == 4
+    assert stats["max_order_notional"]["rejected"] == 2
+    assert stats["max_order_quantity"] == {**stats["max_order_quantity"], "checked": 1, "rejected": 1}
+    assert stats["max_order_notional"]["timed"] == 4
+    assert 0 < stats["max_order_notional"]["p50_ns"] <= stats["max_order_notional"]["p99_ns"]
+
+def test_open_notional_follows_rests_fills_cancels_and_amends():
+    risk = RiskManager(RiskLimits(max_open_notional=Decimal("1000")))
+    engine = MatchingEngine(risk=risk)
+    engine.process_order(limit(OrderSide.BUY, "6", "100", user_id="alice"))
+    with pytest.raises(ValueError, match="Open notional"):
+        engine.process_order(limit(OrderSide.BUY, "5", "100", user_id="alice"))
+    # Other users and orders that cannot rest are unaffected
+    engine.process_order(limit(OrderSide.BUY, "5", "100", user_id="bob"))
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.IOC, side=OrderSide.BUY, user_id="alice",
+                               quantity=Decimal("5"), price=Decimal("1")))
+    engine.process_order(market(OrderSide.SELL, "2", user_id="carol"))
+    assert risk.exposure("alice")["open_notional"] == Decimal("400")
+    # Amending up is checked net of the order's current exposure
+    engine.amend_order("BTC-USDT", 1, Decimal("10"))
+    with pytest.raises(ValueError, match="Open notional"):
+        engine.amend_order("BTC-USDT", 1, Decimal("11"))
+    engine.amend_order("BTC-USDT", 1, Decimal("3"))
+    assert risk.exposure("alice")["open_notional"] == Decimal("300")
+    engine.cancel_order("BTC-USDT", 1)
+    assert risk.exposure("alice")["open_notional"] == 0
+    assert risk.exposure("carol")["positions"] == {"BTC-USDT": Decimal("-2")}
+
+def test_position_limit_allows_reducing_orders():
+    risk = RiskManager(RiskLimits(max_position=Decimal("3")))
+    engine = MatchingEngine(risk=risk)
+    # A resting order counts as if it filled completely
+    with pytest.raises(ValueError, match="Position"):
+        engine.process_order(limit(OrderSide.SELL, "10", "100", user_id="mm"))
+    engine.process_order(limit(OrderSide.SELL, "10", "100"))
+    engine.process_order(limit(OrderSide.SELL, "3", "99", user_id="mm"))
+    engine.process_order(market(OrderSide.BUY, "3", user_id="alice"))
+    with pytest.raises(ValueError, match="Position"):
+        engine.process_order(market(OrderSide.BUY, "0.5", user_id="alice"))
+    engine.process_order(market(OrderSide.SELL, "5", user_id="alice"))
+    assert risk.exposure("alice")["positions"] == {"BTC-USDT": Decimal("3")}
+    assert risk.exposure("mm")["positions"] == {"BTC-USDT": Decimal("-3")}
+    assert risk.check_stats["max_position"].rejected == 2
+
+def test_auction_fills_update_counters():
+    risk = RiskManager()
+    engine = MatchingEngine(risk=risk)
+    engine.start_auction("BTC-USDT")
+    engine.process_order(limit(OrderSide.BUY, "2", "101", user_id="alice"))
+    engine.process_order(limit(OrderSide.SELL, "1", "99", user_id="bob"))
+    engine.end_auction("BTC-USDT")
+    assert risk.exposure("alice") == {"user_id": "alice", "open_notional": Decimal("101"),
+                                      "positions": {"BTC-USDT": Decimal("1")}}
+    assert risk.exposure("bob")["open_notional"] == 0
+
+@pytest.mark.parametrize("factory", [None, CompactOrderBook])
+@pytest.mark.parametrize("seed", range(3))
+def test_counters_match_recomputation_after_random_flow(factory, seed):
+    """Counters maintained incrementally equal a full recomputation from the books and trades"""
+    risk = RiskManager()
+    engine = MatchingEngine(risk=risk, **({"order_book_factory": factory} if factory else {}))
+    trades = []
+    engine.add_trade_listener(trades.append)
+    rng = random.Random(seed)
+    owners = {}
+    for event in generate_flow(seed, 1500):
+        try:
+            if event[0] == "order":
+                fields = event[1]
+                # Triggered orders inherit their owner, but would need their parent's ID to attribute here
+                if fields["order_type"] in (OrderType.STOP_LOSS, OrderType.STOP_LIMIT, OrderType.TAKE_PROFIT):
+                    continue
+                order = Order(symbol=SYMBOL, user_id=rng.choice(["a", "b", "c"]), **fields)
+                engine.process_order(order)
+                owners[order.order_id] = order.user_id
+            elif event[0] == "cancel":
+                engine.cancel_order(SYMBOL, event[1])
+            elif event[0] == "amend":
+                engine.amend_order(SYMBOL, event[1], event[2], event[3])
+        except ValueError:
+            pass
+    open_notional, positions = {}, {}
+    order_book = engine.order_books[SYMBOL]
+    for levels in (order_book.bids, order_book.asks):
+        for price, orders in levels.items():
+            for o in orders:
+                user = owners[o.order_id]
+                open_notional[user] = open_notional.get(user, 0) + price * o.quantity
+    for t in trades:
+        buyer, seller = (t.taker_order_id, t.maker_order_id) if t.aggressor_side == OrderSide.BUY \
+            else (t.maker_order_id, t.taker_order_id)
+        positions[owners[buyer]] = positions.get(owners[buyer], 0) + t.quantity
+        positions[owners[seller]] = positions.get(owners[seller], 0) - t.quantity
+    for user in ("a", "b", "c"):
+        exposure = risk.exposure(user)
+        assert exposure["open_notional"] == open_notional.get(user, 0)
+        assert exposure["positions"].get(SYMBOL, 0) == positions.get(user, 0)
+
+def test_load(tmp_path):
+    path = tmp_path / "risk.json"
+    path.write_text('{"default": {"price_collar": "0.1"}, "symbols": {"ETH-USDT": {"max_position": "50"}}}')
+    risk = RiskManager.load(str(path))
+    assert risk.limits.price_collar == Decimal("0.1")
+    assert risk.symbol_limits["ETH-USDT"].max_position == Decimal("50")
@@ -0,0 +1,79 @@
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.sequencer import Sequencer, ns_to_iso
+
+@pytest.fixture
+def engine():
+    return MatchingEngine()
+
+def test_order_and_trade_ids_are_monotonic(engine):
+    orders = []
+    for i in range(3):
+        order = Order(
+            symbol="BTC-USDT",
+            order_type=OrderType.LIMIT,
+            side=OrderSide.SELL,
+            quantity=Decimal("1.0"),
+            price=Decimal("50000.0")
+        )
+        engine.process_order(order)
+        orders.append(order)
+    assert [o.order_id for o in orders] == [1, 2, 3]
+    assert orders[0].timestamp <= orders[1].timestamp <= orders[2].timestamp
+
+    buy_order = Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.MARKET,
+        side=OrderSide.BUY,
+        quantity=Decimal("3.0")
+    )
+    executions = engine.process_order(buy_order)
+    assert [t.trade_id for t in executions] == [1, 2, 3]
+    assert [t.maker_order_id for t in executions] == [1, 2, 3]
+    assert all(t.taker_order_id == 4 for t in executions)
+
+def test_triggered_order_gets_new_sequence_id(engine):
+    stop_limit_order = Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.STOP_LIMIT,
+        side=OrderSide.SELL,
+        quantity=Decimal("1.0"),
+        stop_price=Decimal("49000.0"),
+        price=Decimal("48900.0")
+    )
+    engine.process_order(stop_limit_order)
+    engine.update_market_price("BTC-USDT", Decimal("49000.0"))
+    triggered = engine.order_books["BTC-USDT"].asks[Decimal("48900.0")][0]
+    assert triggered.parent_order_id == stop_limit_order.order_id
+    assert triggered.order_id > stop_limit_order.order_id
+
+def test_sequencer_observe_and_clock():
+    ticks = iter([5, 10])
+    sequencer = Sequencer(clock=lambda: next(ticks))
+    sequencer.observe_order_id(41)
+    assert sequencer.next_order_id() == 42
+    assert sequencer.now_ns() == 5
+    assert ns_to_iso(1_700_000_000_123_456_789) == "2023-11-14T22:13:20.123456789"
+
+def test_event_time_never_runs_backwards():
+    engine = MatchingEngine(sequencer=Sequencer(clock=lambda: 1_000))
+    maker = Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                  quantity=Decimal("2"), price=Decimal("100"))
+    engine.process_order(maker)
+    assert maker.timestamp == 1_000
+
+    # Earlier caller timestamps (and a clock that steps back) are raised to the latest event time
+    engine.update_market_price("BTC-USDT", Decimal("100"), timestamp=500)
+    assert engine.event_ns == 1_000
+    taker = Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY,
+                  quantity=Decimal("1"), timestamp=10)
+    [trade] = engine.process_order(taker)
+    assert taker.timestamp == trade.timestamp == 1_000
+    engine.sequencer.clock = lambda: 900
+    [trade] = engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY,
+                                         quantity=Decimal("1")))
+    assert trade.timestamp == 1_000
+    engine.cancel_order("BTC-USDT", 999, timestamp=2_000)
+    assert engine.event_ns == 2_000
@@ -0,0 +1,90 @@
+import os
+import multiprocessing
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.compact_order_book import CompactOrderBook
+from engine.shared_book import SharedBookPublisher, SharedBookReader
+
+@pytest.fixture
+def engine():
+    return MatchingEngine()
+
+@pytest.fixture
+def publisher(engine):
+    publisher = SharedBookPublisher(engine, f"book_test_{os.getpid()}", depth=5)
+    yield publisher
+    publisher.close()
+
+def limit(side, quantity, price):
+    return Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.LIMIT,
+        side=side,
+        quantity=Decimal(quantity),
+        price=Decimal(price)
+    )
+
+def read_depth(name, queue):
+    reader = SharedBookReader(name)
+    queue.put((reader.get_depth("BTC-USDT"), reader.snapshot("BTC-USDT")["last_trade_price"]))
+    reader.close()
+
+def test_shared_book_mirrors_engine(engine, publisher):
+    engine.process_order(limit(OrderSide.BUY, "1.5", "49990"))
+    engine.process_order(limit(OrderSide.BUY, "0.5", "49990"))
+    engine.process_order(limit(OrderSide.SELL, "2", "50010"))
+    engine.process_order(limit(OrderSide.SELL, "1", "50000"))
+    engine.process_order(limit(OrderSide.BUY, "0.25", "50000"))
+
+    reader = SharedBookReader(publisher.shm.name)
+    assert reader.get_depth("BTC-USDT") == {"bids": [("49990", "2")], "asks": [("50000", "0.75"), ("50010", "2")]}
+    snapshot = reader.snapshot("BTC-USDT")
+    assert snapshot["best_bid"] == Decimal("49990")
+    assert snapshot["best_ask"] == Decimal("50000")
+    assert snapshot["last_trade_price"] == Decimal("50000")
+    assert snapshot["sequence"] == 5
+    assert reader.get_depth("ETH-USDT") == {"bids": [], "asks": []}
+    reader.close()
+
+def test_shared_book_readable_from_other_process(engine, publisher):
+    engine.process_order(limit(OrderSide.SELL, "1", "50000"))
+    engine.process_order(limit(OrderSide.BUY, "0.4", "50000"))
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=read_depth, args=(publisher.shm.name, queue))
+    process.start()
+    depth, last_price = queue.get(timeout=10)
+    process.join(timeout=10)
+    assert depth == {"bids": [], "asks": [("50000", "0.6")]}
+    assert last_price == Decimal("50000")
+
+@pytest.mark.parametrize("factory", [None, CompactOrderBook])
+def test_level_totals_follow_fills_and_cancels(factory):
+    engine = MatchingEngine(order_book_factory=factory) if factory else MatchingEngine()
+    engine.process_order(limit(OrderSide.SELL, "1", "50000"))  # Rests before the publisher attaches
+    publisher = SharedBookPublisher(engine, f"book_totals_{os.getpid()}", depth=5)
+    try:
+        engine.process_order(limit(OrderSide.SELL, "2", "50000"))
+        engine.process_order(limit(OrderSide.SELL, "3", "50010"))
+        engine.process_order(limit(OrderSide.BUY, "1.5", "50000"))
+        engine.cancel_order("BTC-USDT", 3)
+        reader = SharedBookReader(publisher.shm.name)
+        assert reader.get_depth("BTC-USDT") == {"bids": [], "asks": [("50000", "1.5")]}
+        assert engine.order_books["BTC-USDT"].level_totals.asks == {Decimal("50000"): Decimal("1.5")}
+        reader.close()
+    finally:
+        publisher.close()
+
+def test_unpublishable_updates_are_skipped(engine, publisher):
+    engine.process_order(limit(OrderSide.BUY, "1", "49990"))
+    long_symbol = "X" * 33
+    engine.notify_book_update(long_symbol, engine.order_books["BTC-USDT"])
+    assert long_symbol not in publisher.slots
+    # A value too large for the segment keeps the last good snapshot readable
+    engine.last_trade_prices["BTC-USDT"] = Decimal("1e20")
+    engine.notify_book_update("BTC-USDT", engine.order_books["BTC-USDT"])
+    reader = SharedBookReader(publisher.shm.name)
+    snapshot = reader.snapshot("BTC-USDT")
+    assert snapshot["sequence"] == 1 and snapshot["best_bid"] == Decimal("49990")
+    reader.close()
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import threading
+import pytest
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide, Trade
+from engine.matching_engine import MatchingEngine
+from engine.trade_dispatcher import TradeDispatcher
+from engine.candles import CandleAggregator
+from api.websocket_api import WebSocketManager
+
+def trade(trade_id):
+    return Trade(trade_id=trade_id, timestamp=trade_id, symbol="BTC-USDT", price=Decimal("100"),
+                 quantity=Decimal("1"), aggressor_side=OrderSide.BUY, maker_order_id=1, taker_order_id=2)
+
+def test_engine_trades_reach_thread_consumer_in_order():
+    engine = MatchingEngine()
+    dispatcher = TradeDispatcher()
+    engine.add_trade_listener(dispatcher.publish)
+    received = []
+    dispatcher.add_listener(received.append, name="collector")
+    for i in range(3):
+        engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.LIMIT, side=OrderSide.SELL,
+                                   quantity=Decimal("1"), price=Decimal(100 + i)))
+    engine.process_order(Order(symbol="BTC-USDT", order_type=OrderType.MARKET, side=OrderSide.BUY,
+                               quantity=Decimal("3")))
+    dispatcher.close()
+    assert [t.trade_id for t in received] == [1, 2, 3]
+    stats = dispatcher.stats()["consumers"]["collector"]
+    assert stats["delivered"] == 3
+    assert stats["lag"] == 0
+
+def test_stalled_consumer_drops_oldest_without_blocking_publisher():
+    dispatcher = TradeDispatcher(capacity=4)
+    release = threading.Event()
+    received = []
+
+    def stalled(t):
+        release.wait()
+        received.append(t.trade_id)
+
+    dispatcher.add_listener(stalled, name="stalled")
+    for i in range(1, 11):
+        dispatcher.publish(trade(i))
+    stats = dispatcher.stats()["consumers"]["stalled"]
+    assert stats["dropped"] > 0
+    assert stats["lag"] <= 4
+    assert stats["max_lag"] == 4
+    release.set()
+    dispatcher.close()
+    # The newest trades are always delivered
+    assert received[-4:] == [7, 8, 9, 10]
+    stats = dispatcher.stats()["consumers"]["stalled"]
+    assert stats["dropped"] + len(set(received)) >= 10
+    # Lost trades are reported by sequence range (trade i has sequence i - 1)
+    lost = {sequence for first, last in stats["gaps"] for sequence in range(first, last + 1)}
+    assert len(lost) == stats["dropped"]
+    assert not lost & {i - 1 for i in received}
+
+def test_block_policy_waits_for_consumer():
+    dispatcher = TradeDispatcher(capacity=2, policy="block", batch_size=1)
+    received = []
+    dispatcher.add_listener(received.append, name="slow")
+    for i in range(1, 21):
+        dispatcher.publish(trade(i))
+    dispatcher.close()
+    assert [t.trade_id for t in received] == list(range(1, 21))
+    assert dispatcher.stats()["consumers"]["slow"]["dropped"] == 0
+
+def test_block_consumer_holds_the_publisher_until_it_catches_up():
+    dispatcher = TradeDispatcher(capacity=2)
+    release = threading.Event()
+    received = []
+
+    def stalled(t):
+        release.wait()
+        received.append(t.trade_id)
+
+    dispatcher.add_listener(stalled, name="candles", policy="block")
+    dispatcher.add_listener(lambda t: None, name="feed")  # The dispatcher default, "drop"
+    publisher = threading.Thread(target=lambda: [dispatcher.publish(trade(i)) for i in range(1, 11)])
+    publisher.start()
+    publisher.join(0.3)
+    assert publisher.is_alive()  # No timeout: still waiting on the stalled consumer
+    release.set()
+    publisher.join()
+    dispatcher.close()
+    assert received == list(range(1, 11))
+    stats = dispatcher.stats()["consumers"]["candles"]
+    assert (stats["policy"], stats["dropped"], stats["gaps"]) == ("block", 0, [])
+
+def test_failing_callback_is_retried():
+    dispatcher = TradeDispatcher(retry_delay=0)
+    received = []
+    failures = [1]
+
+    def flaky(t):
+        if failures:
+            failures.pop()
+            raise RuntimeError("transient")
+        received.append(t.trade_id)
+
+    dispatcher.add_listener(flaky, name="flaky")
+    dispatcher.publish(trade(1))
+    dispatcher.publish(trade(2))
+    dispatcher.close()
+    assert received == [1, 2]
+    assert dispatcher.stats()["consumers"]["flaky"]["errors"] == 1
+
+def test_failing_trade_is_parked_and_redelivered():
+    dispatcher = TradeDispatcher(retry_delay=0, max_retries=2, park_retry=0.01)
+    received = []
+    failures = [1] * 4  # Outlasts the retries, so the trade is parked
+
+    def flaky(t):
+        if t.trade_id == 1 and failures:
+            failures.pop()
+            raise RuntimeError("disk full")
+        received.append(t.trade_id)
+
+    dispatcher.add_listener(flaky, name="flaky")
+    dispatcher.publish(trade(1))
+    dispatcher.publish(trade(2))
+    for _ in range(200):
+        if len(received) == 2:
+            break
+        threading.Event().wait(0.01)
+    dispatcher.close()
+    # Parking let trade 2 through first; trade 1 followed once the callback recovered
+    assert received == [2, 1]
+    stats = dispatcher.stats()["consumers"]["flaky"]
+    assert (stats["errors"], stats["delivered"], stats["parked"], stats["dropped"]) == (4, 2, 0, 0)
+
+def test_persistently_failing_trade_stays_parked():
+    dispatcher = TradeDispatcher(retry_delay=0, max_retries=2)
+    received = []
+
+    def poisoned(t):
+        if t.trade_id == 1:
+            raise RuntimeError("bad trade")
+        received.append(t.trade_id)
+
+    dispatcher.add_listener(poisoned, name="poisoned")
+    dispatcher.publish(trade(1))
+    dispatcher.publish(trade(2))
+    dispatcher.close()
+    assert received == [2]
+    stats = dispatcher.stats()["consumers"]["poisoned"]
+    assert (stats["delivered"], stats["parked"], stats["dropped"]) == (1, 1, 0)
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+def test_candles_on_a_dispatcher_thread_reach_websocket_subscribers():
+    engine = MatchingEngine()
+    candles = CandleAggregator()
+    manager = WebSocketManager(engine, candle_aggregator=candles)
+    websocket = FakeWebSocket()
+
+    async def scenario():
+        manager.start()
+        manager.connections.add(websocket)
+        await manager.handle_message(websocket, json.dumps(
+            {"type": "subscribe", "channel": "candles", "symbol": "BTC-USDT", "interval": "1m"}))
+        dispatcher = TradeDispatcher()
+        dispatcher.add_listener(candles.on_trade, name="candles")
+        dispatcher.publish(trade(1))
+        await asyncio.to_thread(dispatcher.close)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert [m["type"] for m in websocket.sent] == ["candle"]
+
+def test_async_consumer():
+    async def scenario():
+        dispatcher = TradeDispatcher()
+        received = []
+
+        async def on_trade(t):
+            received.append(t.trade_id)
+
+        dispatcher.add_async_listener(on_trade, name="ws")
+        for i in range(1, 6):
+            dispatcher.publish(trade(i))
+        await asyncio.sleep(0.01)
+        dispatcher.close()
+        return received, dispatcher.stats()["consumers"]["ws"]
+
+    received, stats = asyncio.run(scenario())
+    assert received == [1, 2, 3, 4, 5]
+    assert stats["delivered"] == 5
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        TradeDispatcher(policy="wait")
+    with pytest.raises(ValueError):
+        TradeDispatcher(capacity=0)
@@ -0,0 +1,52 @@
+from decimal import Decimal
+from engine.models import Trade, OrderSide
+from engine.trade_log import TradeLog, RECORD
+
+NS = 1_000_000_000
+DAY_START = 1_700_006_400 * NS  # 2023-11-15T00:00:00Z
+
+def make_trade(i, timestamp):
+    return Trade(
+        trade_id=i,
+        timestamp=timestamp,
+        symbol="BTC-USDT",
+        price=Decimal("50000.5") + i,
+        quantity=Decimal("0.25"),
+        aggressor_side=OrderSide.BUY if i % 2 else OrderSide.SELL,
+        maker_order_id=2 * i,
+        taker_order_id=2 * i + 1
+    )
+
+def test_trade_log_range_reads(tmp_path):
+    log = TradeLog(data_dir=str(tmp_path), index_every=4)
+    for i in range(1, 21):
+        log.on_trade(make_trade(i, DAY_START + i * NS))
+    # Trades after midnight roll over into the next day's file
+    for i in range(21, 25):
+        log.on_trade(make_trade(i, DAY_START + 86_400 * NS + i * NS))
+
+    files = sorted(p.name for p in (tmp_path / "trades" / "BTC-USDT").iterdir())
+    assert files == ["20231115.bin", "20231115.idx", "20231116.bin", "20231116.idx"]
+    assert (tmp_path / "trades" / "BTC-USDT" / "20231115.bin").stat().st_size == 20 * RECORD.size
+
+    pages = list(log.read_range("BTC-USDT", DAY_START + 6 * NS, DAY_START + 13 * NS, page_size=3))
+    assert [len(page) for page in pages] == [3, 3, 2]
+    trades = [t for page in pages for t in page]
+    assert [t["trade_id"] for t in trades] == [str(i) for i in range(6, 14)]
+    assert trades[0]["price"] == "50006.5"
+    assert trades[0]["quantity"] == "0.25"
+    assert trades[0]["aggressor_side"] == "sell"
+    assert trades[0]["maker_order_id"] == "12"
+
+    spanning = [t for page in log.read_range("BTC-USDT", DAY_START + 19 * NS, DAY_START + 86_400 * NS + 22 * NS)
+                for t in page]
+    assert [t["trade_id"] for t in spanning] == ["19", "20", "21", "22"]
+    log.close()
+
+    # Reopening appends after the existing records
+    reopened = TradeLog(data_dir=str(tmp_path), index_every=4)
+    reopened.on_trade(make_trade(25, DAY_START + 86_400 * NS + 30 * NS))
+    tail = [t for page in reopened.read_range("BTC-USDT", DAY_START + 86_400 * NS, DAY_START + 2 * 86_400 * NS)
+            for t in page]
+    assert [t["trade_id"] for t in tail] == ["21", "22", "23", "24", "25"]
+    reopened.close()
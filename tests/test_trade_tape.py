@@ -0,0 +1,105 @@
+import pytest
+import threading
+from decimal import Decimal
+from engine.models import Order, OrderType, OrderSide
+from engine.matching_engine import MatchingEngine
+from engine.sequencer import Sequencer
+from engine.trade_tape import TradeTape, NS_PER_SECOND
+
+@pytest.fixture
+def clock():
+    return {"now": 1_700_000_000 * NS_PER_SECOND}
+
+@pytest.fixture
+def engine(clock):
+    return MatchingEngine(sequencer=Sequencer(clock=lambda: clock["now"]))
+
+def trade(engine, aggressor, price, quantity):
+    maker_side = OrderSide.SELL if aggressor == OrderSide.BUY else OrderSide.BUY
+    engine.process_order(Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.LIMIT,
+        side=maker_side,
+        quantity=Decimal(quantity),
+        price=Decimal(price)
+    ))
+    engine.process_order(Order(
+        symbol="BTC-USDT",
+        order_type=OrderType.MARKET,
+        side=aggressor,
+        quantity=Decimal(quantity)
+    ))
+
+def test_tape_vectorized_analytics(engine, clock):
+    tape = TradeTape(capacity=16)
+    engine.add_trade_listener(tape.on_trade)
+    trade(engine, OrderSide.BUY, "100", "1")
+    trade(engine, OrderSide.SELL, "104", "3")
+    clock["now"] += 10 * NS_PER_SECOND
+    trade(engine, OrderSide.BUY, "112", "2")
+
+    stats = tape.stats("BTC-USDT")
+    assert stats["trade_count"] == 3
+    assert stats["vwap"] == pytest.approx((100 + 312 + 224) / 6)
+    assert stats["volume"] == {"buy": 3.0, "sell": 3.0}
+
+    recent_stats = tape.stats("BTC-USDT", since_ns=clock["now"] - NS_PER_SECOND)
+    assert recent_stats["trade_count"] == 1
+    assert recent_stats["vwap"] == pytest.approx(112)
+
+    assert tape.volume_profile("BTC-USDT", 10) == [(100.0, 4.0), (110.0, 2.0)]
+    recent = tape.recent("BTC-USDT", 2)
+    assert [t["price"] for t in recent] == [112.0, 104.0]
+    assert recent[0]["trade_id"] == "3"
+    assert tape.stats("ETH-USDT")["trade_count"] == 0
+
+def test_tape_ring_overwrites_oldest():
+    tape = TradeTape(capacity=4)
+    symbol_tape = tape.tape("BTC-USDT")
+    for i in range(6):
+        symbol_tape.append(100.0 + i, 1.0, 0, i, i + 1, 1, 2)
+    assert symbol_tape.trade_count() == 4
+    assert [t["price"] for t in symbol_tape.recent(10)] == [105.0, 104.0, 103.0, 102.0]
+    assert symbol_tape.vwap() == pytest.approx(103.5)
+
+    symbol_tape.extend([200.0] * 3, [1.0] * 3, [1] * 3, [10, 11, 12], [7, 8, 9], [1] * 3, [2] * 3)
+    assert [t["trade_id"] for t in symbol_tape.recent(4)] == ["9", "8", "7", "6"]
+
+def test_tape_grows_on_demand_up_to_capacity():
+    tape = TradeTape(capacity=10, initial_capacity=2)
+    symbol_tape = tape.tape("BTC-USDT")
+    assert len(symbol_tape.price) == 2
+    for i in range(5):
+        symbol_tape.append(100.0 + i, 1.0, 0, i, i + 1, 1, 2)
+    assert len(symbol_tape.price) == 8
+    assert [t["trade_id"] for t in symbol_tape.recent(10)] == ["5", "4", "3", "2", "1"]
+
+    symbol_tape.extend([200.0] * 7, [1.0] * 7, [1] * 7, list(range(5, 12)), list(range(6, 13)), [1] * 7, [2] * 7)
+    assert len(symbol_tape.price) == 10
+    assert symbol_tape.trade_count() == 10
+    assert [t["trade_id"] for t in symbol_tape.recent(10)] == [str(i) for i in range(12, 2, -1)]
+    symbol_tape.append(300.0, 1.0, 0, 12, 13, 1, 2)
+    assert symbol_tape.recent(1)[0]["trade_id"] == "13"
+    assert len(symbol_tape.price) == 10
+
+def test_tape_readers_never_see_a_torn_write():
+    tape = TradeTape(capacity=4096, initial_capacity=2)
+    symbol_tape = tape.tape("BTC-USDT")
+    done = threading.Event()
+    def write():
+        for i in range(1, 20001):
+            symbol_tape.append(float(i), 1.0, 0, i, i, 1, 2)  # Price equals trade id
+        done.set()
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not done.is_set():
+        recent = tape.recent("BTC-USDT", 50)
+        ids = [int(t["trade_id"]) for t in recent]
+        if ids:
+            assert ids == list(range(ids[0], ids[0] - len(ids), -1))
+        assert all(t["price"] == float(t["trade_id"]) for t in recent)
+        stats = tape.stats("BTC-USDT")
+        assert stats["volume"][OrderSide.BUY.value] == stats["trade_count"]
+    writer.join()
+    assert symbol_tape.recent(1)[0]["trade_id"] == "20000"
+    assert len(symbol_tape.price) == 4096
@@ -1,10 +1,8 @@
+import atexit
 import logging
+from engine.async_logging import configure_async_logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('matching_engine.log'),
-        logging.StreamHandler()
-    ]
-)
\ No newline at end of file
+# Console and file output are written by a background QueueListener thread,
+# so logging never blocks the caller on disk or terminal I/O
+listener = configure_async_logging(level=logging.INFO, log_file='matching_engine.log')
+atexit.register(listener.stop)